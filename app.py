@@ -9,6 +9,8 @@ from routes.users import users_bp
 from routes.security_payment import security_payment_bp
 from routes.attendance_mgmt import attendance_mgmt_bp
 from routes.manual_bill import manual_bill_bp
+from routes.pdf_jobs import pdf_jobs_bp
+from routes.pay_rules import pay_rules_bp
 from extensions import db, login_manager
 from models.user import User
 from models.holiday import Holiday, HolidayDutyRecord
@@ -51,6 +53,8 @@ app.register_blueprint(users_bp)
 app.register_blueprint(security_payment_bp)
 app.register_blueprint(attendance_mgmt_bp)
 app.register_blueprint(manual_bill_bp)
+app.register_blueprint(pdf_jobs_bp)
+app.register_blueprint(pay_rules_bp)
 
 if __name__ == "__main__":
     app.run(host='0.0.0.0', port=5000, debug=True)
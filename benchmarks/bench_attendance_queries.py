@@ -0,0 +1,95 @@
+"""
+Benchmark: DATE(punch_time) filter vs half-open range filter.
+
+Seeds a scratch iclock_transaction table at increasing sizes and times a
+single-day attendance lookup both ways. The function-wrapped filter has to
+evaluate DATE() for every row, so it grows with table size; the range filter
+seeks the punch_time index and stays roughly flat.
+
+Usage:
+    python benchmarks/bench_attendance_queries.py
+    python benchmarks/bench_attendance_queries.py --sizes 100000 1000000 --db-uri mysql+pymysql://.../scratch
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+
+from common import make_app, ensure_scratch_table, timeit, print_table
+from extensions import db
+from sqlalchemy import func, insert
+from models.attendance import IClockTransaction
+from services.attendance_service import day_bounds
+
+EMPLOYEES = 2000
+PUNCHES_PER_DAY = 4
+
+def seed(total_rows, start_day):
+    """Spreads total_rows punches over as many days as needed, oldest first."""
+    rng = random.Random(42)
+    rows_per_day = EMPLOYEES * PUNCHES_PER_DAY
+    days = max(1, total_rows // rows_per_day)
+    batch = []
+    inserted = 0
+    for d in range(days):
+        day = start_day + timedelta(days=d)
+        for emp in range(1, EMPLOYEES + 1):
+            for _ in range(PUNCHES_PER_DAY):
+                if inserted >= total_rows:
+                    break
+                batch.append({
+                    'emp_code': str(emp),
+                    'punch_time': day + timedelta(minutes=rng.randint(6 * 60, 23 * 60)),
+                })
+                inserted += 1
+        if len(batch) >= 50000 or d == days - 1:
+            db.session.execute(insert(IClockTransaction), batch)
+            db.session.commit()
+            batch = []
+    return start_day + timedelta(days=days - 1)
+
+def legacy_lookup(report_date):
+    return db.session.query(IClockTransaction.emp_code, IClockTransaction.punch_time) \
+        .filter(func.date(IClockTransaction.punch_time) == report_date).all()
+
+def range_lookup(report_date):
+    # Same predicate get_attendance_for_date now uses
+    day_start, day_end = day_bounds(report_date)
+    return db.session.query(IClockTransaction.emp_code, IClockTransaction.punch_time) \
+        .filter(IClockTransaction.punch_time >= day_start,
+                IClockTransaction.punch_time < day_end).all()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[16000, 160000, 800000])
+    parser.add_argument('--db-uri', default='sqlite://')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = make_app(args.db_uri)
+    results = []
+    with app.app_context():
+        ensure_scratch_table(IClockTransaction)
+        try:
+            start_day = datetime(2024, 1, 1)
+            for size in sorted(args.sizes):
+                db.session.query(IClockTransaction).delete()
+                db.session.commit()
+                last_day = seed(size, start_day)
+                report_date = last_day.date()
+
+                legacy_s, legacy_rows = timeit(lambda: legacy_lookup(report_date), args.repeat)
+                range_s, range_rows = timeit(lambda: range_lookup(report_date), args.repeat)
+                assert len(legacy_rows) == len(range_rows)
+                results.append([
+                    f"{size:,}", len(range_rows),
+                    f"{legacy_s * 1000:.1f}", f"{range_s * 1000:.1f}",
+                    f"{legacy_s / range_s:.1f}x" if range_s else '-'
+                ])
+        finally:
+            db.session.query(IClockTransaction).delete()
+            db.session.commit()
+
+    print_table(['table rows', 'day punches', 'DATE() ms', 'range ms', 'speedup'], results)
+
+if __name__ == "__main__":
+    main()
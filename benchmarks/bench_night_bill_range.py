@@ -0,0 +1,119 @@
+"""
+Benchmark: monthly night bill as 30 single-day runs vs one range run.
+
+Seeds a scratch database with employees and a month of daily attendance
+(some staff and workers leaving after 22:00), checks that the range engine's
+per-employee totals equal the sum of the single-day sheets, then times both.
+
+Usage:
+    python benchmarks/bench_night_bill_range.py [--sizes 1000 5000] [--days 30]
+"""
+import argparse
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from common import make_app, ensure_scratch_table, timeit, print_table
+from extensions import db
+from sqlalchemy import insert
+from models.daily_attendance import DailyAttendance
+from models.designation import Designation
+from models.employee import Employee
+from models.section import Section
+from models.sub_section import SubSection
+from services.employee_directory import invalidate_employee_directory
+from services.report_service import compute_night_bill, compute_night_bill_range
+
+SUB_SECTIONS = ['Sewing', 'Cutting', 'Finishing', 'Store']
+CATEGORIES = ['Worker', 'Staff']
+
+def seed(size, start_day, days, seed=11):
+    rng = random.Random(seed)
+    designations = [Designation(designation=f"Designation {i}", night_bill=rng.choice([100, 150, 200])) for i in range(5)]
+    section = Section(name='Production')
+    db.session.add_all(designations + [section])
+    db.session.flush()
+    sub_sections = [SubSection(name=name, section_id=section.id) for name in SUB_SECTIONS]
+    db.session.add_all(sub_sections)
+    db.session.flush()
+
+    db.session.execute(insert(Employee), [{
+        'Emp_Id': emp_id,
+        'Emp_Name': f"employee {emp_id}",
+        'designation_id': rng.choice(designations).id,
+        'sub_section_id': rng.choice(sub_sections).id,
+        'Category': rng.choice(CATEGORIES),
+        'Gross_Salary': rng.randint(8000, 60000)
+    } for emp_id in range(1, size + 1)])
+
+    rows = []
+    for d in range(days):
+        day = start_day + timedelta(days=d)
+        for emp_id in range(1, size + 1):
+            if rng.random() < 0.1:
+                continue  # absent
+            rows.append({
+                'emp_code': str(emp_id),
+                'work_date': day.date(),
+                'in_time': day + timedelta(minutes=rng.randint(7 * 60, 9 * 60)),
+                'out_time': day + timedelta(minutes=rng.randint(17 * 60, 23 * 60 + 59)),
+                'punch_count': 2
+            })
+    db.session.execute(insert(DailyAttendance), rows)
+    db.session.commit()
+    invalidate_employee_directory()
+
+def single_day_totals(start_day, days):
+    """What payroll did by hand: run every day and add the sheets up per employee."""
+    totals = defaultdict(lambda: [0, 0])
+    for d in range(days):
+        for_date = (start_day + timedelta(days=d)).strftime('%Y-%m-%d')
+        for row in compute_night_bill(for_date, None, None, None):
+            totals[row['id']][0] += 1
+            totals[row['id']][1] += row['amount']
+    return dict(totals)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000])
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--db-uri', default='sqlite://')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    app = make_app(args.db_uri)
+    start_day = datetime(2026, 3, 1)
+    start_date = start_day.strftime('%Y-%m-%d')
+    end_date = (start_day + timedelta(days=args.days - 1)).strftime('%Y-%m-%d')
+    results = []
+    with app.app_context():
+        for size in args.sizes:
+            ensure_scratch_table(Employee)
+            ensure_scratch_table(DailyAttendance)
+            try:
+                seed(size, start_day, args.days)
+
+                single_s, single_totals = timeit(lambda: single_day_totals(start_day, args.days), args.repeat)
+                range_s, (rows, details) = timeit(
+                    lambda: compute_night_bill_range(start_date, end_date, None, None, None), args.repeat)
+
+                range_totals = {r['id']: [r['nights'], r['amount']] for r in rows}
+                if range_totals != single_totals:
+                    raise SystemExit(f"Range totals differ from the single-day sheets at size {size}")
+
+                results.append([
+                    f"{size:,}", len(details), len(rows),
+                    f"{single_s * 1000:.1f}", f"{range_s * 1000:.1f}",
+                    f"{single_s / range_s:.1f}x" if range_s else '-'
+                ])
+            finally:
+                db.session.rollback()
+                for model in (DailyAttendance, Employee, SubSection, Section, Designation):
+                    db.session.query(model).delete()
+                db.session.commit()
+
+    print_table(['employees', 'nights', 'paid employees', f'{args.days} x single ms', 'range ms', 'speedup'], results)
+    print("Per-employee nights and amounts identical to the summed single-day sheets.")
+
+if __name__ == "__main__":
+    main()
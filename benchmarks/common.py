@@ -0,0 +1,51 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks build their own Flask app against a scratch database (an in-memory
+SQLite database by default) so they never touch the production 'mfl' schema.
+Pass --db-uri to run against a scratch MySQL database instead.
+"""
+import os
+import sys
+import time
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from flask import Flask
+from extensions import db
+
+DEFAULT_DB_URI = 'sqlite://'
+
+def make_app(db_uri=DEFAULT_DB_URI, binds=None):
+    """Creates a minimal app bound to a scratch database."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = db_uri
+    app.config['SQLALCHEMY_BINDS'] = binds or {}
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+def ensure_scratch_table(model):
+    """Creates the model's table, refusing to run against a table that already holds data."""
+    db.create_all(bind_key=None)
+    if db.session.query(model).first() is not None:
+        raise SystemExit(f"Refusing to benchmark: '{model.__tablename__}' is not empty. Use a scratch database.")
+
+def timeit(fn, repeat=5):
+    """Runs fn repeat times and returns (median seconds, last result)."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), result
+
+def print_table(headers, rows):
+    widths = [max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    print("  ".join(str(h).rjust(w) for h, w in zip(headers, widths)))
+    for r in rows:
+        print("  ".join(str(v).rjust(w) for v, w in zip(r, widths)))
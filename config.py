@@ -43,3 +43,30 @@ SQLALCHEMY_TRACK_MODIFICATIONS = False
 # Session Lifetime
 PERMANENT_SESSION_LIFETIME = timedelta(minutes=int(os.getenv('SESSION_TIMEOUT_MINUTES') or 30))
 
+
+# Attendance Sync Daemon
+SYNC_STATUS_FILE = os.getenv('SYNC_STATUS_FILE') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sync_status.json')
+SYNC_MIN_INTERVAL = int(os.getenv('SYNC_MIN_INTERVAL') or 5)
+SYNC_MAX_INTERVAL = int(os.getenv('SYNC_MAX_INTERVAL') or 300)
+
+# PDF Rendering Worker Pool
+PDF_JOB_DIR = os.getenv('PDF_JOB_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'pdf_jobs')
+PDF_WORKERS = int(os.getenv('PDF_WORKERS') or os.cpu_count() or 1)
+PDF_MAX_PENDING = int(os.getenv('PDF_MAX_PENDING') or PDF_WORKERS * 4)
+PDF_JOB_RETENTION_SECONDS = int(os.getenv('PDF_JOB_RETENTION_SECONDS') or 3600)
+PDF_RENDER_TIMEOUT = int(os.getenv('PDF_RENDER_TIMEOUT') or 300)
+
+# Rendered report cache for finalized holidays
+ARTIFACT_CACHE_DIR = os.getenv('ARTIFACT_CACHE_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'artifacts')
+ARTIFACT_CACHE_MAX_BYTES = int(os.getenv('ARTIFACT_CACHE_MAX_MB') or 512) * 1024 * 1024
+
+# Shared whole-day attendance cache for present status / night bill
+REPORT_CACHE_TTL_SECONDS = int(os.getenv('REPORT_CACHE_TTL_SECONDS') or 300)
+REPORT_CACHE_MAX_DAYS = int(os.getenv('REPORT_CACHE_MAX_DAYS') or 31)
+
+# Employee search (/api/reports/employees/search)
+EMPLOYEE_SEARCH_LIMIT = int(os.getenv('EMPLOYEE_SEARCH_LIMIT') or 10)
+EMPLOYEE_SEARCH_MAX_LIMIT = int(os.getenv('EMPLOYEE_SEARCH_MAX_LIMIT') or 50)
+
+# Payroll: fixed allowances deducted from gross before Basic = (Gross - allowance) / 1.5
+SALARY_ALLOWANCE = float(os.getenv('SALARY_ALLOWANCE') or 2450)
@@ -0,0 +1,133 @@
+"""
+Idempotent schema migrations for the local 'mfl' database.
+
+db.create_all() only creates missing tables; it never adds indexes or columns
+to tables that already exist. Each step below checks the live schema first, so
+the whole list can be re-run safely on every start-up.
+
+Usage:
+    python migrate_db.py
+"""
+from sqlalchemy import inspect, text
+from extensions import db
+# Import every local model so db.create_all() knows about its table
+from models.daily_attendance import DailyAttendance
+from models.sync_checkpoint import SyncCheckpoint
+from models.employee import Employee
+from models.holiday import Holiday, HolidayDutyRecord
+from models.pay_rule import PayRule, PayRuleVersion
+
+def _index_names(table):
+    return {ix['name'] for ix in inspect(db.engine).get_indexes(table)}
+
+def _ensure_index(table, name, columns):
+    """Creates an index on an existing table if it is not there yet."""
+    if not inspect(db.engine).has_table(table):
+        return False
+    if name in _index_names(table):
+        return False
+    with db.engine.begin() as conn:
+        conn.execute(text(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})"))
+    return True
+
+def _ensure_column(table, column, ddl):
+    """Adds a column to an existing table if it is not there yet."""
+    if not inspect(db.engine).has_table(table):
+        return False
+    if column in {c['name'] for c in inspect(db.engine).get_columns(table)}:
+        return False
+    with db.engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+    return True
+
+def migrate_iclock_emp_punch_index():
+    """Composite (emp_code, punch_time) index for per-employee day lookups."""
+    return _ensure_index('iclock_transaction', 'ix_iclock_transaction_emp_code_punch_time',
+                         ['emp_code', 'punch_time'])
+
+def migrate_daily_attendance_backfill():
+    """Populates the daily attendance summary from existing punches on first run."""
+    from services.daily_attendance_service import rebuild_all_daily_attendance
+    if db.session.query(DailyAttendance.emp_code).first() is not None:
+        return False
+    return rebuild_all_daily_attendance() > 0
+
+def migrate_employee_updated_at():
+    """
+    Server-maintained employees.updated_at (also bumped by raw SQL imports),
+    indexed so the employee directory's MAX(updated_at) version check is a lookup.
+    """
+    added = _ensure_column('employees', 'updated_at',
+                           'DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP')
+    indexed = _ensure_index('employees', 'ix_employees_updated_at', ['updated_at'])
+    return added or indexed
+
+def migrate_holiday_generations():
+    """
+    Snapshot generations: records are written under a new generation and
+    published by switching holidays.active_generation in one update.
+    Existing rows stay on generation 0, which is every holiday's initial value.
+    """
+    active = _ensure_column('holidays', 'active_generation', 'INT NOT NULL DEFAULT 0')
+    generation = _ensure_column('holiday_duty_records', 'generation', 'INT NOT NULL DEFAULT 0')
+    indexed = _ensure_index('holiday_duty_records', 'ix_holiday_duty_records_holiday_generation',
+                            ['holiday_id', 'generation'])
+    return active or generation or indexed
+
+def migrate_pay_rules():
+    """
+    Seeds the holiday payment rules as version 1 and records on each snapshot
+    row which rule version computed it (NULL for rows computed before).
+    """
+    from services.pay_rules import seed_default_pay_rules
+    column = _ensure_column('holiday_duty_records', 'rule_version', 'INT NULL')
+    versions = migrate_pay_rule_versions()
+    return seed_default_pay_rules() or column or versions
+
+def migrate_pay_rule_versions():
+    """Registers rule versions published before pay_rule_versions existed."""
+    missing = db.session.query(PayRule.version).distinct().filter(
+        PayRule.version.notin_(db.session.query(PayRuleVersion.version))
+    ).all()
+    if not missing:
+        return False
+    db.session.add_all(PayRuleVersion(version=v) for (v,) in missing)
+    db.session.commit()
+    return True
+
+def migrate_employee_join_date():
+    """employees.Join_Date, written by the CSV importer (tables created by db.create_all lack it)."""
+    return _ensure_column('employees', 'Join_Date', 'DATE NULL')
+
+def migrate_daily_attendance_updated_at_index():
+    """Index for the report cache's MAX(daily_attendance.updated_at) version check."""
+    return _ensure_index('daily_attendance', 'ix_daily_attendance_updated_at', ['updated_at'])
+
+# Ordered list of (name, step). Append new steps at the end.
+MIGRATIONS = [
+    ('iclock_emp_punch_index', migrate_iclock_emp_punch_index),
+    ('daily_attendance_backfill', migrate_daily_attendance_backfill),
+    ('employee_updated_at', migrate_employee_updated_at),
+    ('holiday_generations', migrate_holiday_generations),
+    ('pay_rules', migrate_pay_rules),
+    ('employee_join_date', migrate_employee_join_date),
+    ('daily_attendance_updated_at_index', migrate_daily_attendance_updated_at_index),
+]
+
+def run_migrations():
+    """Applies every pending migration step. Must run inside an app context."""
+    # Local bind only; the BioTime bind is read-only for this application
+    db.create_all(bind_key=None)
+    applied = []
+    for name, step in MIGRATIONS:
+        if step():
+            print(f"Applied migration: {name}")
+            applied.append(name)
+    if not applied:
+        print("Schema is up to date.")
+    return applied
+
+if __name__ == "__main__":
+    from app import app
+    with app.app_context():
+        run_migrations()
@@ -1,9 +1,12 @@
 from extensions import db
-from datetime import datetime
 
 class IClockTransaction(db.Model):
     """Local table in 'mfl' database for corrections and sync data."""
     __tablename__ = 'iclock_transaction'
+    __table_args__ = (
+        # Serves per-employee day/range lookups: emp_code IN (...) AND punch_time in window
+        db.Index('ix_iclock_transaction_emp_code_punch_time', 'emp_code', 'punch_time'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     emp_code = db.Column(db.String(20), nullable=False, index=True)
@@ -13,8 +16,10 @@ class IClockTransaction(db.Model):
     sync_id = db.Column(db.Integer, unique=True, nullable=True) # Original ID from BioTime
     is_corrected = db.Column(db.Boolean, default=False)
     original_punch_time = db.Column(db.DateTime, nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.now)
-    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
+    # Written with the database's NOW() so they compare with watermarks taken from
+    # the same clock (see report_service.changed_employee_ids)
+    created_at = db.Column(db.DateTime, default=db.func.now())
+    updated_at = db.Column(db.DateTime, default=db.func.now(), onupdate=db.func.now())
 
     def __repr__(self):
         return f'<LocalPunch {self.emp_code} @ {self.punch_time}>'
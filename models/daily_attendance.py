@@ -0,0 +1,27 @@
+from extensions import db
+
+class DailyAttendance(db.Model):
+    """
+    Pre-aggregated attendance, one row per employee per day.
+    Derived from iclock_transaction and kept current by the sync and manual punch services.
+    """
+    __tablename__ = 'daily_attendance'
+    __table_args__ = (
+        db.Index('ix_daily_attendance_work_date', 'work_date'),
+        # MAX(updated_at) is part of the report cache's attendance version
+        db.Index('ix_daily_attendance_updated_at', 'updated_at'),
+    )
+
+    emp_code = db.Column(db.String(20), primary_key=True)
+    work_date = db.Column(db.Date, primary_key=True)
+
+    # First punch before 1:00 PM / last punch at or after 1:00 PM
+    in_time = db.Column(db.DateTime, nullable=True)
+    out_time = db.Column(db.DateTime, nullable=True)
+    punch_count = db.Column(db.Integer, nullable=False, default=0)
+
+    # Database clock, like the upsert's NOW(); compared with holiday re-process watermarks
+    updated_at = db.Column(db.DateTime, default=db.func.now(), onupdate=db.func.now())
+
+    def __repr__(self):
+        return f'<DailyAttendance {self.emp_code} @ {self.work_date}>'
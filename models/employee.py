@@ -5,11 +5,16 @@ class Employee(db.Model):
 
     Emp_Id = db.Column(db.Integer, primary_key=True)
     Emp_Name = db.Column(db.String(255), nullable=False)
+    Join_Date = db.Column(db.Date)
     designation_id = db.Column(db.Integer, db.ForeignKey('designations.id'), nullable=True)
     sub_section_id = db.Column(db.Integer, db.ForeignKey('sub_sections.id'), nullable=True)
     Category = db.Column(db.String(50))
     Grade = db.Column(db.String(50))
     Gross_Salary = db.Column(db.Numeric(15, 2))
+    # Maintained by MySQL (ON UPDATE CURRENT_TIMESTAMP, see migrate_db.py) so raw-SQL
+    # imports bump it too; drives the employee directory cache version
+    updated_at = db.Column(db.DateTime, index=True,
+                           server_default=db.func.now(), server_onupdate=db.FetchedValue())
     
     designation_rel = db.relationship('Designation', backref='employees')
     sub_section_rel = db.relationship('SubSection', backref='employees')
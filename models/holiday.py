@@ -9,6 +9,8 @@ class Holiday(db.Model):
     holiday_name = db.Column(db.String(255), nullable=False)
     status = db.Column(db.String(20), default='draft') # 'draft', 'finalized'
     processed_at = db.Column(db.DateTime, nullable=True)
+    # Generation of HolidayDutyRecord rows that readers see; bumped by each re-process
+    active_generation = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     created_at = db.Column(db.DateTime, default=datetime.now)
     updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
 
@@ -19,9 +21,13 @@ class Holiday(db.Model):
 
 class HolidayDutyRecord(db.Model):
     __tablename__ = 'holiday_duty_records'
+    __table_args__ = (
+        db.Index('ix_holiday_duty_records_holiday_generation', 'holiday_id', 'generation'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     holiday_id = db.Column(db.Integer, db.ForeignKey('holidays.id'), nullable=False, index=True)
+    generation = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     # Snapshot data of employee
     emp_id = db.Column(db.String(20), nullable=False, index=True)
@@ -46,6 +52,7 @@ class HolidayDutyRecord(db.Model):
     amount = db.Column(db.Numeric(15, 2), default=0.0)
     
     # Metadata
+    rule_version = db.Column(db.Integer, nullable=True) # PayRule version that computed the row; 0 = built-in defaults
     is_manual = db.Column(db.Boolean, default=False)
     remarks = db.Column(db.String(255))
     created_at = db.Column(db.DateTime, default=datetime.now)
@@ -0,0 +1,53 @@
+from extensions import db
+from datetime import datetime
+
+class PayRuleVersion(db.Model):
+    """
+    One published rule set. The version is the primary key and is inserted
+    before the set's rules, so two concurrent publishes cannot share a number.
+    """
+    __tablename__ = 'pay_rule_versions'
+
+    version = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    created_at = db.Column(db.DateTime, default=datetime.now)
+
+    def __repr__(self):
+        return f'<PayRuleVersion {self.version}>'
+
+class PayRule(db.Model):
+    """
+    One holiday payment rule. Rules are published as complete, immutable sets
+    under a version number; the highest version is the active one.
+
+    Match keys left empty match anything. section, sub_section and designation
+    match case-insensitively; category matches when it is contained in the
+    employee's category ('worker' matches 'Factory Worker').
+    Each term left empty is taken from the next matching rule by priority.
+    """
+    __tablename__ = 'pay_rules'
+    __table_args__ = (
+        db.Index('ix_pay_rules_version_priority', 'version', 'priority'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, db.ForeignKey('pay_rule_versions.version'), nullable=False)
+    priority = db.Column(db.Integer, nullable=False, default=100) # Lower wins
+
+    # Match keys
+    section = db.Column(db.String(100))
+    sub_section = db.Column(db.String(100))
+    designation = db.Column(db.String(150))
+    category = db.Column(db.String(50))
+
+    # Terms
+    basis = db.Column(db.String(20)) # 'ot', 'daily_basic', 'fixed'
+    amount = db.Column(db.Float) # For basis 'fixed'
+    start_time = db.Column(db.String(5)) # HH:MM; earlier In punches count from here
+    lunch_after_hours = db.Column(db.Float)
+    lunch_deduction_hours = db.Column(db.Float)
+
+    description = db.Column(db.String(255))
+    created_at = db.Column(db.DateTime, default=datetime.now)
+
+    def __repr__(self):
+        return f'<PayRule v{self.version} #{self.priority} {self.basis}>'
@@ -0,0 +1,18 @@
+from extensions import db
+from datetime import datetime
+
+class SyncCheckpoint(db.Model):
+    """Progress of one remote id range in a parallel BioTime backfill."""
+    __tablename__ = 'sync_checkpoints'
+
+    id = db.Column(db.Integer, primary_key=True)
+    range_start = db.Column(db.Integer, nullable=False) # Exclusive lower bound (remote id)
+    range_end = db.Column(db.Integer, nullable=False)   # Inclusive upper bound (remote id)
+    last_id = db.Column(db.Integer, nullable=False)     # Highest remote id written so far
+    status = db.Column(db.String(20), default='pending') # 'pending', 'running', 'done', 'failed'
+    rows_synced = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.now)
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
+
+    def __repr__(self):
+        return f'<SyncCheckpoint ({self.range_start}, {self.range_end}] @ {self.last_id} {self.status}>'
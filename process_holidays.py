@@ -0,0 +1,51 @@
+import os
+# Suppress GLib-GIO warnings on Windows (harmless but noisy)
+os.environ['GIO_USE_VFS'] = 'local'
+os.environ['G_MESSAGES_DEBUG'] = 'none'
+
+import argparse
+import sys
+from datetime import datetime
+from app import app
+from services.holiday_batch import resolve_holidays, HolidayBatch, run_holiday_batch
+
+def parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+def process_holidays(holiday_ids=None, start_date=None, end_date=None, workers=4):
+    """Process several holidays concurrently and print a combined summary."""
+    with app.app_context():
+        holidays = resolve_holidays(holiday_ids, start_date, end_date)
+        if not holidays:
+            print("No holidays found.")
+            return False
+
+        print(f"Processing {len(holidays)} holidays with {workers} workers...")
+        summary = run_holiday_batch(app, HolidayBatch(holidays), workers)
+
+        for h in summary['holidays']:
+            line = f"  {h['holiday_date']}  {h['holiday_name']:<30} {h['status']:<8}"
+            if h['status'] == 'done':
+                line += f" {h['count']} records, {h['rows_per_sec']} rows/s"
+            elif h['error']:
+                line += f" {h['error']}"
+            print(line)
+
+        print(f"Done in {summary['seconds']}s: {summary['processed']} processed, {summary['failed']} failed, "
+              f"{summary['skipped']} skipped, {summary['total_records']} records written.")
+        return summary['failed'] == 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Holiday Duty Manager - Batch Holiday Processing")
+    parser.add_argument("--ids", nargs="+", type=int, help="Holiday ids to process")
+    parser.add_argument("--from", dest="start_date", type=parse_date, help="First date of the range (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end_date", type=parse_date, help="Last date of the range (YYYY-MM-DD)")
+    parser.add_argument("--workers", type=int, default=4, help="Holidays processed in parallel (default: 4)")
+
+    args = parser.parse_args()
+
+    if not args.ids and not (args.start_date and args.end_date):
+        parser.error("either --ids or both --from and --to are required")
+
+    ok = process_holidays(args.ids, args.start_date, args.end_date, args.workers)
+    sys.exit(0 if ok else 1)
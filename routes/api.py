@@ -1,7 +1,7 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app
 from flask_login import login_required
-from services.employee_service import get_distinct_sections, get_distinct_sub_sections, get_distinct_categories
-from models.employee import Employee
+from services.employee_service import get_distinct_sections, get_distinct_sub_sections, get_distinct_categories, lookup_employees
+from services.employee_search import search_employees
 
 api_bp = Blueprint('api', __name__, url_prefix='/api/reports')
 
@@ -27,28 +27,51 @@ def api_categories():
 @api_bp.route('/employees/search')
 @login_required
 def api_search_employees():
-    """Return employees matching a query on Emp_Id or Emp_Name."""
+    """
+    Ranked employee search on Emp_Id prefix and Emp_Name token prefix, served
+    from the in-memory index. Optional: limit, page (1-based) and fuzzy=1/0 for
+    trigram matching (by default only used when nothing else matches).
+    The total number of matches is returned in the X-Total-Count header.
+    """
     query = request.args.get('q', '').strip()
     if not query:
         return jsonify([])
-    
-    if query.isdigit():
-        # Search by exact ID or partial Name
-        employees = Employee.query.filter(
-            (Employee.Emp_Id == int(query)) | (Employee.Emp_Name.like(f'%{query}%'))
-        ).limit(10).all()
-    else:
-        # Search by name only
-        employees = Employee.query.filter(
-            Employee.Emp_Name.like(f'%{query}%')
-        ).limit(10).all()
-    
-    results = []
-    for emp in employees:
-        designation = emp.designation_rel.designation if emp.designation_rel else ""
-        results.append({
-            'id': emp.Emp_Id,
-            'name': emp.Emp_Name,
-            'designation': designation
-        })
-    return jsonify(results)
+
+    max_limit = current_app.config.get('EMPLOYEE_SEARCH_MAX_LIMIT', 50)
+    limit = max(1, min(request.args.get('limit', current_app.config.get('EMPLOYEE_SEARCH_LIMIT', 10), type=int), max_limit))
+    page = max(request.args.get('page', 1, type=int), 1)
+    fuzzy = request.args.get('fuzzy')
+    if fuzzy is not None:
+        fuzzy = fuzzy == '1'
+
+    results, total = search_employees(query, limit=limit, offset=(page - 1) * limit, fuzzy=fuzzy)
+    response = jsonify(results)
+    response.headers['X-Total-Count'] = str(total)
+    return response
+
+@api_bp.route('/employees')
+@login_required
+def api_employees():
+    """
+    Paginated, filterable employee lookup for pickers (e.g. select2 with ajax).
+    Args: q, section, sub_section, category, page (1-based), per_page.
+    """
+    max_limit = current_app.config.get('EMPLOYEE_SEARCH_MAX_LIMIT', 50)
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 30, type=int), 1), max_limit)
+
+    rows, total = lookup_employees(
+        q=request.args.get('q', '').strip(),
+        section=request.args.get('section'),
+        sub_section=request.args.get('sub_section'),
+        category=request.args.get('category'),
+        page=page,
+        per_page=per_page
+    )
+    return jsonify({
+        'results': rows,
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'more': page * per_page < total
+    })
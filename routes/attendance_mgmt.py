@@ -1,9 +1,9 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify
+from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify, current_app
 from flask_login import login_required, current_user
-from services.attendance_service import add_manual_punch
-from services.employee_service import get_employees
+from services.attendance_service import add_manual_punch, add_manual_punches_bulk
 from datetime import datetime
 from routes.auth import admin_required
+from extensions import db
 
 attendance_mgmt_bp = Blueprint('attendance_mgmt', __name__)
 
@@ -33,14 +33,12 @@ def manual_entry():
             
         return redirect(url_for('attendance_mgmt.manual_entry'))
 
-    employees = get_employees()
-    
     # Fetch recent manual entries
     from models.attendance import IClockTransaction
     recent_entries = IClockTransaction.query.filter_by(is_corrected=True).order_by(IClockTransaction.updated_at.desc()).limit(10).all()
     
     today = datetime.now().strftime('%Y-%m-%d')
-    return render_template('manual_attendance.html', employees=employees, today=today, recent_entries=recent_entries)
+    return render_template('manual_attendance.html', today=today, recent_entries=recent_entries)
 
 @attendance_mgmt_bp.route('/attendance/manual/delete/<int:id>', methods=['POST'])
 @login_required
@@ -50,8 +48,14 @@ def delete_manual_punch(id):
     punch = IClockTransaction.query.get(id)
     if punch and punch.is_corrected:
         try:
+            from services.daily_attendance_service import refresh_daily_attendance
+            from services.report_cache import note_manual_punch_change
+            day_key = (punch.emp_code, punch.punch_time.date())
             db.session.delete(punch)
+            db.session.flush()
+            refresh_daily_attendance([day_key])
             db.session.commit()
+            note_manual_punch_change()
             flash('Manual punch deleted successfully.', 'success')
         except Exception as e:
             flash(f'Error deleting punch: {str(e)}', 'danger')
@@ -80,46 +84,40 @@ def get_attendance_status():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@attendance_mgmt_bp.route('/api/attendance/sync_status')
+@login_required
+def get_sync_status():
+    """Lag and throughput published by the sync daemon (sync_data.py --daemon)."""
+    from services.sync_daemon import read_sync_status
+    status = read_sync_status(current_app.config['SYNC_STATUS_FILE'])
+    if status is None:
+        return jsonify({'error': 'Sync daemon status not available'}), 404
+    return jsonify(status)
+
 @attendance_mgmt_bp.route('/api/attendance/missing')
 @login_required
 def get_missing_punches():
     date_str = request.args.get('date')
     if not date_str:
         return jsonify({'error': 'Missing date parameter'}), 400
-        
+
+    # Optional paging; without per_page the whole list is returned
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', type=int)
+
     try:
-        from services.attendance_service import get_attendance_for_date
-        attendance = get_attendance_for_date(date_str)
-        
-        missing_list = []
-        for emp_code, data in attendance.items():
-            has_in = data.get('in_time') is not None
-            has_out = data.get('out_time') is not None
-            
-            # User rule: Only those with exactly one punch are "incomplete"
-            if (has_in and not has_out) or (has_out and not has_in):
-                missing_list.append({
-                    'emp_code': str(emp_code).strip(),
-                    'in_time': data.get('in_time').strftime('%H:%M') if has_in else '',
-                    'out_time': data.get('out_time').strftime('%H:%M') if has_out else '',
-                    'missing_type': 'Missing Out' if has_in else 'Missing In'
-                })
-        
-        employees = get_employees()
-        emp_dict = {str(emp['Emp_Id']).strip(): emp for emp in employees}
-        
-        for item in missing_list:
-            emp_info = emp_dict.get(item['emp_code'])
-            if emp_info:
-                item['emp_name'] = emp_info['Emp_Name']
-                item['section'] = emp_info['Section']
-            else:
-                item['emp_name'] = 'Unknown'
-                item['section'] = 'Unknown'
-                
-        missing_list.sort(key=lambda x: x['emp_code'])
-                
-        return jsonify(missing_list)
+        from services.attendance_service import get_incomplete_attendance
+        missing_list, total = get_incomplete_attendance(
+            date_str,
+            section=request.args.get('section') or None,
+            sub_section=request.args.get('sub_section') or None,
+            category=request.args.get('category') or None,
+            page=page,
+            per_page=per_page
+        )
+        response = jsonify(missing_list)
+        response.headers['X-Total-Count'] = str(total)
+        return response
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -131,27 +129,43 @@ def manual_entry_bulk():
     if not data or not isinstance(data, list):
         return jsonify({'success': False, 'message': 'Invalid data format'}), 400
         
-    try:
-        added_count = 0
-        for entry in data:
-            emp_code = entry.get('emp_code')
-            date_str = entry.get('date')
-            in_time = entry.get('in_time')
-            out_time = entry.get('out_time')
-            
-            if not emp_code or not date_str:
+    # Validate every row first; only valid punches go to the bulk write
+    punches = []
+    results = []
+    for index, entry in enumerate(data):
+        emp_code = entry.get('emp_code')
+        date_str = entry.get('date')
+        if not emp_code or not date_str:
+            results.append({'index': index, 'emp_code': emp_code, 'status': 'skipped', 'message': 'emp_code and date are required'})
+            continue
+        for field in ('in_time', 'out_time'):
+            time_str = entry.get(field)
+            if not time_str:
+                continue
+            try:
+                punch_time = datetime.strptime(f"{date_str} {time_str}", '%Y-%m-%d %H:%M')
+            except ValueError:
+                results.append({'index': index, 'emp_code': emp_code, 'field': field, 'status': 'error',
+                                'message': f'Invalid date/time: {date_str} {time_str}'})
                 continue
-                
-            if in_time:
-                punch_in = datetime.strptime(f"{date_str} {in_time}", '%Y-%m-%d %H:%M')
-                add_manual_punch(emp_code, punch_in)
-                added_count += 1
-                
-            if out_time:
-                punch_out = datetime.strptime(f"{date_str} {out_time}", '%Y-%m-%d %H:%M')
-                add_manual_punch(emp_code, punch_out)
-                added_count += 1
-                
-        return jsonify({'success': True, 'message': f'Successfully updated {added_count} manual punches.'})
+            punches.append((emp_code, punch_time))
+            results.append({'index': index, 'emp_code': emp_code, 'field': field, 'status': None})
+
+    try:
+        written = iter(add_manual_punches_bulk(punches))
     except Exception as e:
+        db.session.rollback()
         return jsonify({'success': False, 'message': str(e)}), 500
+
+    for item in results:
+        if item['status'] is None:
+            outcome = next(written)
+            item.update(status=outcome['status'], id=outcome['id'],
+                        punch_time=outcome['punch_time'].strftime('%Y-%m-%d %H:%M'))
+
+    saved = sum(1 for item in results if item['status'] in ('created', 'updated'))
+    failed = sum(1 for item in results if item['status'] == 'error')
+    message = f'Successfully updated {saved} manual punches.'
+    if failed:
+        message += f' {failed} rows had invalid times.'
+    return jsonify({'success': True, 'message': message, 'results': results})
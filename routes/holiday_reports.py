@@ -1,18 +1,33 @@
-from flask import Blueprint, render_template, request, jsonify, send_file
+from flask import Blueprint, render_template, request, jsonify, current_app, url_for
 from flask_login import login_required
-from services.report_service import compute_payment_sheet, compute_present_status, process_holiday_duty, get_holiday_records
+from services.report_service import compute_payment_sheet, compute_present_status, process_holiday_duty, reprocess_holiday_changes, get_holiday_records, iter_holiday_records
+from services.holiday_batch import resolve_holidays, start_holiday_batch, get_holiday_batch
+from services.excel_export import excel_response, cached_excel_response
+from services.artifact_cache import ArtifactCache, get_artifact_cache, template_version, invalidate_holiday_artifacts
+from services.report_cache import get_report_cache
 from models.holiday import Holiday, HolidayDutyRecord
 from extensions import db
 from datetime import datetime
 from collections import defaultdict
-import io
+from routes.pdf_jobs import pdf_response, cached_pdf_response
 import json
-from weasyprint import HTML
-from openpyxl import Workbook
-from openpyxl.utils import get_column_letter
+import os
 
 holiday_reports_bp = Blueprint('holiday_reports', __name__)
 
+PAYMENT_SHEET_EXCEL_HEADERS = ['SL', 'ID', 'Name', 'Designation', 'Section', 'Gross', 'Basic', 'In Time', 'Out Time', 'Amount', 'Signature']
+
+def _payment_sheet_cache_key(holiday, kind, section, sub_section, category):
+    """Artifact cache key for a finalized holiday's payment sheet; None if it may still change."""
+    if not holiday or holiday.status != 'finalized':
+        return None
+    if kind == 'pdf':
+        version = template_version(os.path.join(current_app.root_path, 'templates', 'payment_sheet_pdf.html'))
+    else:
+        version = '|'.join(PAYMENT_SHEET_EXCEL_HEADERS)
+    filters = {'section': section, 'sub_section': sub_section, 'category': category}
+    return ArtifactCache.make_key(holiday.id, kind, filters, version)
+
 @holiday_reports_bp.route('/reports')
 @login_required
 def reports_page():
@@ -90,17 +105,72 @@ def api_delete_holiday(h_id):
         
     db.session.delete(holiday)
     db.session.commit()
+    invalidate_holiday_artifacts(h_id)
     return jsonify({'message': 'deleted'})
 
 @holiday_reports_bp.route('/api/holidays/<int:h_id>/process', methods=['POST'])
 @login_required
 def api_process_holiday(h_id):
     try:
-        count = process_holiday_duty(h_id)
-        return jsonify({'message': f'Processed {count} records'})
+        result = process_holiday_duty(h_id)
+        return jsonify({
+            'message': f"Processed {result['count']} records in {result['seconds']}s ({result['rows_per_sec']} rows/s written)",
+            **result
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@holiday_reports_bp.route('/api/holidays/<int:h_id>/reprocess', methods=['POST'])
+@login_required
+def api_reprocess_holiday(h_id):
+    try:
+        result = reprocess_holiday_changes(h_id)
+        return jsonify({
+            'message': f"{result['changed']} employees changed: {result['updated']} updated, {result['inserted']} added, "
+                       f"{result['deleted']} removed, {result['kept_manual']} manual records kept",
+            **result
+        })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@holiday_reports_bp.route('/api/holidays/batch_process', methods=['POST'])
+@login_required
+def api_batch_process_holidays():
+    data = request.get_json(silent=True) or {}
+    holiday_ids = data.get('holiday_ids')
+    start_date = data.get('start_date')
+    end_date = data.get('end_date')
+    try:
+        workers = int(data.get('workers') or 4)
+        if holiday_ids:
+            if not isinstance(holiday_ids, list) or not all(str(h).strip().isdigit() for h in holiday_ids):
+                raise ValueError("holiday_ids must be a list of numeric holiday ids")
+            holiday_ids = [int(h) for h in holiday_ids]
+        holidays = resolve_holidays(
+            holiday_ids,
+            datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None,
+            datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
+        )
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+    if not holidays:
+        return jsonify({'error': 'No holidays found'}), 404
+
+    batch = start_holiday_batch(current_app._get_current_object(), holidays, workers)
+    return jsonify({
+        'batch_id': batch.id,
+        'status_url': url_for('holiday_reports.api_batch_status', batch_id=batch.id),
+        **batch.summary()
+    }), 202
+
+@holiday_reports_bp.route('/api/holidays/batch_process/<batch_id>')
+@login_required
+def api_batch_status(batch_id):
+    batch = get_holiday_batch(batch_id)
+    if not batch:
+        return jsonify({'error': 'Batch not found'}), 404
+    return jsonify(batch.summary())
+
 @holiday_reports_bp.route('/api/holidays/<int:h_id>/finalize', methods=['POST'])
 @login_required
 def api_finalize_holiday(h_id):
@@ -126,6 +196,12 @@ def api_present_status():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@holiday_reports_bp.route('/api/reports/cache_stats')
+@login_required
+def api_report_cache_stats():
+    """Hit/miss counters of the shared daily attendance cache."""
+    return jsonify(get_report_cache().stats())
+
 @holiday_reports_bp.route('/reports/payment_sheet/pdf', methods=['POST'])
 @login_required
 def payment_sheet_pdf():
@@ -144,6 +220,15 @@ def payment_sheet_pdf():
     
     # Use snapshot if holiday exists and is processed
     holiday = Holiday.query.filter_by(holiday_date=datetime.strptime(for_date, '%Y-%m-%d').date()).first()
+
+    # Finalized snapshots never change: repeat downloads come straight from disk
+    download_name = f"payment_sheet_{for_date}.pdf"
+    cache_key = _payment_sheet_cache_key(holiday, 'pdf', section, sub_section, category)
+    if cache_key:
+        cached = cached_pdf_response(cache_key, download_name, async_job=bool(data.get('async')))
+        if cached is not None:
+            return cached
+
     if holiday and holiday.processed_at:
         rows = get_holiday_records(holiday.id, section, sub_section, category)
     else:
@@ -162,10 +247,7 @@ def payment_sheet_pdf():
         datetime=datetime
     )
 
-    pdf_buffer = io.BytesIO()
-    HTML(string=html_content, base_url=request.url_root).write_pdf(pdf_buffer)
-    pdf_buffer.seek(0)
-    return send_file(pdf_buffer, as_attachment=False, mimetype='application/pdf')
+    return pdf_response(html_content, download_name, async_job=bool(data.get('async')), cache_key=cache_key)
 
 @holiday_reports_bp.route('/reports/present_status/pdf', methods=['POST'])
 @login_required
@@ -198,10 +280,7 @@ def present_status_pdf():
         datetime=datetime
     )
 
-    pdf_buffer = io.BytesIO()
-    HTML(string=html_content, base_url=request.url_root).write_pdf(pdf_buffer)
-    pdf_buffer.seek(0)
-    return send_file(pdf_buffer, as_attachment=False, mimetype='application/pdf')
+    return pdf_response(html_content, f"present_status_{for_date}.pdf", async_job=bool(data.get('async')))
 
 @holiday_reports_bp.route('/reports/payment_sheet/excel', methods=['POST'])
 @login_required
@@ -217,25 +296,38 @@ def payment_sheet_excel():
     # Use snapshot if holiday exists and is processed
     holiday = Holiday.query.filter_by(holiday_date=datetime.strptime(for_date, '%Y-%m-%d').date()).first()
     if holiday and holiday.processed_at:
-        rows = get_holiday_records(holiday.id, section, sub_section, category)
+        rows = iter_holiday_records(holiday.id, section, sub_section, category)
     else:
-        rows = []
+        rows = iter(())
 
-    wb = Workbook()
-    ws = wb.active
-    ws.title = 'Payment Sheet'
-    headers = ['SL', 'ID', 'Name', 'Designation', 'Section', 'Gross', 'Basic', 'In Time', 'Out Time', 'Amount', 'Signature']
-    ws.append(headers)
-    for r in rows:
-        ws.append([
-            r['sl'], r['id'], r['name'], r['designation'], r['section'], r['gross'], round(r['basic'], 0), r['in_time'], r['out_time'], r['amount'], ''
-        ])
-    
-    for col in range(1, len(headers) + 1):
-        ws.column_dimensions[get_column_letter(col)].width = 16
-
-    buf = io.BytesIO()
-    wb.save(buf)
-    buf.seek(0)
-    return send_file(io.BytesIO(buf.getvalue()), as_attachment=True,
-                     download_name=f'payment_sheet_{for_date}.xlsx', mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+    values = ([
+        r['sl'], r['id'], r['name'], r['designation'], r['section'], r['gross'], round(r['basic'], 0), r['in_time'], r['out_time'], r['amount'], ''
+    ] for r in rows)
+    download_name = f'payment_sheet_{for_date}.xlsx'
+
+    # Finalized snapshots never change: repeat downloads come straight from disk
+    cache_key = _payment_sheet_cache_key(holiday, 'xlsx', section, sub_section, category)
+    if cache_key:
+        return cached_excel_response(get_artifact_cache(current_app.config), cache_key, 'Payment Sheet',
+                                     PAYMENT_SHEET_EXCEL_HEADERS, values, download_name)
+    return excel_response('Payment Sheet', PAYMENT_SHEET_EXCEL_HEADERS, values, download_name)
+
+@holiday_reports_bp.route('/reports/present_status/excel', methods=['POST'])
+@login_required
+def present_status_excel():
+    data = request.get_json(silent=True) or {}
+    for_date = data.get('date')
+    section = data.get('section')
+    sub_section = data.get('sub_section')
+    category = data.get('category')
+    status = data.get('status', 'all')
+    if not for_date:
+        return jsonify({'error': 'date is required'}), 400
+
+    rows = compute_present_status(for_date, section, sub_section, category, status)
+
+    headers = ['SL', 'ID', 'Name', 'Designation', 'Sub Section', 'In Time', 'Out Time', 'Remarks']
+    values = ([
+        r['sl'], r['id'], r['name'], r['designation'], r['sub_section'], r['in_time'], r['out_time'].strip(), r['remarks']
+    ] for r in rows)
+    return excel_response('Present Status', headers, values, f'present_status_{for_date}.xlsx')
@@ -1,11 +1,10 @@
-from flask import Blueprint, render_template, request, jsonify, redirect, url_for, send_file
+from flask import Blueprint, render_template, request, jsonify, redirect, url_for
 from flask_login import login_required, current_user
 from extensions import db
 from models.manual_bill import ManualBill, ManualBillItem
 from datetime import datetime
-import io
+from routes.pdf_jobs import pdf_response
 import json
-from weasyprint import HTML
 
 manual_bill_bp = Blueprint('manual_bill', __name__)
 
@@ -119,7 +118,4 @@ def pdf_bill(bill_id):
         datetime=datetime
     )
 
-    pdf_buffer = io.BytesIO()
-    HTML(string=html_content, base_url=request.url_root).write_pdf(pdf_buffer)
-    pdf_buffer.seek(0)
-    return send_file(pdf_buffer, as_attachment=False, mimetype='application/pdf')
+    return pdf_response(html_content, f"manual_bill_{bill.id}.pdf", async_job=request.args.get('async') == '1')
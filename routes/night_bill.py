@@ -1,11 +1,11 @@
-from flask import Blueprint, render_template, request, jsonify, send_file
+from flask import Blueprint, render_template, request, jsonify
 from flask_login import login_required
-from services.report_service import compute_night_bill
+from services.report_service import compute_night_bill, compute_night_bill_range
+from services.excel_export import excel_response
 from datetime import datetime
 from collections import defaultdict
-import io
+from routes.pdf_jobs import pdf_response
 import json
-from weasyprint import HTML
 
 night_bill_bp = Blueprint('night_bill', __name__)
 
@@ -61,7 +61,101 @@ def night_bill_pdf():
         datetime=datetime
     )
 
-    pdf_buffer = io.BytesIO()
-    HTML(string=html_content, base_url=request.url_root).write_pdf(pdf_buffer)
-    pdf_buffer.seek(0)
-    return send_file(pdf_buffer, as_attachment=False, mimetype='application/pdf')
+    return pdf_response(html_content, f"night_bill_{for_date}.pdf", async_job=bool(data.get('async')))
+
+@night_bill_bp.route('/night_bill/excel', methods=['POST'])
+@login_required
+def night_bill_excel():
+    data = request.get_json(silent=True) or {}
+    for_date = data.get('date')
+    section = data.get('section')
+    sub_section = data.get('sub_section')
+    category = data.get('category')
+    if not for_date:
+        return jsonify({'error': 'date is required'}), 400
+
+    rows = compute_night_bill(for_date, section, sub_section, category)
+
+    headers = ['SL', 'ID', 'Name', 'Designation', 'Section', 'Gross', 'Out Time', 'Hour', 'Rate', 'Rate Type', 'Amount', 'Signature']
+    values = ([
+        r['sl'], r['id'], r['name'], r['designation'], r['section'], r['gross'], r['out_time'], r['hour'], r['rate'], r['rate_type'], r['amount'], ''
+    ] for r in rows)
+    return excel_response('Night Bill', headers, values, f'night_bill_{for_date}.xlsx')
+
+def _range_params(data):
+    """(start_date, end_date, section, sub_section, category) from a range request body."""
+    return (data.get('start_date'), data.get('end_date') or data.get('start_date'),
+            data.get('section'), data.get('sub_section'), data.get('category'))
+
+@night_bill_bp.route('/api/night_bill/range', methods=['POST'])
+@login_required
+def api_night_bill_range():
+    data = request.get_json(silent=True) or {}
+    start_date, end_date, section, sub_section, category = _range_params(data)
+    if not start_date:
+        return jsonify({'error': 'start_date is required'}), 400
+    try:
+        rows, details = compute_night_bill_range(start_date, end_date, section, sub_section, category)
+        return jsonify({
+            'start_date': start_date,
+            'end_date': end_date,
+            'rows': rows,
+            'details': details,
+            'total_amount': sum(r['amount'] for r in rows)
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@night_bill_bp.route('/night_bill/range/pdf', methods=['POST'])
+@login_required
+def night_bill_range_pdf():
+    if request.is_json:
+        data = request.get_json(silent=True) or {}
+    else:
+        form_data = request.form.get('data')
+        data = json.loads(form_data) if form_data else {}
+
+    start_date, end_date, section, sub_section, category = _range_params(data)
+    if not start_date:
+        return jsonify({'error': 'start_date is required'}), 400
+
+    rows, _ = compute_night_bill_range(start_date, end_date, section, sub_section, category)
+
+    grouped_rows = defaultdict(list)
+    for r in rows:
+        sec_name = (r.get('section') or 'All').strip()
+        grouped_rows[sec_name].append(r)
+
+    html_content = render_template(
+        'night_bill_range_pdf.html',
+        start_date=start_date,
+        end_date=end_date,
+        grouped_rows=grouped_rows,
+        datetime=datetime
+    )
+
+    return pdf_response(html_content, f"night_bill_{start_date}_to_{end_date}.pdf", async_job=bool(data.get('async')))
+
+@night_bill_bp.route('/night_bill/range/excel', methods=['POST'])
+@login_required
+def night_bill_range_excel():
+    data = request.get_json(silent=True) or {}
+    start_date, end_date, section, sub_section, category = _range_params(data)
+    if not start_date:
+        return jsonify({'error': 'start_date is required'}), 400
+
+    rows, details = compute_night_bill_range(start_date, end_date, section, sub_section, category)
+
+    # 'detail': one line per night instead of one per employee
+    if data.get('detail'):
+        headers = ['SL', 'Date', 'ID', 'Name', 'Designation', 'Section', 'Gross', 'Out Time', 'Hour', 'Rate', 'Rate Type', 'Amount']
+        values = ([
+            r['sl'], r['date'], r['id'], r['name'], r['designation'], r['section'], r['gross'], r['out_time'], r['hour'], r['rate'], r['rate_type'], r['amount']
+        ] for r in details)
+        return excel_response('Night Bill Detail', headers, values, f'night_bill_detail_{start_date}_to_{end_date}.xlsx')
+
+    headers = ['SL', 'ID', 'Name', 'Designation', 'Section', 'Gross', 'Nights', 'Hour', 'Rate', 'Rate Type', 'Amount', 'Signature']
+    values = ([
+        r['sl'], r['id'], r['name'], r['designation'], r['section'], r['gross'], r['nights'], r['hour'], r['rate'], r['rate_type'], r['amount'], ''
+    ] for r in rows)
+    return excel_response('Night Bill', headers, values, f'night_bill_{start_date}_to_{end_date}.xlsx')
@@ -0,0 +1,39 @@
+from flask import Blueprint, request, jsonify
+from flask_login import login_required
+from routes.auth import admin_required
+from services.pay_rules import list_rules, publish_pay_rules
+from extensions import db
+from sqlalchemy.exc import IntegrityError
+
+pay_rules_bp = Blueprint('pay_rules', __name__)
+
+@pay_rules_bp.route('/api/pay_rules')
+@login_required
+def api_pay_rules():
+    """Rules of the active version, or of ?version=N."""
+    version = request.args.get('version', type=int)
+    try:
+        version, rules = list_rules(version)
+        return jsonify({'version': version, 'rules': rules})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@pay_rules_bp.route('/api/pay_rules', methods=['POST'])
+@login_required
+@admin_required
+def api_publish_pay_rules():
+    """Publishes a complete rule set ({'rules': [...]}) as a new active version."""
+    data = request.get_json(silent=True) or {}
+    try:
+        version = publish_pay_rules(data.get('rules'))
+        db.session.commit()
+        return jsonify({'success': True, 'version': version}), 201
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'Another rule set was published at the same time; reload and try again'}), 409
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
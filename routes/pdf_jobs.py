@@ -0,0 +1,77 @@
+from flask import Blueprint, request, jsonify, send_file, url_for, current_app
+from flask_login import login_required
+from services.pdf_jobs import get_pdf_queue, QueueFullError
+from services.artifact_cache import get_artifact_cache
+import logging
+
+logger = logging.getLogger(__name__)
+
+pdf_jobs_bp = Blueprint('pdf_jobs', __name__)
+
+def _job_accepted(job_id):
+    return jsonify({
+        'job_id': job_id,
+        'status_url': url_for('pdf_jobs.job_status', job_id=job_id),
+        'download_url': url_for('pdf_jobs.job_download', job_id=job_id)
+    }), 202
+
+def cached_pdf_response(cache_key, download_name, async_job=False):
+    """Serves a PDF from the artifact cache, or returns None on a miss."""
+    pdf_path = get_artifact_cache(current_app.config).get(cache_key)
+    if not pdf_path:
+        return None
+    if async_job:
+        return _job_accepted(get_pdf_queue(current_app.config).add_finished(pdf_path, download_name))
+    return send_file(pdf_path, as_attachment=False, mimetype='application/pdf', download_name=download_name)
+
+def pdf_response(html_content, download_name, async_job=False, cache_key=None):
+    """
+    Renders html_content on the PDF worker pool.
+    With async_job the job id is returned at once (202) for polling; this is
+    what the pages use (static/js/pdf_jobs.js). Otherwise the request waits for
+    the worker and streams the PDF back (plain links without JavaScript).
+    With cache_key the finished file is also stored in the artifact cache.
+    """
+    queue = get_pdf_queue(current_app.config)
+    cache = get_artifact_cache(current_app.config) if cache_key else None
+    try:
+        if async_job:
+            job_id, future = queue.submit(html_content, request.url_root, download_name)
+            if cache:
+                def store(f):
+                    if f.exception() is None:
+                        cache.put_file(cache_key, queue.pdf_path(job_id))
+                future.add_done_callback(store)
+            return _job_accepted(job_id)
+        pdf_path = queue.render(html_content, request.url_root, download_name,
+                                timeout=current_app.config.get('PDF_RENDER_TIMEOUT'))
+        if cache:
+            pdf_path = cache.put_file(cache_key, pdf_path)
+    except QueueFullError as e:
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        logger.error(f"Error rendering PDF: {e}")
+        return jsonify({'error': str(e)}), 500
+    return send_file(pdf_path, as_attachment=False, mimetype='application/pdf', download_name=download_name)
+
+@pdf_jobs_bp.route('/pdf_jobs/<job_id>')
+@login_required
+def job_status(job_id):
+    job = get_pdf_queue(current_app.config).status(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    if job['status'] == 'done':
+        job['download_url'] = url_for('pdf_jobs.job_download', job_id=job_id)
+    return jsonify(job)
+
+@pdf_jobs_bp.route('/pdf_jobs/<job_id>/download')
+@login_required
+def job_download(job_id):
+    queue = get_pdf_queue(current_app.config)
+    job = queue.status(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    pdf_path = queue.pdf_path(job_id)
+    if not pdf_path:
+        return jsonify({'error': f"Job is {job['status']}", 'status': job['status']}), 409
+    return send_file(pdf_path, as_attachment=False, mimetype='application/pdf', download_name=job['download_name'])
@@ -1,10 +1,10 @@
-from flask import Blueprint, render_template, request, send_file
+from flask import Blueprint, render_template, request
 from flask_login import login_required
-from services.report_service import compute_security_payment, get_holiday_records
+from services.report_service import compute_security_payment, get_holiday_records, iter_holiday_records
+from services.excel_export import excel_response
 from models.holiday import Holiday
 from datetime import datetime
-import io
-from weasyprint import HTML
+from routes.pdf_jobs import pdf_response
 
 security_payment_bp = Blueprint('security_payment', __name__)
 
@@ -82,7 +82,33 @@ def security_payment_pdf():
         datetime=datetime
     )
 
-    pdf_buffer = io.BytesIO()
-    HTML(string=html_content, base_url=request.url_root).write_pdf(pdf_buffer)
-    pdf_buffer.seek(0)
-    return send_file(pdf_buffer, as_attachment=False, mimetype='application/pdf')
+    return pdf_response(html_content, f"security_payment_{start_date}_to_{end_date}.pdf", async_job=request.args.get('async') == '1')
+
+@security_payment_bp.route('/security_payment/excel')
+@login_required
+def security_payment_excel():
+    today = datetime.today().strftime('%Y-%m-%d')
+    start_date = request.args.get('start_date', today)
+    end_date = request.args.get('end_date', today)
+
+    rows = None
+
+    # Same snapshot rule as the page: a processed holiday serves its stored records
+    if start_date == end_date:
+        try:
+            target_date = datetime.strptime(start_date, '%Y-%m-%d').date()
+            holiday = Holiday.query.filter_by(holiday_date=target_date).first()
+            if holiday and holiday.processed_at:
+                rows = iter_holiday_records(holiday.id, sub_section='Security', include_security=True)
+        except Exception as e:
+            print(f"Error checking holiday snapshot: {e}")
+
+    if rows is None:
+        rows = compute_security_payment(start_date, end_date)
+
+    headers = ['SL', 'ID', 'Name', 'Designation', 'Gross', 'Basic', 'Days', 'In Time', 'Out Time', 'Amount', 'Signature']
+    values = ([
+        r['sl'], r['id'], r['name'], r['designation'], r['gross'], r['basic'], r.get('days_worked', 1), r['in_time'], r['out_time'], r['amount'], ''
+    ] for r in rows)
+    suffix = start_date if start_date == end_date else f'{start_date}_to_{end_date}'
+    return excel_response('Security Payment', headers, values, f'security_payment_{suffix}.xlsx')
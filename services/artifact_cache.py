@@ -0,0 +1,138 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import uuid
+
+logger = logging.getLogger(__name__)
+
+class ArtifactCache:
+    """
+    On-disk cache of rendered report files (PDF/XLSX) for finalized holidays.
+
+    Files are content-addressed by holiday id + kind + filters + template
+    version and are prefixed with the holiday id, so all entries of a holiday
+    can be dropped at once. File mtime doubles as the LRU clock: hits touch it
+    and the oldest files are evicted once the directory exceeds max_bytes.
+    """
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(holiday_id, kind, filters, template_version):
+        """
+        :param kind: artifact type, also used as file extension ('pdf', 'xlsx')
+        :param filters: dict of the request filters (section, sub_section, category)
+        """
+        payload = json.dumps({
+            'filters': {k: (v or '').strip().lower() for k, v in sorted(filters.items())},
+            'template': template_version
+        }, sort_keys=True)
+        digest = hashlib.sha256(payload.encode()).hexdigest()[:32]
+        return f"h{holiday_id}-{digest}.{kind}"
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, key):
+        """Path of the cached file, or None. A hit marks the entry as recently used."""
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put_file(self, key, source_path):
+        """Copies a finished file into the cache and returns the cached path."""
+        with open(source_path, 'rb') as src:
+            return self.put_stream(key, src)
+
+    def put_stream(self, key, fileobj):
+        """Stores a binary file object; the write is atomic so readers never see partial files."""
+        path = self._path(key)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'wb') as dst:
+            shutil.copyfileobj(fileobj, dst)
+        try:
+            os.replace(tmp_path, path)
+        except PermissionError:
+            # Windows: the entry is being served right now, so a concurrent request already stored it
+            os.remove(tmp_path)
+        self._evict()
+        return path
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            total = 0
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith('.tmp'):
+                    continue
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+            if total <= self.max_bytes:
+                return
+            for _, size, path in sorted(entries):
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+    def invalidate_holiday(self, holiday_id):
+        """Drops every cached artifact of a holiday. Returns the number of files removed."""
+        prefix = f"h{holiday_id}-"
+        removed = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.startswith(prefix):
+                try:
+                    os.remove(entry.path)
+                    removed += 1
+                except OSError:
+                    pass
+        if removed:
+            logger.info(f"Invalidated {removed} cached artifacts of holiday {holiday_id}")
+        return removed
+
+_template_versions = {}
+
+def template_version(template_path):
+    """Content hash of a template file, recomputed only when its mtime changes."""
+    mtime = os.path.getmtime(template_path)
+    cached = _template_versions.get(template_path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(template_path, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:16]
+    _template_versions[template_path] = (mtime, digest)
+    return digest
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_artifact_cache(config):
+    """Process-wide cache, created on first use from the app config."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ArtifactCache(config['ARTIFACT_CACHE_DIR'], config['ARTIFACT_CACHE_MAX_BYTES'])
+        return _cache
+
+def invalidate_holiday_artifacts(holiday_id):
+    """Drops a holiday's cached reports; safe to call outside a request."""
+    from flask import current_app
+    try:
+        get_artifact_cache(current_app.config).invalidate_holiday(holiday_id)
+    except (RuntimeError, KeyError, OSError) as e:
+        # No app context/config (e.g. CLI scripts without the cache) or a busy file
+        logger.warning(f"Could not invalidate artifacts of holiday {holiday_id}: {e}")
@@ -0,0 +1,117 @@
+from models.employee import Employee
+from models.section import Section
+from models.sub_section import SubSection
+from extensions import db
+from sqlalchemy import Table, Column, MetaData, String, Integer, cast, text
+from sqlalchemy.exc import SQLAlchemyError
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Lookup strategies, see choose_strategy()
+STRATEGY_JOIN = 'join'
+STRATEGY_IN = 'in'
+STRATEGY_CHUNKED = 'chunked'
+STRATEGY_TEMP_TABLE = 'temp_table'
+
+# Largest ID list sent as a single IN (...); also the chunk size for STRATEGY_CHUNKED
+IN_LIST_MAX = 1000
+
+# From this many IDs they are loaded into a temporary table and joined
+TEMP_TABLE_MIN = 5000
+
+_TEMP_TABLE_NAME = 'tmp_lookup_emp_codes'
+
+def employee_filters(section=None, sub_section=None, category=None):
+    """Filter spec for the join strategy; same matching rules as EmployeeDirectory.filter()."""
+    return {'section': section, 'sub_section': sub_section, 'category': category}
+
+def choose_strategy(emp_ids=None, filters=None):
+    """
+    Picks how an attendance query is restricted to a set of employees.
+
+    - filters given: join the employee/section tables (no ID list at all)
+    - up to IN_LIST_MAX IDs: one IN list
+    - TEMP_TABLE_MIN IDs or more: temporary table join
+    - in between: IN lists of IN_LIST_MAX IDs, one query each
+    """
+    if filters is not None:
+        return STRATEGY_JOIN
+    count = len(emp_ids)
+    if count <= IN_LIST_MAX:
+        return STRATEGY_IN
+    if count >= TEMP_TABLE_MIN:
+        return STRATEGY_TEMP_TABLE
+    return STRATEGY_CHUNKED
+
+def fetch_for_employees(query, emp_code_col, emp_ids=None, filters=None, strategy=None):
+    """
+    Runs an attendance query restricted to a set of employees and returns its rows.
+
+    :param query: Query over a table with an emp_code column (punches or daily summary)
+    :param emp_code_col: that emp_code column
+    :param emp_ids: employee codes to keep (empty or None: no restriction); ignored when filters is given
+    :param filters: employee_filters() spec, resolved in SQL by the join strategy
+    :param strategy: force a strategy instead of choosing by set size
+    :return: list of result rows. With chunking the rows of different chunks
+             are concatenated, so callers must not rely on the query's ORDER BY.
+    """
+    if filters is None:
+        if not emp_ids:
+            return query.all()
+        emp_ids = sorted({str(e).strip() for e in emp_ids})
+
+    strategy = strategy or choose_strategy(emp_ids, filters)
+    if strategy == STRATEGY_JOIN:
+        return _join_rows(query, emp_code_col, filters or {})
+    if strategy == STRATEGY_TEMP_TABLE:
+        try:
+            return _temp_table_rows(query, emp_code_col, emp_ids)
+        except SQLAlchemyError as e:
+            logger.warning(f"Temporary table lookup failed, falling back to chunked IN lists: {e}")
+    return _chunked_rows(query, emp_code_col, emp_ids)
+
+def _join_rows(query, emp_code_col, filters):
+    """Restricts by joining employees (and sections when filtered) instead of listing IDs."""
+    query = query.join(Employee, Employee.Emp_Id == cast(emp_code_col, Integer))
+    section, sub_section, category = filters.get('section'), filters.get('sub_section'), filters.get('category')
+    if section or sub_section:
+        query = query.join(SubSection, SubSection.id == Employee.sub_section_id)
+    if section:
+        query = query.join(Section, Section.id == SubSection.section_id).filter(Section.name == section.strip())
+    if sub_section:
+        query = query.filter(SubSection.name == sub_section.strip())
+    if category:
+        query = query.filter(Employee.Category == category.strip())
+    return query.all()
+
+def _chunked_rows(query, emp_code_col, emp_ids):
+    rows = []
+    for i in range(0, len(emp_ids), IN_LIST_MAX):
+        rows.extend(query.filter(emp_code_col.in_(emp_ids[i:i + IN_LIST_MAX])).all())
+    return rows
+
+def _temp_table_rows(query, emp_code_col, emp_ids):
+    """Loads the IDs into a session temporary table, joins it, then drops it."""
+    table = Table(
+        _TEMP_TABLE_NAME, MetaData(),
+        Column('emp_code', String(20), primary_key=True),
+        prefixes=['TEMPORARY']
+    )
+    # Same connection as the query, so the temporary table is visible to it
+    conn = db.session.connection()
+    table.create(conn)
+    try:
+        conn.execute(table.insert(), [{'emp_code': e} for e in emp_ids])
+        return query.join(table, table.c.emp_code == emp_code_col).all()
+    finally:
+        conn.execute(_drop_temp_table_statement(conn.dialect.name))
+
+def _drop_temp_table_statement(dialect_name):
+    """
+    DROP for the lookup table. On MySQL it must say TEMPORARY: a plain DROP TABLE
+    implicitly commits the caller's transaction (e.g. a summary refresh mid-sync).
+    """
+    if dialect_name == 'mysql':
+        return text(f"DROP TEMPORARY TABLE IF EXISTS {_TEMP_TABLE_NAME}")
+    return text(f"DROP TABLE IF EXISTS {_TEMP_TABLE_NAME}")
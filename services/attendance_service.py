@@ -1,7 +1,78 @@
 from models.attendance import IClockTransaction
+from models.employee import Employee
+from models.designation import Designation
+from models.section import Section
+from models.sub_section import SubSection
+from services.attendance_lookup import fetch_for_employees
 from extensions import db
-from sqlalchemy import func
-from datetime import datetime
+from sqlalchemy import insert, update, select, func, case, cast, extract, or_, and_, Integer
+from datetime import datetime, date, time, timedelta
+
+# Punches before this hour count as In-Time, at or after it as Out-Time
+SESSION_SPLIT_HOUR = 13
+
+def _to_date(value):
+    """Accepts a date, datetime or 'YYYY-MM-DD' string and returns a date."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value).strip(), '%Y-%m-%d').date()
+
+def day_bounds(report_date):
+    """
+    Returns the half-open window [day 00:00, next day 00:00) for a date.
+    Filtering punch_time against these bounds (instead of DATE(punch_time))
+    keeps the predicate sargable so MySQL can use the punch_time indexes.
+    """
+    start = datetime.combine(_to_date(report_date), time.min)
+    return start, start + timedelta(days=1)
+
+def range_bounds(start_date, end_date):
+    """Returns the half-open window covering start_date..end_date inclusive."""
+    start, _ = day_bounds(start_date)
+    _, end = day_bounds(end_date)
+    return start, end
+
+def aggregate_punches(start, end, emp_ids=None):
+    """
+    Per-(employee, day) In/Out summary of the punches in [start, end), computed by the database.
+
+    Conditional aggregation returns one row per employee and day:
+    MIN(punch_time) over the morning punches, MAX(punch_time) over the
+    afternoon punches and COUNT(*), so the result grows with the number of
+    employees rather than the number of punches.
+
+    :return: {(emp_code, date): {'in_time': datetime, 'out_time': datetime, 'punch_count': int}}
+    """
+    morning = extract('hour', IClockTransaction.punch_time) < SESSION_SPLIT_HOUR
+    work_date = func.date(IClockTransaction.punch_time)
+    query = db.session.query(
+        IClockTransaction.emp_code,
+        work_date.label('work_date'),
+        func.min(case((morning, IClockTransaction.punch_time))).label('in_time'),
+        func.max(case((~morning, IClockTransaction.punch_time))).label('out_time'),
+        func.count().label('punch_count')
+    ).filter(
+        IClockTransaction.punch_time >= start,
+        IClockTransaction.punch_time < end
+    )
+
+    summary = {}
+    query = query.group_by(IClockTransaction.emp_code, work_date)
+    for row in fetch_for_employees(query, IClockTransaction.emp_code, emp_ids):
+        key = (str(row.emp_code).strip(), _to_date(row.work_date))
+        entry = summary.get(key)
+        if entry is None:
+            summary[key] = {'in_time': row.in_time, 'out_time': row.out_time, 'punch_count': row.punch_count}
+            continue
+        # Codes differing only by padding fold into one employee
+        if row.in_time is not None and (entry['in_time'] is None or row.in_time < entry['in_time']):
+            entry['in_time'] = row.in_time
+        if row.out_time is not None and (entry['out_time'] is None or row.out_time > entry['out_time']):
+            entry['out_time'] = row.out_time
+        entry['punch_count'] += row.punch_count
+    return summary
 
 def get_attendance_for_date(report_date, emp_ids=None):
     """
@@ -13,94 +84,28 @@ def get_attendance_for_date(report_date, emp_ids=None):
     """
     # In-Time: Earliest punch before 1:00 PM (13:00)
     # Out-Time: Latest punch at or after 1:00 PM (13:00)
-    
-    query = db.session.query(
-        IClockTransaction.emp_code,
-        IClockTransaction.punch_time
-    ).filter(func.date(IClockTransaction.punch_time) == report_date)
-
-    if emp_ids:
-        query = query.filter(IClockTransaction.emp_code.in_(emp_ids))
-    
-    results = query.all()
-
-    attendance_data = {}
-    
-    # Process results to find min before 1 PM and max at/after 1 PM per employee
-    for row in results:
-        eid = str(row.emp_code).strip()
-        punch = row.punch_time
-        
-        if eid not in attendance_data:
-            attendance_data[eid] = {'morning_punches': [], 'afternoon_punches': []}
-        
-        if punch.hour < 13:
-            attendance_data[eid]['morning_punches'].append(punch)
-        else:
-            attendance_data[eid]['afternoon_punches'].append(punch)
+    day_start, day_end = day_bounds(report_date)
+    summary = aggregate_punches(day_start, day_end, emp_ids)
 
-    final_data = {}
-    for eid, data in attendance_data.items():
-        # User Rule: In-Time must be before 1 PM
-        in_time = min(data['morning_punches']) if data['morning_punches'] else None
-        
-        # User Rule: After 1 PM only Out-Time.
-        # Out-Time MUST be at or after 1 PM.
-        out_time = max(data['afternoon_punches']) if data['afternoon_punches'] else None
-
-        final_data[eid] = {
-            'in_time': in_time,
-            'out_time': out_time
-        }
-    
-    return final_data
+    return {
+        eid: {'in_time': data['in_time'], 'out_time': data['out_time']}
+        for (eid, _), data in summary.items()
+    }
 
 def get_attendance_for_range(start_date, end_date, emp_ids=None):
     """
     Fetches attendance records for a date range.
     Returns: {date_str: {emp_code: {'in_time': datetime, 'out_time': datetime}}}
     """
-    query = db.session.query(
-        IClockTransaction.emp_code,
-        IClockTransaction.punch_time
-    ).filter(func.date(IClockTransaction.punch_time) >= start_date) \
-     .filter(func.date(IClockTransaction.punch_time) <= end_date)
-
-    if emp_ids:
-        query = query.filter(IClockTransaction.emp_code.in_(emp_ids))
-    
-    results = query.all()
-
-    # Grouping by date and then by employee
-    # { '2026-02-20': { '123': {'morning': [], 'afternoon': []} } }
-    temp_data = {}
-    
-    for row in results:
-        eid = str(row.emp_code).strip()
-        punch = row.punch_time
-        d_str = punch.strftime('%Y-%m-%d')
-        
-        if d_str not in temp_data:
-            temp_data[d_str] = {}
-        
-        if eid not in temp_data[d_str]:
-            temp_data[d_str][eid] = {'morning': [], 'afternoon': []}
-        
-        if punch.hour < 13:
-            temp_data[d_str][eid]['morning'].append(punch)
-        else:
-            temp_data[d_str][eid]['afternoon'].append(punch)
+    range_start, range_end = range_bounds(start_date, end_date)
+    summary = aggregate_punches(range_start, range_end, emp_ids)
 
     final_data = {}
-    for d_str, emps in temp_data.items():
-        final_data[d_str] = {}
-        for eid, data in emps.items():
-            in_time = min(data['morning']) if data['morning'] else None
-            out_time = max(data['afternoon']) if data['afternoon'] else None
-            final_data[d_str][eid] = {
-                'in_time': in_time,
-                'out_time': out_time
-            }
+    for (eid, work_date), data in summary.items():
+        final_data.setdefault(work_date.strftime('%Y-%m-%d'), {})[eid] = {
+            'in_time': data['in_time'],
+            'out_time': data['out_time']
+        }
     
     return final_data
 
@@ -110,28 +115,37 @@ def add_manual_punch(emp_code, punch_time):
     If a manual punch (is_corrected=True) already exists for the same employee,
     date, and session (Morning < 1PM, Afternoon >= 1PM), it updates it.
     """
-    report_date = punch_time.date()
-    is_morning = punch_time.hour < 13
+    day_start, day_end = day_bounds(punch_time)
+    split = day_start.replace(hour=SESSION_SPLIT_HOUR)
+
+    # Session window: Morning [00:00, 13:00), Afternoon [13:00, next day 00:00)
+    if punch_time < split:
+        session_start, session_end = day_start, split
+    else:
+        session_start, session_end = split, day_end
 
     # Check for existing manual punch in the same session
     existing_query = IClockTransaction.query.filter(
         IClockTransaction.emp_code == emp_code,
-        func.date(IClockTransaction.punch_time) == report_date,
+        IClockTransaction.punch_time >= session_start,
+        IClockTransaction.punch_time < session_end,
         IClockTransaction.is_corrected == True
     )
 
-    if is_morning:
-        existing_query = existing_query.filter(func.hour(IClockTransaction.punch_time) < 13)
-    else:
-        existing_query = existing_query.filter(func.hour(IClockTransaction.punch_time) >= 13)
-
     existing_punch = existing_query.first()
 
+    # Keep the daily summary in step with the punch in the same transaction
+    from services.daily_attendance_service import refresh_daily_attendance
+    from services.report_cache import note_manual_punch_change
+
     if existing_punch:
         # Update existing record
         existing_punch.punch_time = punch_time
-        existing_punch.updated_at = datetime.now()
+        existing_punch.updated_at = db.func.now()
+        db.session.flush()
+        refresh_daily_attendance([(emp_code, punch_time.date())])
         db.session.commit()
+        note_manual_punch_change()
         return existing_punch, "updated"
     else:
         # Create new record
@@ -141,9 +155,162 @@ def add_manual_punch(emp_code, punch_time):
             is_corrected=True
         )
         db.session.add(new_punch)
+        db.session.flush()
+        refresh_daily_attendance([(emp_code, punch_time.date())])
         db.session.commit()
+        note_manual_punch_change()
         return new_punch, "created"
 
+def get_incomplete_attendance(report_date, section=None, sub_section=None, category=None, page=None, per_page=None):
+    """
+    Employees with exactly one session punch on a date (In without Out or Out without In).
+
+    A single grouped aggregate over the day's punches computes the first
+    morning punch and the last afternoon punch per employee; HAVING keeps the
+    employees where exactly one of them is missing. The result is joined to
+    employees, sub-sections and sections in the same statement, so filters and
+    paging are applied by the database.
+
+    :return: (rows, total) where rows are ordered by emp_code
+    """
+    day_start, day_end = day_bounds(report_date)
+    split = day_start.replace(hour=SESSION_SPLIT_HOUR)
+
+    in_time = func.min(case((IClockTransaction.punch_time < split, IClockTransaction.punch_time)))
+    out_time = func.max(case((IClockTransaction.punch_time >= split, IClockTransaction.punch_time)))
+    punches = select(
+        IClockTransaction.emp_code,
+        in_time.label('in_time'),
+        out_time.label('out_time')
+    ).where(
+        IClockTransaction.punch_time >= day_start,
+        IClockTransaction.punch_time < day_end
+    ).group_by(IClockTransaction.emp_code).having(
+        or_(
+            and_(in_time.isnot(None), out_time.is_(None)),
+            and_(in_time.is_(None), out_time.isnot(None))
+        )
+    ).subquery()
+
+    # Filters need the employee; without them unknown codes are still listed
+    outer = not (section or sub_section or category)
+    stmt = select(
+        punches.c.emp_code,
+        punches.c.in_time,
+        punches.c.out_time,
+        Employee.Emp_Name,
+        Designation.designation,
+        SubSection.name.label('sub_section'),
+        Section.name.label('section')
+    ).select_from(punches).join(
+        Employee, Employee.Emp_Id == cast(punches.c.emp_code, Integer), isouter=outer
+    ).join(
+        Designation, Designation.id == Employee.designation_id, isouter=True
+    ).join(
+        SubSection, SubSection.id == Employee.sub_section_id, isouter=not (section or sub_section)
+    ).join(
+        Section, Section.id == SubSection.section_id, isouter=not (section or sub_section)
+    )
+    if section:
+        stmt = stmt.where(Section.name == section)
+    if sub_section:
+        stmt = stmt.where(SubSection.name == sub_section)
+    if category:
+        stmt = stmt.where(Employee.Category == category)
+
+    total = db.session.execute(select(func.count()).select_from(stmt.subquery())).scalar()
+
+    stmt = stmt.order_by(punches.c.emp_code)
+    if per_page:
+        stmt = stmt.limit(per_page).offset((max(page or 1, 1) - 1) * per_page)
+
+    rows = []
+    for r in db.session.execute(stmt):
+        has_in = r.in_time is not None
+        rows.append({
+            'emp_code': str(r.emp_code).strip(),
+            'emp_name': r.Emp_Name or 'Unknown',
+            'designation': r.designation or '',
+            'sub_section': r.sub_section or '',
+            'section': r.section or ('Unknown' if r.Emp_Name is None else ''),
+            'in_time': r.in_time.strftime('%H:%M') if has_in else '',
+            'out_time': r.out_time.strftime('%H:%M') if not has_in else '',
+            'missing_type': 'Missing Out' if has_in else 'Missing In'
+        })
+    return rows, total
+
+def _session_key(emp_code, punch_time):
+    """(emp_code, date, session) where session is 'in' before SESSION_SPLIT_HOUR, else 'out'."""
+    return (str(emp_code).strip(), punch_time.date(), 'in' if punch_time.hour < SESSION_SPLIT_HOUR else 'out')
+
+def add_manual_punches_bulk(punches):
+    """
+    Set-based version of add_manual_punch for many punches at once.
+
+    Existing manual punches for all affected (employee, date, session) keys are
+    read with one query; updates and inserts are then written as two
+    executemany statements, the daily summary is refreshed once, and everything
+    is committed in a single transaction. When the same key appears more than
+    once, the last punch wins and the earlier ones are reported as 'superseded'.
+
+    :param punches: list of (emp_code, punch_time) tuples
+    :return: one result per input, in order: {'emp_code', 'punch_time', 'status', 'id'}
+             with status 'created', 'updated' or 'superseded'
+    """
+    results = [{'emp_code': str(emp_code).strip(), 'punch_time': punch_time, 'status': None, 'id': None}
+               for emp_code, punch_time in punches]
+    if not results:
+        return results
+
+    # 1. Last punch per session key wins
+    latest = {}
+    for i, r in enumerate(results):
+        key = _session_key(r['emp_code'], r['punch_time'])
+        if key in latest:
+            results[latest[key]]['status'] = 'superseded'
+        latest[key] = i
+
+    # 2. One query for every existing manual punch in the affected days
+    emp_codes = {key[0] for key in latest}
+    window_start, _ = day_bounds(min(key[1] for key in latest))
+    _, window_end = day_bounds(max(key[1] for key in latest))
+    existing = {}
+    rows = db.session.query(IClockTransaction.id, IClockTransaction.emp_code, IClockTransaction.punch_time).filter(
+        IClockTransaction.emp_code.in_(emp_codes),
+        IClockTransaction.punch_time >= window_start,
+        IClockTransaction.punch_time < window_end,
+        IClockTransaction.is_corrected == True
+    ).order_by(IClockTransaction.id)
+    for row in rows:
+        existing.setdefault(_session_key(row.emp_code, row.punch_time), row.id)
+
+    # 3. Split into updates and inserts
+    # created_at/updated_at are left to the model's NOW() defaults (database clock)
+    updates = []
+    inserts = []
+    for key, i in latest.items():
+        r = results[i]
+        punch_id = existing.get(key)
+        if punch_id:
+            updates.append({'id': punch_id, 'punch_time': r['punch_time']})
+            r['status'] = 'updated'
+            r['id'] = punch_id
+        else:
+            inserts.append({'emp_code': r['emp_code'], 'punch_time': r['punch_time'], 'is_corrected': True})
+            r['status'] = 'created'
+
+    # 4. Set-based writes, one summary refresh, one commit
+    from services.daily_attendance_service import refresh_daily_attendance
+    from services.report_cache import note_manual_punch_change
+    if updates:
+        db.session.execute(update(IClockTransaction), updates)
+    if inserts:
+        db.session.execute(insert(IClockTransaction), inserts)
+    refresh_daily_attendance({(key[0], key[1]) for key in latest})
+    db.session.commit()
+    note_manual_punch_change()
+    return results
+
 if __name__ == "__main__":
     # To run this standalone, we need to setup the app context
     from app import app
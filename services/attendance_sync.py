@@ -1,7 +1,14 @@
 from models.attendance import IClockTransaction
+from models.sync_checkpoint import SyncCheckpoint
+from services.daily_attendance_service import refresh_daily_attendance, rebuild_daily_attendance
 from extensions import db
-from sqlalchemy import func
+from sqlalchemy import func, select
 import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from flask import current_app
 
 # Define Remote Model locally to isolate BioTime dependency
 class BioTimeTransaction(db.Model):
@@ -18,6 +25,35 @@ logger = logging.getLogger(__name__)
 
 from sqlalchemy.dialects.mysql import insert as mysql_insert
 
+def _write_batch(records, refresh_summary=True):
+    """
+    Writes one batch of remote punches to the local table and refreshes the
+    daily summary for the (employee, day) pairs it touched, then commits.
+    Accepts ORM objects or plain rows exposing id, emp_code and punch_time.
+    """
+    mappings = []
+    touched_days = set()
+    for record in records:
+        mappings.append({
+            'emp_code': record.emp_code,
+            'punch_time': record.punch_time,
+            'sync_id': record.id,
+            'original_punch_time': record.punch_time
+        })
+        touched_days.add((record.emp_code, record.punch_time.date()))
+
+    # Execute bulk insert with ignore
+    stmt = mysql_insert(IClockTransaction).values(mappings)
+    # This will skip duplicates based on sync_id (unique constraint)
+    stmt = stmt.on_duplicate_key_update(sync_id=IClockTransaction.sync_id)
+
+    db.session.execute(stmt)
+
+    # Re-aggregate only the (employee, day) pairs this batch touched
+    if refresh_summary:
+        refresh_daily_attendance(touched_days)
+    db.session.commit()
+
 def sync_attendance(batch_size=1000):
     """
     Synchronizes punch data from BioTimeTransaction (remote) 
@@ -44,26 +80,8 @@ def sync_attendance(batch_size=1000):
             if not new_records:
                 break
 
-            # Use MySQL-specific INSERT IGNORE via prefix_with if using standard insert
-            # Or use on_duplicate_key_update
-            
-            mappings = []
-            for record in new_records:
-                mappings.append({
-                    'emp_code': record.emp_code,
-                    'punch_time': record.punch_time,
-                    'sync_id': record.id,
-                    'original_punch_time': record.punch_time
-                })
-                latest_sync = record.id
-
-            # Execute bulk insert with ignore
-            stmt = mysql_insert(IClockTransaction).values(mappings)
-            # This will skip duplicates based on sync_id (unique constraint)
-            stmt = stmt.on_duplicate_key_update(sync_id=IClockTransaction.sync_id) 
-            
-            db.session.execute(stmt)
-            db.session.commit()
+            _write_batch(new_records)
+            latest_sync = new_records[-1].id
             
             total_synced += len(new_records)
             logger.info(f"Processed {total_synced} records (Latest Sync ID: {latest_sync})")
@@ -79,3 +97,262 @@ def sync_attendance(batch_size=1000):
         db.session.rollback()
         logger.error(f"Error during attendance sync: {str(e)}")
         raise e
+
+class AdaptiveBatchSize:
+    """
+    Tunes the fetch size from observed write times: grows while a batch is
+    written faster than target_seconds, shrinks when it takes longer.
+    """
+    def __init__(self, initial=1000, minimum=200, maximum=20000, target_seconds=0.5):
+        self.current = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_seconds = target_seconds
+
+    def record(self, rows, seconds):
+        if rows < self.current:
+            # Short (final) batch says nothing about throughput
+            return self.current
+        if seconds < self.target_seconds / 2:
+            self.current = min(self.maximum, self.current * 2)
+        elif seconds > self.target_seconds * 2:
+            self.current = max(self.minimum, self.current // 2)
+        return self.current
+
+_END_OF_STREAM = object()
+
+def _stream_remote_punches(engine, start_id, end_id, batch_size, out_queue, stop_event):
+    """
+    Producer: reads (id, emp_code, punch_time) tuples from BioTime through a
+    server-side cursor and hands them over in batches. Runs in its own thread
+    and owns its own remote connection.
+    """
+    try:
+        stmt = select(
+            BioTimeTransaction.id,
+            BioTimeTransaction.emp_code,
+            BioTimeTransaction.punch_time
+        ).where(BioTimeTransaction.id > start_id)
+        if end_id is not None:
+            stmt = stmt.where(BioTimeTransaction.id <= end_id)
+        stmt = stmt.order_by(BioTimeTransaction.id)
+
+        with engine.connect() as conn:
+            result = conn.execution_options(stream_results=True).execute(stmt)
+            while not stop_event.is_set():
+                rows = result.fetchmany(batch_size.current)
+                if not rows:
+                    break
+                # Bounded queue: blocks here while the writer is behind
+                while not stop_event.is_set():
+                    try:
+                        out_queue.put(rows, timeout=1)
+                        break
+                    except queue.Full:
+                        continue
+            if stop_event.is_set():
+                # Drop the connection instead of draining the unread stream
+                conn.invalidate()
+        out_queue.put(_END_OF_STREAM)
+    except Exception as e:
+        out_queue.put(e)
+
+def sync_attendance_streaming(start_id=None, end_id=None, batch_size=None, queue_depth=4, on_batch=None,
+                              refresh_summary=True):
+    """
+    Streaming variant of sync_attendance for large catch-ups.
+
+    A reader thread pulls plain column tuples from the remote bind through a
+    server-side cursor while this thread writes the previous batch locally, so
+    network reads and local writes overlap. The bounded queue caps memory use
+    and the batch size adapts to how fast local writes complete.
+
+    :param start_id: exclusive lower bound on the remote id; defaults to max(sync_id)
+    :param end_id: inclusive upper bound on the remote id (optional)
+    :param batch_size: AdaptiveBatchSize instance (optional)
+    :param queue_depth: maximum number of batches buffered between reader and writer
+    :param on_batch: callback(last_id, rows_in_batch) after each committed batch
+    :param refresh_summary: re-aggregate daily_attendance per batch (backfill defers this)
+    :return: number of records processed
+    """
+    if start_id is None:
+        start_id = db.session.query(func.max(IClockTransaction.sync_id)).scalar() or 0
+    batch_size = batch_size or AdaptiveBatchSize()
+
+    logger.info(f"Streaming sync starting after remote id {start_id}...")
+
+    batches = queue.Queue(maxsize=queue_depth)
+    stop_event = threading.Event()
+    reader = threading.Thread(
+        target=_stream_remote_punches,
+        args=(db.engines['bio_time'], start_id, end_id, batch_size, batches, stop_event),
+        name='biotime-reader',
+        daemon=True
+    )
+
+    started = time.perf_counter()
+    total_synced = 0
+    last_id = start_id
+    reader.start()
+    try:
+        while True:
+            item = batches.get()
+            if item is _END_OF_STREAM:
+                break
+            if isinstance(item, Exception):
+                raise item
+
+            write_started = time.perf_counter()
+            _write_batch(item, refresh_summary=refresh_summary)
+            batch_size.record(len(item), time.perf_counter() - write_started)
+
+            last_id = item[-1].id
+            total_synced += len(item)
+            if on_batch:
+                on_batch(last_id, len(item))
+            logger.info(f"Processed {total_synced} records (Latest Sync ID: {last_id}, next batch {batch_size.current})")
+    except Exception as e:
+        stop_event.set()
+        db.session.rollback()
+        logger.error(f"Error during streaming attendance sync: {str(e)}")
+        raise e
+    finally:
+        stop_event.set()
+        # Unblock a reader waiting on a full queue
+        while reader.is_alive():
+            try:
+                batches.get_nowait()
+            except queue.Empty:
+                reader.join(timeout=0.1)
+
+    elapsed = time.perf_counter() - started
+    rate = total_synced / elapsed if elapsed > 0 else 0
+    logger.info(f"Streaming sync complete. Total processed: {total_synced} in {elapsed:.1f}s ({rate:.0f} rows/s)")
+    return total_synced
+
+def get_unfinished_backfill():
+    """
+    Returns checkpoints of an interrupted backfill, lowest range first.
+    Ranges already 'done' are included: checkpoints are only deleted after the
+    final summary rebuild, so they still need it.
+    """
+    return SyncCheckpoint.query.order_by(SyncCheckpoint.range_start).all()
+
+def plan_backfill(num_ranges):
+    """
+    Splits the remote id space not yet copied locally into num_ranges
+    contiguous (start, end] ranges and records a checkpoint for each.
+    """
+    local_max = db.session.query(func.max(IClockTransaction.sync_id)).scalar() or 0
+    remote_max = db.session.query(func.max(BioTimeTransaction.id)).scalar() or 0
+    if remote_max <= local_max:
+        return []
+
+    span = remote_max - local_max
+    num_ranges = max(1, min(num_ranges, span))
+    step = -(-span // num_ranges)  # ceiling division
+
+    checkpoints = []
+    lower = local_max
+    while lower < remote_max:
+        upper = min(lower + step, remote_max)
+        checkpoints.append(SyncCheckpoint(range_start=lower, range_end=upper, last_id=lower))
+        lower = upper
+    db.session.add_all(checkpoints)
+    db.session.commit()
+    return checkpoints
+
+def _backfill_range(app, checkpoint_id):
+    """Worker: syncs one checkpointed range in its own app context, session and connections."""
+    with app.app_context():
+        try:
+            checkpoint = SyncCheckpoint.query.get(checkpoint_id)
+            checkpoint.status = 'running'
+            db.session.commit()
+
+            def save_progress(last_id, rows):
+                checkpoint.last_id = last_id
+                checkpoint.rows_synced = (checkpoint.rows_synced or 0) + rows
+                db.session.commit()
+
+            # Resume after the last committed batch of this range
+            count = sync_attendance_streaming(
+                start_id=checkpoint.last_id,
+                end_id=checkpoint.range_end,
+                on_batch=save_progress,
+                refresh_summary=False
+            )
+            checkpoint.last_id = checkpoint.range_end
+            checkpoint.status = 'done'
+            db.session.commit()
+            return checkpoint_id, count
+        except Exception:
+            db.session.rollback()
+            SyncCheckpoint.query.filter_by(id=checkpoint_id).update({'status': 'failed'})
+            db.session.commit()
+            raise
+        finally:
+            db.session.remove()
+
+def run_backfill(workers=4, num_ranges=None):
+    """
+    Parallel, resumable initial load from BioTime.
+
+    Resumes an interrupted backfill from its checkpoints, otherwise plans new
+    ranges from max(sync_id) to the remote max(id). Ranges are synced
+    concurrently by a thread pool; each worker uses its own local session and
+    its own remote connection. The daily summary is rebuilt once at the end
+    for the covered dates instead of per batch, so workers never race on it.
+
+    :return: number of records processed
+    """
+    checkpoints = get_unfinished_backfill()
+    if checkpoints:
+        unfinished = sum(1 for c in checkpoints if c.status != 'done')
+        logger.info(f"Resuming backfill: {unfinished} of {len(checkpoints)} ranges unfinished")
+    else:
+        checkpoints = plan_backfill(num_ranges or workers * 4)
+        if not checkpoints:
+            logger.info("Nothing to backfill.")
+            return 0
+        logger.info(f"Planned backfill of {len(checkpoints)} ranges up to remote id {checkpoints[-1].range_end}")
+
+    # Summary bounds cover every range, including those finished before an interruption
+    bounds = (min(c.range_start for c in checkpoints), max(c.range_end for c in checkpoints))
+    checkpoint_ids = [c.id for c in checkpoints if c.status != 'done']
+    app = current_app._get_current_object()
+
+    started = time.perf_counter()
+    total = 0
+    failures = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='backfill') as pool:
+        futures = {pool.submit(_backfill_range, app, cid): cid for cid in checkpoint_ids}
+        for future in as_completed(futures):
+            try:
+                _, count = future.result()
+                total += count
+            except Exception as e:
+                failures.append(futures[future])
+                logger.error(f"Backfill range {futures[future]} failed: {str(e)}")
+
+    elapsed = time.perf_counter() - started
+    rate = total / elapsed if elapsed > 0 else 0
+    logger.info(f"Backfill copied {total} records in {elapsed:.1f}s ({rate:.0f} rows/s)")
+
+    # One summary rebuild for the dates the backfilled ids cover
+    first, last = db.session.query(
+        func.min(IClockTransaction.punch_time),
+        func.max(IClockTransaction.punch_time)
+    ).filter(
+        IClockTransaction.sync_id > bounds[0],
+        IClockTransaction.sync_id <= bounds[1]
+    ).one()
+    if first:
+        rebuild_daily_attendance(first.date(), last.date())
+
+    if failures:
+        raise RuntimeError(f"{len(failures)} backfill ranges failed; re-run --backfill to resume them")
+
+    SyncCheckpoint.query.filter_by(status='done').delete()
+    db.session.commit()
+    return total
@@ -0,0 +1,209 @@
+from models.attendance import IClockTransaction
+from models.daily_attendance import DailyAttendance
+from services.attendance_service import aggregate_punches, day_bounds, _to_date
+from services.attendance_lookup import fetch_for_employees
+from extensions import db
+from sqlalchemy import func, extract
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from datetime import timedelta
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _upsert_summaries(summary):
+    """Writes summaries with a multi-row INSERT ... ON DUPLICATE KEY UPDATE."""
+    if not summary:
+        return
+    mappings = [{
+        'emp_code': eid,
+        'work_date': work_date,
+        'in_time': data['in_time'],
+        'out_time': data['out_time'],
+        'punch_count': data['punch_count']
+    } for (eid, work_date), data in summary.items()]
+
+    stmt = mysql_insert(DailyAttendance).values(mappings)
+    stmt = stmt.on_duplicate_key_update(
+        in_time=stmt.inserted.in_time,
+        out_time=stmt.inserted.out_time,
+        punch_count=stmt.inserted.punch_count,
+        updated_at=func.now()
+    )
+    db.session.execute(stmt)
+
+def refresh_daily_attendance(keys):
+    """
+    Recomputes the summary rows for the given (emp_code, date) keys from raw punches.
+    Only the touched days are read and written. Keys whose punches have all been
+    removed are deleted from the summary. Does not commit; the caller owns the transaction.
+
+    :param keys: iterable of (emp_code, date) tuples
+    :return: number of summary rows written
+    """
+    keys = {(str(eid).strip(), _to_date(d)) for eid, d in keys}
+    if not keys:
+        return 0
+
+    # Group employees by day so each day is read with one indexed range query
+    by_date = {}
+    for eid, work_date in keys:
+        by_date.setdefault(work_date, set()).add(eid)
+
+    summary = {}
+    for work_date, emp_codes in by_date.items():
+        day_start, day_end = day_bounds(work_date)
+        summary.update(aggregate_punches(day_start, day_end, emp_codes))
+
+    _upsert_summaries(summary)
+
+    # Days that no longer have any punch (e.g. a deleted manual entry)
+    for eid, work_date in keys - summary.keys():
+        DailyAttendance.query.filter_by(emp_code=eid, work_date=work_date).delete()
+
+    return len(summary)
+
+def rebuild_daily_attendance(start_date, end_date):
+    """
+    Rebuilds the summary for every employee over a date range, one day at a time.
+    Used for the initial backfill and for repairs. Commits after each day.
+    """
+    current = _to_date(start_date)
+    last = _to_date(end_date)
+    total = 0
+    while current <= last:
+        day_start, day_end = day_bounds(current)
+        summary = aggregate_punches(day_start, day_end)
+
+        DailyAttendance.query.filter_by(work_date=current).delete()
+        _upsert_summaries(summary)
+        db.session.commit()
+
+        total += len(summary)
+        current += timedelta(days=1)
+    logger.info(f"Daily attendance rebuilt: {total} rows from {start_date} to {end_date}")
+    return total
+
+def rebuild_all_daily_attendance():
+    """Rebuilds the summary over the full span of local punch data."""
+    first, last = db.session.query(
+        func.min(IClockTransaction.punch_time),
+        func.max(IClockTransaction.punch_time)
+    ).one()
+    if not first:
+        return 0
+    return rebuild_daily_attendance(first.date(), last.date())
+
+def get_daily_attendance_for_date(report_date, emp_ids=None, filters=None):
+    """
+    Reads In/Out times for a date from the daily summary (one row per employee).
+    Same return shape as attendance_service.get_attendance_for_date.
+
+    :param emp_ids: optional employee codes to restrict to
+    :param filters: optional attendance_lookup.employee_filters() spec, used instead of emp_ids
+    :return: Dictionary {emp_code: {'in_time': datetime, 'out_time': datetime}}
+    """
+    query = db.session.query(
+        DailyAttendance.emp_code,
+        DailyAttendance.in_time,
+        DailyAttendance.out_time
+    ).filter(DailyAttendance.work_date == _to_date(report_date))
+
+    return {
+        row.emp_code: {'in_time': row.in_time, 'out_time': row.out_time}
+        for row in fetch_for_employees(query, DailyAttendance.emp_code, emp_ids, filters)
+    }
+
+def get_daily_attendance_for_range(start_date, end_date, emp_ids=None, filters=None):
+    """
+    Reads In/Out times for a date range from the daily summary.
+    emp_ids and filters restrict the employees as in get_daily_attendance_for_date.
+    Returns: {date_str: {emp_code: {'in_time': datetime, 'out_time': datetime}}}
+    """
+    query = db.session.query(
+        DailyAttendance.emp_code,
+        DailyAttendance.work_date,
+        DailyAttendance.in_time,
+        DailyAttendance.out_time
+    ).filter(
+        DailyAttendance.work_date >= _to_date(start_date),
+        DailyAttendance.work_date <= _to_date(end_date)
+    )
+
+    return _by_date(fetch_for_employees(query, DailyAttendance.emp_code, emp_ids, filters))
+
+def get_daily_attendance_for_dates(dates, emp_ids=None, filters=None):
+    """
+    Like get_daily_attendance_for_range, for a set of individual dates
+    (e.g. holidays months apart) without reading the days in between.
+    """
+    work_dates = sorted({_to_date(d) for d in dates})
+    if not work_dates:
+        return {}
+    query = db.session.query(
+        DailyAttendance.emp_code,
+        DailyAttendance.work_date,
+        DailyAttendance.in_time,
+        DailyAttendance.out_time
+    ).filter(DailyAttendance.work_date.in_(work_dates))
+
+    return _by_date(fetch_for_employees(query, DailyAttendance.emp_code, emp_ids, filters))
+
+def _by_date(rows):
+    """Summary rows grouped as {date_str: {emp_code: {'in_time', 'out_time'}}}, dates ascending."""
+    rows.sort(key=lambda row: row.work_date)
+
+    final_data = {}
+    for row in rows:
+        d_str = row.work_date.strftime('%Y-%m-%d')
+        final_data.setdefault(d_str, {})[row.emp_code] = {
+            'in_time': row.in_time,
+            'out_time': row.out_time
+        }
+    return final_data
+
+def get_daily_attendance_totals(start_date, end_date, emp_ids=None, filters=None):
+    """
+    Per-employee totals over a date range, aggregated by the database.
+
+    One grouped query over the daily summary returns, per employee, the number
+    of days with any punch and the latest In/Out times. Nothing is built per
+    day, so the result and memory use stay the same size however long the range.
+
+    :return: {emp_code: {'days_worked': int, 'last_in': datetime, 'last_out': datetime}}
+    """
+    query = db.session.query(
+        DailyAttendance.emp_code,
+        func.count().label('days_worked'),
+        func.max(DailyAttendance.in_time).label('last_in'),
+        func.max(DailyAttendance.out_time).label('last_out')
+    ).filter(
+        DailyAttendance.work_date >= _to_date(start_date),
+        DailyAttendance.work_date <= _to_date(end_date)
+    ).group_by(DailyAttendance.emp_code)
+
+    return {
+        row.emp_code: {'days_worked': row.days_worked, 'last_in': row.last_in, 'last_out': row.last_out}
+        for row in fetch_for_employees(query, DailyAttendance.emp_code, emp_ids, filters)
+    }
+
+def get_late_out_attendance(start_date, end_date, from_hour, emp_ids=None, filters=None):
+    """
+    Daily summary rows of a date range whose Out-Time is at or after from_hour.
+    Lets night reports skip the (large) majority of days that end earlier.
+
+    :return: rows with emp_code, work_date, in_time, out_time, ordered by work_date
+    """
+    query = db.session.query(
+        DailyAttendance.emp_code,
+        DailyAttendance.work_date,
+        DailyAttendance.in_time,
+        DailyAttendance.out_time
+    ).filter(
+        DailyAttendance.work_date >= _to_date(start_date),
+        DailyAttendance.work_date <= _to_date(end_date),
+        extract('hour', DailyAttendance.out_time) >= from_hour
+    )
+
+    rows = fetch_for_employees(query, DailyAttendance.emp_code, emp_ids, filters)
+    rows.sort(key=lambda row: row.work_date)
+    return rows
@@ -0,0 +1,176 @@
+from models.employee import Employee
+from models.designation import Designation
+from models.section import Section
+from models.sub_section import SubSection
+from services.pay_profile import build_pay_profile, salary_allowance
+from extensions import db
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload
+from types import SimpleNamespace
+import threading
+import time
+
+# How often (seconds) a cached directory re-checks the database version
+VERSION_CHECK_SECONDS = 5
+
+# Designation columns copied into each employee's detached designation snapshot
+DESIGNATION_FIELDS = ('id', 'designation', 'grade', 'attendance_bonus', 'night_bill',
+                      'holiday_bill', 'lunch_bill', 'tiffin_bill', 'actual_ot', 'compliance_ot')
+
+def _key(value):
+    """Index key matching MySQL's case-insensitive, trailing-space-insensitive comparison."""
+    return (value or '').strip().lower()
+
+class EmployeeDirectory:
+    """
+    Immutable in-memory snapshot of all employees with their designation,
+    section and sub-section already resolved.
+
+    Rows have the same shape as employee_service.get_employees() results and are
+    shared between callers, so treat them as read-only.
+    """
+    def __init__(self, employees, version):
+        self.version = version
+        self.employees = employees
+        self.by_id = {}
+        self.by_section = {}
+        self.by_sub_section = {}
+        self.by_category = {}
+
+        for emp in employees:
+            self.by_id[str(emp['Emp_Id'])] = emp
+            self.by_section.setdefault(_key(emp['Section']), []).append(emp)
+            self.by_sub_section.setdefault(_key(emp['Sub_Section']), []).append(emp)
+            self.by_category.setdefault(_key(emp['Category']), []).append(emp)
+
+    def get(self, emp_id):
+        return self.by_id.get(str(emp_id).strip())
+
+    def filter(self, section=None, sub_section=None, category=None):
+        """Employees matching every given filter, ordered by Emp_Id."""
+        criteria = []
+        if section:
+            criteria.append((self.by_section, 'Section', _key(section)))
+        if sub_section:
+            criteria.append((self.by_sub_section, 'Sub_Section', _key(sub_section)))
+        if category:
+            criteria.append((self.by_category, 'Category', _key(category)))
+        if not criteria:
+            return list(self.employees)
+
+        # Start from the smallest matching bucket and check the remaining criteria per row
+        criteria.sort(key=lambda c: len(c[0].get(c[2], ())))
+        index, _, key = criteria[0]
+        candidates = index.get(key, [])
+        rest = criteria[1:]
+        if not rest:
+            return list(candidates)
+        return [emp for emp in candidates if all(_key(emp[field]) == k for _, field, k in rest)]
+
+def _section_checksum():
+    """
+    Hash over every (id, name, section_id) of the section tables, so renames and
+    sub-sections moved to another section are seen. Both tables are small (tens
+    to a few hundred rows), so reading them whole is cheaper than tracking changes.
+    """
+    sections = db.session.execute(select(Section.id, Section.name).order_by(Section.id)).all()
+    sub_sections = db.session.execute(
+        select(SubSection.id, SubSection.name, SubSection.section_id).order_by(SubSection.id)
+    ).all()
+    return hash((tuple(map(tuple, sections)), tuple(map(tuple, sub_sections))))
+
+def _directory_version():
+    """
+    Cheap change signature: row count plus the newest updated_at of employees and
+    designations, a checksum of the section tables and the salary allowance. Any
+    insert, delete or update of an employee, designation, section or sub-section changes it.
+    """
+    stmt = select(
+        select(func.count()).select_from(Employee).scalar_subquery(),
+        select(func.max(Employee.updated_at)).scalar_subquery(),
+        select(func.max(Designation.updated_at)).scalar_subquery()
+    )
+    # The allowance is part of every pay profile, so a new value rebuilds them
+    return tuple(db.session.execute(stmt).one()) + (_section_checksum(), salary_allowance())
+
+def _designation_snapshot(desig):
+    if desig is None:
+        return None
+    return SimpleNamespace(**{field: getattr(desig, field) for field in DESIGNATION_FIELDS})
+
+def _build_directory(version):
+    employees = Employee.query.options(
+        joinedload(Employee.designation_rel),
+        joinedload(Employee.sub_section_rel).joinedload(SubSection.section_rel)
+    ).order_by(Employee.Emp_Id).all()
+
+    result = []
+    for emp in employees:
+        gross_val = float(emp.Gross_Salary or 0)
+        daily_rate = round(gross_val / 30, 2)
+
+        # Merge related data
+        desig_info = emp.designation_rel.designation if emp.designation_rel else ""
+        grade_info = emp.designation_rel.grade if emp.designation_rel else emp.Grade
+
+        sec_info = ""
+        sub_sec_info = ""
+        if emp.sub_section_rel:
+            sub_sec_info = emp.sub_section_rel.name
+            if emp.sub_section_rel.section_rel:
+                sec_info = emp.sub_section_rel.section_rel.name
+
+        result.append({
+            'Emp_Id': emp.Emp_Id,
+            'Emp_Name': emp.Emp_Name,
+            'Designation': desig_info,
+            'Sub_Section': sub_sec_info,
+            'Section': sec_info,
+            'Category': emp.Category,
+            'Grade': grade_info,
+            'Gross_Salary': gross_val,
+            'Daily_Rate': daily_rate,
+            # Detached copy: the cache outlives the session that loaded it
+            'designation_obj': _designation_snapshot(emp.designation_rel)
+        })
+
+    # Salary derivatives and rule flags, shared by all report engines
+    allowance = salary_allowance()
+    for row in result:
+        row['pay_profile'] = build_pay_profile(row, allowance)
+    return EmployeeDirectory(result, version)
+
+_directory = None
+_last_checked = 0.0
+_lock = threading.Lock()
+
+def get_employee_directory():
+    """
+    Returns the process-wide employee directory, rebuilding it when the
+    database version signature has changed. The signature is checked at most
+    every VERSION_CHECK_SECONDS.
+    """
+    global _directory, _last_checked
+
+    directory = _directory
+    now = time.monotonic()
+    if directory is not None and now - _last_checked < VERSION_CHECK_SECONDS:
+        return directory
+
+    version = _directory_version()
+    if directory is not None and directory.version == version:
+        _last_checked = now
+        return directory
+
+    with _lock:
+        if _directory is None or _directory.version != version:
+            _directory = _build_directory(version)
+        _last_checked = now
+        return _directory
+
+def invalidate_employee_directory():
+    """Forces the next lookup to re-check the version (call after bulk employee edits)."""
+    global _last_checked, _directory
+    with _lock:
+        _directory = None
+        _last_checked = 0.0
@@ -0,0 +1,194 @@
+"""
+Bulk employee master import (emp_master_info.csv).
+
+Designation, section and sub-section ids are resolved for the whole file with
+pandas merges, and missing sections and sub-sections are created with one batch
+insert each. The file is then diffed against the employees table so that only
+new or changed employees are upserted, in chunked executemany statements
+through the app's engine, and committed once.
+"""
+from models.employee import Employee
+from models.designation import Designation
+from models.section import Section
+from models.sub_section import SubSection
+from services.employee_directory import invalidate_employee_directory
+from extensions import db
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+import pandas as pd
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_COLUMNS = ['Emp_Id', 'Emp_Name', 'Join_Date', 'Sub_Section', 'Section',
+                    'Gross_Salary', 'Designation', 'Category', 'Grade']
+
+# Employee columns written by the import (Emp_Id is the upsert key)
+EMPLOYEE_FIELDS = ['Emp_Name', 'Join_Date', 'Gross_Salary', 'Category', 'Grade', 'designation_id', 'sub_section_id']
+
+DEFAULT_CHUNK_SIZE = 1000
+
+def _key(series):
+    """Lookup key matching MySQL's case-insensitive, trailing-space-insensitive comparison."""
+    return series.fillna('').astype(str).str.strip().str.lower()
+
+def read_employee_csv(path):
+    """
+    Loads and normalizes the employee master CSV.
+    Raises ValueError when required columns are missing.
+    """
+    df = pd.read_csv(path, sep=',')
+    missing_cols = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing_cols:
+        raise ValueError(f"Missing columns in CSV: {missing_cols}")
+
+    df = df[REQUIRED_COLUMNS].copy()
+    df['Join_Date'] = pd.to_datetime(df['Join_Date'], errors='coerce')
+    df['Gross_Salary'] = pd.to_numeric(df['Gross_Salary'], errors='coerce').fillna(0)
+    return df
+
+def _lookup_frame(rows, columns, key_column):
+    frame = pd.DataFrame(rows, columns=columns)
+    frame[key_column] = _key(frame[columns[1]])
+    return frame
+
+def _resolve_designations(df):
+    """designation_id per row; unknown designations stay empty (they are maintained separately)."""
+    designations = _lookup_frame(db.session.execute(select(Designation.id, Designation.designation)).all(),
+                                 ['designation_id', 'designation'], 'desig_key')
+    designations = designations.drop_duplicates('desig_key', keep='last')[['desig_key', 'designation_id']]
+    return df.merge(designations, on='desig_key', how='left')
+
+def _section_ids():
+    sections = _lookup_frame(db.session.execute(select(Section.id, Section.name)).all(),
+                             ['section_id', 'section_name'], 'section_key')
+    return sections.drop_duplicates('section_key', keep='last')[['section_key', 'section_id']]
+
+def _sub_section_ids():
+    sub_sections = _lookup_frame(db.session.execute(select(SubSection.id, SubSection.name, SubSection.section_id)).all(),
+                                 ['sub_section_id', 'sub_section_name', 'section_id'], 'sub_section_key')
+    sub_sections['section_id'] = sub_sections['section_id'].astype('Int64')
+    return sub_sections.drop_duplicates(['sub_section_key', 'section_id'], keep='last')[
+        ['sub_section_key', 'section_id', 'sub_section_id']]
+
+def _resolve_sections(df):
+    """
+    section_id and sub_section_id per row. Sections and sub-sections that do not
+    exist yet are created with one insert each, named as first seen in the file.
+    Rows with a blank section or sub-section get no sub-section.
+
+    :return: (df, sections created, sub-sections created)
+    """
+    # 1. Sections
+    sections = _section_ids()
+    wanted = df.loc[df['section_key'] != '', ['section_key', 'Section']].drop_duplicates('section_key')
+    new_sections = wanted[~wanted['section_key'].isin(sections['section_key'])]
+    if len(new_sections):
+        db.session.execute(insert(Section), [{'name': name} for name in new_sections['Section'].astype(str).str.strip()])
+        sections = _section_ids()
+    df = df.merge(sections, on='section_key', how='left')
+    df['section_id'] = df['section_id'].astype('Int64')
+
+    # 2. Sub-sections, keyed by (name, section)
+    sub_sections = _sub_section_ids()
+    wanted = df.loc[(df['sub_section_key'] != '') & df['section_id'].notna(),
+                    ['sub_section_key', 'section_id', 'Sub_Section']].drop_duplicates(['sub_section_key', 'section_id'])
+    known = wanted.merge(sub_sections, on=['sub_section_key', 'section_id'], how='left')
+    new_sub_sections = known[known['sub_section_id'].isna()]
+    if len(new_sub_sections):
+        db.session.execute(insert(SubSection), [
+            {'name': name, 'section_id': int(section_id)}
+            for name, section_id in zip(new_sub_sections['Sub_Section'].astype(str).str.strip(),
+                                        new_sub_sections['section_id'])
+        ])
+        sub_sections = _sub_section_ids()
+    df = df.merge(sub_sections, on=['sub_section_key', 'section_id'], how='left')
+    return df, len(new_sections), len(new_sub_sections)
+
+def _normalized(frame):
+    """EMPLOYEE_FIELDS as comparable nullable dtypes (file side and database side alike)."""
+    out = pd.DataFrame({'Emp_Id': frame['Emp_Id'].astype('int64')})
+    for field in ('Emp_Name', 'Category', 'Grade'):
+        out[field] = frame[field].astype('string')
+    out['Join_Date'] = pd.to_datetime(frame['Join_Date'], errors='coerce').dt.normalize()
+    out['Gross_Salary'] = pd.to_numeric(frame['Gross_Salary'], errors='coerce').astype('Float64').round(2)
+    for field in ('designation_id', 'sub_section_id'):
+        out[field] = pd.to_numeric(frame[field], errors='coerce').astype('Int64')
+    return out
+
+def _records(frame):
+    """Rows as plain Python values (None for missing) for the DBAPI."""
+    frame = frame.assign(Join_Date=frame['Join_Date'].dt.date)
+    columns = {c: [None if pd.isna(v) else v for v in frame[c].tolist()] for c in frame.columns}
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+def _upsert_employees(rows):
+    """One executemany INSERT ... ON DUPLICATE KEY UPDATE for a chunk of employee rows."""
+    stmt = mysql_insert(Employee.__table__)
+    stmt = stmt.on_duplicate_key_update({field: stmt.inserted[field] for field in EMPLOYEE_FIELDS})
+    db.session.execute(stmt, rows)
+
+def import_employees(df, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Imports a read_employee_csv() frame. Rows without a numeric Emp_Id are
+    skipped; when an Emp_Id appears more than once the last row wins and the
+    earlier ones count as skipped.
+    Commits once at the end.
+
+    :return: dict with rows, inserted, updated, unchanged, skipped,
+             sections_created, sub_sections_created, unknown_designations and seconds
+    """
+    started = time.perf_counter()
+    total = len(df)
+
+    # 1. Usable rows, last occurrence per employee
+    df = df.assign(Emp_Id=pd.to_numeric(df['Emp_Id'], errors='coerce'))
+    df = df[df['Emp_Id'].notna()].drop_duplicates('Emp_Id', keep='last')
+    df = df.assign(Emp_Id=df['Emp_Id'].astype('int64'), Emp_Name=df['Emp_Name'].fillna(''),
+                   desig_key=_key(df['Designation']), section_key=_key(df['Section']),
+                   sub_section_key=_key(df['Sub_Section']))
+
+    # 2. Lookups for the whole file
+    df = _resolve_designations(df)
+    df, sections_created, sub_sections_created = _resolve_sections(df)
+    unknown = df.loc[(df['desig_key'] != '') & df['designation_id'].isna(), 'Designation']
+    if len(unknown):
+        logger.warning(f"{len(unknown)} employees have designations that do not exist: "
+                       f"{sorted(unknown.astype(str).str.strip().unique())[:10]}")
+
+    # 3. Diff against the table: new, changed, unchanged
+    incoming = _normalized(df)
+    existing = pd.DataFrame(
+        db.session.execute(select(Employee.Emp_Id, *(getattr(Employee, f) for f in EMPLOYEE_FIELDS))).all(),
+        columns=['Emp_Id'] + EMPLOYEE_FIELDS
+    )
+    merged = incoming.merge(_normalized(existing), on='Emp_Id', how='left', suffixes=('', '_old'), indicator=True)
+    is_new = (merged['_merge'] == 'left_only').to_numpy()
+    changed = pd.Series(False, index=merged.index)
+    for field in EMPLOYEE_FIELDS:
+        new, old = merged[field], merged[f'{field}_old']
+        same = (new == old).fillna(False).astype(bool) | (new.isna() & old.isna())
+        changed |= ~same
+    changed = changed.to_numpy() & ~is_new
+
+    # 4. Chunked executemany upserts of new and changed rows, one commit
+    rows = _records(merged.loc[is_new | changed, ['Emp_Id'] + EMPLOYEE_FIELDS])
+    for start in range(0, len(rows), chunk_size):
+        _upsert_employees(rows[start:start + chunk_size])
+    db.session.commit()
+    invalidate_employee_directory()
+
+    inserted = int(is_new.sum())
+    updated = int(changed.sum())
+    return {
+        'rows': total,
+        'inserted': inserted,
+        'updated': updated,
+        'unchanged': len(merged) - inserted - updated,
+        'skipped': total - len(merged),
+        'sections_created': sections_created,
+        'sub_sections_created': sub_sections_created,
+        'unknown_designations': len(unknown),
+        'seconds': round(time.perf_counter() - started, 2)
+    }
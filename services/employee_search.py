@@ -0,0 +1,223 @@
+from services.employee_directory import get_employee_directory
+from bisect import bisect_left, insort
+import heapq
+import re
+import threading
+
+# Fuzzy matches need at least this trigram similarity (shared / union)
+FUZZY_MIN_SIMILARITY = 0.3
+
+# Rank buckets, best first
+RANK_EXACT_ID = 0
+RANK_ID_PREFIX = 1
+RANK_EXACT_NAME = 2
+RANK_NAME_PREFIX = 3
+RANK_TOKEN_PREFIX = 4
+RANK_FUZZY = 5
+
+_TOKEN_RE = re.compile(r'\w+')
+
+def _tokens(text):
+    return _TOKEN_RE.findall((text or '').lower())
+
+def _trigrams(text):
+    """Trigrams of the space-padded, lower-cased text."""
+    padded = f"  {' '.join(_tokens(text))} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class EmployeeSearchIndex:
+    """
+    In-process search index over the employee directory.
+
+    - ID prefix: sorted list of employee id strings, searched with bisect
+    - Name token prefix: sorted (token, emp_id) pairs, searched with bisect
+    - Fuzzy: trigram postings {trigram: set(emp_id)} scored by similarity
+
+    sync() applies only the employees that were added, removed or changed
+    since the last directory version, so a single edit does not rebuild the index.
+    """
+    def __init__(self):
+        self.entries = {}
+        self.ids = []
+        self.tokens = []
+        self.names = []
+        self.trigrams = {}
+        self.order = {}
+        self.directory = None
+        self._lock = threading.Lock()
+
+    def _add(self, emp, sort=True):
+        emp_id = str(emp['Emp_Id'])
+        entry = {
+            'id': emp['Emp_Id'],
+            'name': emp['Emp_Name'] or '',
+            'name_key': (emp['Emp_Name'] or '').strip().lower(),
+            'designation': emp['Designation'] or '',
+            'tokens': sorted(set(_tokens(emp['Emp_Name']))),
+            'trigrams': _trigrams(emp['Emp_Name'])
+        }
+        self.entries[emp_id] = entry
+        if sort:
+            insort(self.ids, emp_id)
+            insort(self.names, (entry['name_key'], emp_id))
+            for token in entry['tokens']:
+                insort(self.tokens, (token, emp_id))
+        else:
+            self.ids.append(emp_id)
+            self.names.append((entry['name_key'], emp_id))
+            self.tokens.extend((token, emp_id) for token in entry['tokens'])
+        for tri in entry['trigrams']:
+            self.trigrams.setdefault(tri, set()).add(emp_id)
+
+    def _remove(self, emp_id):
+        entry = self.entries.pop(emp_id)
+        del self.ids[bisect_left(self.ids, emp_id)]
+        del self.names[bisect_left(self.names, (entry['name_key'], emp_id))]
+        for token in entry['tokens']:
+            del self.tokens[bisect_left(self.tokens, (token, emp_id))]
+        for tri in entry['trigrams']:
+            postings = self.trigrams[tri]
+            postings.discard(emp_id)
+            if not postings:
+                del self.trigrams[tri]
+
+    def sync(self, directory):
+        """Brings the index up to date with a directory snapshot. Returns the number of changed employees."""
+        with self._lock:
+            if directory is self.directory:
+                return 0
+            current = directory.by_id
+            if self.directory is None:
+                # First build: append everything, sort once
+                self.entries, self.ids, self.names, self.tokens, self.trigrams = {}, [], [], [], {}
+                for emp in directory.employees:
+                    self._add(emp, sort=False)
+                self.ids.sort()
+                self.names.sort()
+                self.tokens.sort()
+                self._renumber()
+                self.directory = directory
+                return len(self.entries)
+            changed = 0
+            for emp_id in [e for e in self.entries if e not in current]:
+                self._remove(emp_id)
+                changed += 1
+            for emp_id, emp in current.items():
+                entry = self.entries.get(emp_id)
+                if entry is not None:
+                    if entry['name'] == (emp['Emp_Name'] or '') and entry['designation'] == (emp['Designation'] or ''):
+                        continue
+                    self._remove(emp_id)
+                self._add(emp)
+                changed += 1
+            if changed:
+                self._renumber()
+            self.directory = directory
+            return changed
+
+    def _renumber(self):
+        """Position of each employee in name order; the tie-breaker when ranking."""
+        self.order = {emp_id: i for i, (_, emp_id) in enumerate(self.names)}
+
+    def _prefix_range(self, items, prefix, pairs=False):
+        """Yields items of a sorted list (of strings, or of (string, id) pairs) starting with prefix."""
+        i = bisect_left(items, (prefix,) if pairs else prefix)
+        while i < len(items):
+            value = items[i][0] if pairs else items[i]
+            if not value.startswith(prefix):
+                break
+            yield items[i]
+            i += 1
+
+    def _fuzzy(self, query):
+        """{emp_id: similarity} for names sharing enough trigrams with the query."""
+        query_tris = _trigrams(query)
+        shared = {}
+        for tri in query_tris:
+            for emp_id in self.trigrams.get(tri, ()):
+                shared[emp_id] = shared.get(emp_id, 0) + 1
+        matches = {}
+        for emp_id, count in shared.items():
+            similarity = count / (len(query_tris) + len(self.entries[emp_id]['trigrams']) - count)
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                matches[emp_id] = similarity
+        return matches
+
+    def search(self, query, limit=10, offset=0, fuzzy=None, allowed=None):
+        """
+        Ranked search on employee id and name.
+
+        :param fuzzy: True to always add trigram matches, False to never,
+                      None to use them only when nothing else matches
+        :param allowed: optional set of emp_id strings to restrict the results to
+        :return: (page of result dicts with id, name, designation, total matches)
+        """
+        q = (query or '').strip().lower()
+        if not q:
+            return [], 0
+
+        with self._lock:
+            ranks = {}
+
+            def offer(emp_id, rank):
+                if rank < ranks.get(emp_id, RANK_FUZZY + 1):
+                    ranks[emp_id] = rank
+
+            # 1. Employee id: exact, then prefix
+            if q.isdigit():
+                for emp_id in self._prefix_range(self.ids, q):
+                    offer(emp_id, RANK_EXACT_ID if emp_id == q else RANK_ID_PREFIX)
+
+            # 2. Name: every query token must prefix some token of the name
+            query_tokens = _tokens(q)
+            if query_tokens:
+                candidates = None
+                for token in query_tokens:
+                    hits = {emp_id for _, emp_id in self._prefix_range(self.tokens, token, pairs=True)}
+                    candidates = hits if candidates is None else candidates & hits
+                    if not candidates:
+                        break
+                if candidates:
+                    for emp_id in candidates:
+                        if emp_id not in ranks:
+                            ranks[emp_id] = RANK_TOKEN_PREFIX
+                    # Whole-name prefix matches are a contiguous range of the sorted names
+                    for name_key, emp_id in self._prefix_range(self.names, q, pairs=True):
+                        offer(emp_id, RANK_EXACT_NAME if name_key == q else RANK_NAME_PREFIX)
+
+            # 3. Optional trigram fuzzy matching for typos and mid-word fragments
+            if fuzzy or (fuzzy is None and not ranks and len(q) >= 3):
+                # Fuzzy matches order by similarity first, then by name
+                similarity = self._fuzzy(q)
+                for emp_id in similarity:
+                    offer(emp_id, RANK_FUZZY)
+            else:
+                similarity = {}
+
+            if allowed is not None:
+                ranks = {emp_id: rank for emp_id, rank in ranks.items() if emp_id in allowed}
+
+            # Only the requested page needs ordering, not every match
+            order = self.order
+            top = heapq.nsmallest(offset + limit, ranks,
+                                  key=lambda e: (ranks[e], -similarity.get(e, 0), order[e]))
+            entries = self.entries
+            page = []
+            for emp_id in top[offset:]:
+                entry = entries[emp_id]
+                page.append({'id': entry['id'], 'name': entry['name'], 'designation': entry['designation']})
+            return page, len(ranks)
+
+_index = EmployeeSearchIndex()
+
+def search_employees(query, limit=10, offset=0, fuzzy=None, section=None, sub_section=None, category=None):
+    """
+    Searches the employee index after syncing it with the current directory version.
+    Optional section/sub_section/category filters narrow the ranked results.
+    """
+    directory = get_employee_directory()
+    _index.sync(directory)
+    allowed = None
+    if section or sub_section or category:
+        allowed = {str(emp['Emp_Id']) for emp in directory.filter(section, sub_section, category)}
+    return _index.search(query, limit=limit, offset=offset, fuzzy=fuzzy, allowed=allowed)
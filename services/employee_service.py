@@ -2,61 +2,43 @@ from models.employee import Employee
 from models.section import Section
 from models.sub_section import SubSection
 from extensions import db
+from services.employee_directory import get_employee_directory
+from services.employee_search import search_employees
 from sqlalchemy import distinct
-from sqlalchemy.orm import joinedload
 
 def get_employees(section=None, sub_section=None, category=None):
     """
     Fetches employees based on optional section, sub_section and category filters.
+    Served from the in-memory employee directory; the returned dicts are shared
+    with other callers and must not be modified.
     """
-    query = Employee.query
-    
-    # Efficiently fetch relationships
-    query = query.options(
-        joinedload(Employee.designation_rel),
-        joinedload(Employee.sub_section_rel).joinedload(SubSection.section_rel)
-    )
+    return get_employee_directory().filter(section=section, sub_section=sub_section, category=category)
 
-    if section:
-        # Filter by Parent Section Name
-        query = query.join(Employee.sub_section_rel).join(SubSection.section_rel).filter(Section.name == section)
-    if sub_section:
-        # Filter by SubSection Name
-        query = query.join(Employee.sub_section_rel).filter(SubSection.name == sub_section)
-    if category:
-        query = query.filter(Employee.Category == category)
-    
-    employees = query.order_by(Employee.Emp_Id).all()
-    
-    result = []
-    for emp in employees:
-        gross_val = float(emp.Gross_Salary or 0)
-        daily_rate = round(gross_val / 30, 2)
-        
-        # Merge related data
-        desig_info = emp.designation_rel.designation if emp.designation_rel else ""
-        grade_info = emp.designation_rel.grade if emp.designation_rel else emp.Grade
-        
-        sec_info = ""
-        sub_sec_info = ""
-        if emp.sub_section_rel:
-            sub_sec_info = emp.sub_section_rel.name
-            if emp.sub_section_rel.section_rel:
-                sec_info = emp.sub_section_rel.section_rel.name
+def lookup_employees(q=None, section=None, sub_section=None, category=None, page=1, per_page=30):
+    """
+    One page of employees for pickers: ranked search results when q is given,
+    otherwise the filtered directory in Emp_Id order.
+
+    :return: (rows with id, name, designation, section; total matches)
+    """
+    offset = (page - 1) * per_page
+    if q:
+        hits, total = search_employees(q, limit=per_page, offset=offset,
+                                       section=section, sub_section=sub_section, category=category)
+        directory = get_employee_directory()
+        employees = [directory.get(hit['id']) for hit in hits]
+    else:
+        matches = get_employees(section=section, sub_section=sub_section, category=category)
+        total = len(matches)
+        employees = matches[offset:offset + per_page]
 
-        result.append({
-            'Emp_Id': emp.Emp_Id,
-            'Emp_Name': emp.Emp_Name,
-            'Designation': desig_info,
-            'Sub_Section': sub_sec_info,
-            'Section': sec_info,
-            'Category': emp.Category,
-            'Grade': grade_info,
-            'Gross_Salary': gross_val,
-            'Daily_Rate': daily_rate,
-            'designation_obj': emp.designation_rel
-        })
-    return result
+    rows = [{
+        'id': emp['Emp_Id'],
+        'name': emp['Emp_Name'],
+        'designation': emp['Designation'],
+        'section': emp['Section']
+    } for emp in employees if emp]
+    return rows, total
 
 def get_distinct_sections():
     """Returns a list of distinct sections from the new Section table."""
@@ -78,7 +60,7 @@ def get_distinct_categories():
 
 def get_employee_count():
     """Returns the total number of employees."""
-    return Employee.query.count()
+    return len(get_employee_directory().employees)
 
 def get_section_count():
     """Returns the count of distinct sub-sections."""
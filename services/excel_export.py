@@ -0,0 +1,49 @@
+from flask import send_file
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+import tempfile
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+def write_excel(sheet_title, headers, rows, column_width=16):
+    """
+    Streams rows into a write-only workbook and returns the saved file.
+
+    Write-only mode serialises each row as it is appended instead of keeping
+    a cell object model, and the workbook is saved straight to a temporary
+    file, so memory stays flat no matter how many rows the generator yields.
+
+    :param rows: iterable (typically a generator) of row value lists
+    :return: temporary file object positioned at the start
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=sheet_title)
+
+    # Column widths must be set before the first row in write-only mode
+    for col in range(1, len(headers) + 1):
+        ws.column_dimensions[get_column_letter(col)].width = column_width
+
+    ws.append(headers)
+    for row in rows:
+        ws.append(row)
+
+    out = tempfile.TemporaryFile(suffix='.xlsx')
+    wb.save(out)
+    out.seek(0)
+    return out
+
+def excel_response(sheet_title, headers, rows, download_name):
+    """Builds the workbook and sends the temporary file itself, with no in-memory copy."""
+    return send_file(write_excel(sheet_title, headers, rows), as_attachment=True,
+                     download_name=download_name, mimetype=XLSX_MIMETYPE)
+
+def cached_excel_response(cache, cache_key, sheet_title, headers, rows, download_name):
+    """
+    Like excel_response, but serves the workbook from the artifact cache when
+    present. Rows should be a lazy generator so a hit never touches the database.
+    """
+    path = cache.get(cache_key)
+    if not path:
+        with write_excel(sheet_title, headers, rows) as out:
+            path = cache.put_stream(cache_key, out)
+    return send_file(path, as_attachment=True, download_name=download_name, mimetype=XLSX_MIMETYPE)
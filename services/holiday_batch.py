@@ -0,0 +1,149 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from models.holiday import Holiday
+from services.employee_service import get_employees
+from services.daily_attendance_service import get_daily_attendance_for_dates
+from services.report_service import process_holiday_duty, _db_now
+from extensions import db
+import logging
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+def resolve_holidays(holiday_ids=None, start_date=None, end_date=None):
+    """Holidays selected by id list or by date range (inclusive), in date order."""
+    query = Holiday.query
+    if holiday_ids:
+        query = query.filter(Holiday.id.in_([int(h) for h in holiday_ids]))
+    elif start_date and end_date:
+        query = query.filter(Holiday.holiday_date.between(start_date, end_date))
+    else:
+        raise ValueError("Either holiday_ids or start_date and end_date are required")
+    return query.order_by(Holiday.holiday_date).all()
+
+class HolidayBatch:
+    """
+    Progress and results of one multi-holiday processing run.
+    Updated by worker threads, read by the status endpoint.
+    """
+    def __init__(self, holidays):
+        self.id = uuid.uuid4().hex
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.finished_at = None
+        self.seconds = None
+        self._lock = threading.Lock()
+        self.holidays = {}
+        for h in holidays:
+            skipped = h.status == 'finalized'
+            self.holidays[h.id] = {
+                'holiday_id': h.id,
+                'holiday_date': h.holiday_date.strftime('%Y-%m-%d'),
+                'holiday_name': h.holiday_name,
+                'status': 'skipped' if skipped else 'queued',
+                'error': 'Holiday is finalized' if skipped else None,
+                'count': None,
+                'seconds': None,
+                'write_seconds': None,
+                'rows_per_sec': None
+            }
+
+    def pending_ids(self):
+        return [hid for hid, p in self.holidays.items() if p['status'] == 'queued']
+
+    def update(self, holiday_id, **fields):
+        with self._lock:
+            self.holidays[holiday_id].update(fields)
+
+    def summary(self):
+        """Combined view: per-holiday progress plus totals."""
+        with self._lock:
+            items = [dict(p) for p in self.holidays.values()]
+        counts = {}
+        for p in items:
+            counts[p['status']] = counts.get(p['status'], 0) + 1
+        return {
+            'batch_id': self.id,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'seconds': self.seconds,
+            'done': self.finished_at is not None,
+            'total': len(items),
+            'processed': counts.get('done', 0),
+            'failed': counts.get('failed', 0),
+            'skipped': counts.get('skipped', 0),
+            'running': counts.get('running', 0),
+            'queued': counts.get('queued', 0),
+            'total_records': sum(p['count'] or 0 for p in items),
+            'holidays': items
+        }
+
+def run_holiday_batch(app, batch, workers=4):
+    """
+    Processes every queued holiday of the batch on a thread pool.
+
+    The employee list and the attendance of the holiday dates are loaded
+    once up front and shared by all workers (both are read-only); each worker
+    only writes its own holiday snapshot in its own app context/session.
+    Must be called inside an app context.
+    """
+    started = time.perf_counter()
+    pending = batch.pending_ids()
+    if pending:
+        # 1. Shared inputs: one employee load, one attendance read of just the holiday dates.
+        # The re-process watermark is taken before that read, so later changes are not missed
+        read_at = _db_now()
+        employees = get_employees()
+        dates = [batch.holidays[hid]['holiday_date'] for hid in pending]
+        attendance_by_date = get_daily_attendance_for_dates(dates)
+
+        def work(holiday_id):
+            progress = batch.holidays[holiday_id]
+            batch.update(holiday_id, status='running')
+            with app.app_context():
+                try:
+                    result = process_holiday_duty(
+                        holiday_id,
+                        employees=employees,
+                        attendance_data=attendance_by_date.get(progress['holiday_date'], {}),
+                        read_at=read_at
+                    )
+                    batch.update(holiday_id, status='done', **result)
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"Holiday {holiday_id} failed: {e}")
+                    batch.update(holiday_id, status='failed', error=str(e))
+
+        # 2. Process holidays concurrently
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(pending)))) as pool:
+            list(pool.map(work, pending))
+
+    batch.seconds = round(time.perf_counter() - started, 3)
+    batch.finished_at = datetime.now().isoformat(timespec='seconds')
+    return batch.summary()
+
+# Recent batches by id, for the progress endpoint (kept in memory only).
+# Shared by the server's request threads, so every access holds _batches_lock.
+_batches = {}
+_batches_lock = threading.Lock()
+MAX_TRACKED_BATCHES = 20
+
+def start_holiday_batch(app, holidays, workers=4):
+    """Starts a batch in a background thread and returns it immediately."""
+    batch = HolidayBatch(holidays)
+    with _batches_lock:
+        _batches[batch.id] = batch
+        while len(_batches) > MAX_TRACKED_BATCHES:
+            _batches.pop(next(iter(_batches)))
+
+    def run():
+        with app.app_context():
+            run_holiday_batch(app, batch, workers)
+
+    threading.Thread(target=run, name=f"holiday-batch-{batch.id[:8]}", daemon=True).start()
+    return batch
+
+def get_holiday_batch(batch_id):
+    with _batches_lock:
+        return _batches.get(batch_id)
@@ -0,0 +1,48 @@
+"""
+Per-employee pay profile: salary derivatives and rule flags used by every
+report engine, computed once when the employee directory is built instead of
+on every report call.
+"""
+from flask import current_app, has_app_context
+from services.pay_rules import rule_key
+from types import SimpleNamespace
+
+# Fixed allowances deducted from gross before the basic split (Basic = (Gross - allowance) / 1.5)
+DEFAULT_SALARY_ALLOWANCE = 2450
+
+def salary_allowance():
+    """SALARY_ALLOWANCE from the app config, or the default outside an app context."""
+    if has_app_context():
+        return float(current_app.config.get('SALARY_ALLOWANCE', DEFAULT_SALARY_ALLOWANCE))
+    return float(DEFAULT_SALARY_ALLOWANCE)
+
+def build_pay_profile(emp, allowance=None):
+    """
+    Pay profile for one employee row (get_employees() shape).
+
+    - gross, basic, daily_basic, ot_rate (per OT hour, double the basic hourly rate)
+    - is_worker: category contains 'worker' (OT-based night bill)
+    - is_security: section or sub-section is Security
+    - rule_key: dispatch key into the holiday pay rules (services.pay_rules)
+    """
+    if allowance is None:
+        allowance = salary_allowance()
+    gross = float(emp.get('Gross_Salary') or 0)
+    basic = (gross - allowance) / 1.5
+    key = rule_key(emp.get('Section'), emp.get('Sub_Section'), emp.get('Designation'), emp.get('Category'))
+    section, sub_section, _, category = key
+
+    return SimpleNamespace(
+        gross=gross,
+        basic=basic,
+        daily_basic=basic / 30.0,
+        ot_rate=(basic / 208.0) * 2.0,
+        is_worker='worker' in category,
+        is_security=section == 'security' or sub_section == 'security',
+        rule_key=key
+    )
+
+def get_pay_profile(emp):
+    """The profile materialized by the employee directory, or a fresh one for rows built elsewhere."""
+    profile = emp.get('pay_profile')
+    return profile if profile is not None else build_pay_profile(emp)
@@ -0,0 +1,197 @@
+"""
+Holiday payment rules stored as data (models.pay_rule.PayRule).
+
+A rule set is compiled into a dispatch table keyed by the employee's
+(section, sub_section, designation, category). Each distinct key is resolved
+against the rules once; evaluating an employee is then a dict lookup that
+returns the terms (pay basis, fixed amount, start time, lunch deduction) the
+payment engines apply with plain arithmetic.
+"""
+from models.pay_rule import PayRule, PayRuleVersion
+from extensions import db
+from flask import has_app_context
+from sqlalchemy import func, insert
+from types import SimpleNamespace
+import re
+import threading
+
+BASIS_OT = 'ot'                   # Whole duration paid as OT, both punches required
+BASIS_DAILY_BASIC = 'daily_basic' # One daily basic, one punch is enough
+BASIS_FIXED = 'fixed'             # Fixed amount regardless of punches
+BASES = (BASIS_OT, BASIS_DAILY_BASIC, BASIS_FIXED)
+
+MATCH_KEYS = ('section', 'sub_section', 'designation', 'category')
+TERMS = ('basis', 'amount', 'start_time', 'lunch_after_hours', 'lunch_deduction_hours')
+
+# Terms used when no rule sets them
+FALLBACK_TERMS = {
+    'basis': BASIS_DAILY_BASIC,
+    'amount': None,
+    'start_time': '08:00',
+    'lunch_after_hours': 6.0,
+    'lunch_deduction_hours': 1.0
+}
+
+# The rules the payment sheet used before they were stored as data; seeded as version 1
+DEFAULT_PAY_RULES = [
+    {'priority': 10, 'sub_section': 'loader', 'basis': BASIS_FIXED, 'amount': 500, 'description': 'Loaders: fixed 500'},
+    {'priority': 20, 'designation': 'checker', 'basis': BASIS_FIXED, 'amount': 350, 'description': 'Checkers: fixed 350'},
+    {'priority': 20, 'designation': 'peon', 'basis': BASIS_FIXED, 'amount': 350, 'description': 'Peons: fixed 350'},
+    {'priority': 20, 'designation': 'canteen boy', 'basis': BASIS_FIXED, 'amount': 350, 'description': 'Canteen boys: fixed 350'},
+    {'priority': 50, 'sub_section': 'cleaner', 'start_time': '07:30', 'description': 'Cleaners start at 7:30'},
+    {'priority': 60, 'category': 'worker', 'basis': BASIS_OT, 'description': 'Workers: whole duration as OT'},
+    {'priority': 100, 'basis': BASIS_DAILY_BASIC, 'start_time': '08:00', 'lunch_after_hours': 6,
+     'lunch_deduction_hours': 1, 'description': 'Everyone else: one daily basic; 1h lunch from 6h'},
+]
+
+_TIME_RE = re.compile(r'^([01]\d|2[0-3]):([0-5]\d)$')
+
+def _clean(value):
+    return (value or '').strip().lower()
+
+def rule_key(section, sub_section, designation, category):
+    """Dispatch key of an employee; see pay_profile.build_pay_profile()."""
+    return (_clean(section), _clean(sub_section), _clean(designation), _clean(category))
+
+def validate_rule(rule):
+    """Normalized copy of a rule dict. Raises ValueError when it is not usable."""
+    clean = {'priority': int(rule.get('priority', 100)), 'description': rule.get('description') or None}
+    for key in MATCH_KEYS:
+        clean[key] = _clean(rule.get(key)) or None
+
+    basis = rule.get('basis') or None
+    if basis is not None and basis not in BASES:
+        raise ValueError(f"basis must be one of {', '.join(BASES)}")
+    clean['basis'] = basis
+
+    amount = rule.get('amount')
+    clean['amount'] = float(amount) if amount not in (None, '') else None
+    if basis == BASIS_FIXED and clean['amount'] is None:
+        raise ValueError("A fixed-basis rule needs an amount")
+
+    start_time = rule.get('start_time') or None
+    if start_time is not None and not _TIME_RE.match(start_time):
+        raise ValueError(f"start_time must be HH:MM, got {start_time!r}")
+    clean['start_time'] = start_time
+
+    for key in ('lunch_after_hours', 'lunch_deduction_hours'):
+        value = rule.get(key)
+        clean[key] = float(value) if value not in (None, '') else None
+    return clean
+
+class PayRuleSet:
+    """
+    Compiled, read-only view of one rule version.
+
+    terms(key) resolves a dispatch key on first use and memoizes it, so the
+    table ends up with one entry per distinct employee profile.
+    """
+    def __init__(self, version, rules):
+        self.version = version
+        self.rules = sorted((validate_rule(r) for r in rules), key=lambda r: r['priority'])
+        self._table = {}
+
+    def _matches(self, rule, key):
+        section, sub_section, designation, category = key
+        return ((rule['section'] is None or rule['section'] == section) and
+                (rule['sub_section'] is None or rule['sub_section'] == sub_section) and
+                (rule['designation'] is None or rule['designation'] == designation) and
+                (rule['category'] is None or rule['category'] in category))
+
+    def _resolve(self, key):
+        """Every term from the strongest matching rule that sets it."""
+        terms = {}
+        for rule in self.rules:
+            if not self._matches(rule, key):
+                continue
+            for term in TERMS:
+                if term not in terms and rule[term] is not None:
+                    terms[term] = rule[term]
+        for term, value in FALLBACK_TERMS.items():
+            terms.setdefault(term, value)
+
+        start_h, start_m = (int(p) for p in terms['start_time'].split(':'))
+        return SimpleNamespace(
+            basis=terms['basis'],
+            amount=terms['amount'] if terms['amount'] is not None else 0.0,
+            start_hour=start_h,
+            start_minute=start_m,
+            lunch_after_hours=float(terms['lunch_after_hours']),
+            lunch_deduction_hours=float(terms['lunch_deduction_hours'])
+        )
+
+    def terms(self, key):
+        terms = self._table.get(key)
+        if terms is None:
+            terms = self._table[key] = self._resolve(key)
+        return terms
+
+# Compiled sets by version; version 0 is DEFAULT_PAY_RULES (no rules in the database)
+_rule_sets = {}
+_lock = threading.Lock()
+
+def _compiled(version, load_rules):
+    rule_set = _rule_sets.get(version)
+    if rule_set is None:
+        with _lock:
+            rule_set = _rule_sets.get(version)
+            if rule_set is None:
+                rule_set = _rule_sets[version] = PayRuleSet(version, load_rules())
+    return rule_set
+
+def active_rule_version():
+    """Highest published version, 0 when nothing has been published."""
+    return db.session.query(func.max(PayRuleVersion.version)).scalar() or 0
+
+def _rule_dicts(version):
+    rules = PayRule.query.filter_by(version=version).order_by(PayRule.priority, PayRule.id).all()
+    return [{'priority': r.priority, 'description': r.description,
+             **{k: getattr(r, k) for k in MATCH_KEYS + TERMS}} for r in rules]
+
+def get_rule_set(version):
+    """Compiled rule set of a published version (0: built-in defaults)."""
+    if not version:
+        return _compiled(0, lambda: DEFAULT_PAY_RULES)
+    return _compiled(version, lambda: _rule_dicts(version))
+
+def get_active_rule_set():
+    """
+    Compiled active rule set. Versions are immutable, so a compiled set is
+    reused until a new version is published. Outside an app context (e.g.
+    benchmarks on plain dicts) the built-in defaults apply.
+    """
+    if not has_app_context():
+        return get_rule_set(0)
+    return get_rule_set(active_rule_version())
+
+def list_rules(version=None):
+    """Rules of a version (default: active) as dicts, strongest first."""
+    version = active_rule_version() if version is None else version
+    return version, (DEFAULT_PAY_RULES if version == 0 else _rule_dicts(version))
+
+def publish_pay_rules(rules):
+    """
+    Stores a complete rule set as a new version, which becomes active.
+    Does not commit; the caller owns the transaction.
+
+    The version row is inserted first: a concurrent publish that picked the
+    same number waits on it and then fails with IntegrityError, instead of
+    merging its rules into this set.
+
+    :return: the new version number
+    """
+    if not rules:
+        raise ValueError("A rule set needs at least one rule")
+    validated = [validate_rule(r) for r in rules]
+    version = active_rule_version() + 1
+    db.session.execute(insert(PayRuleVersion), [{'version': version}])
+    db.session.execute(insert(PayRule), [{**r, 'version': version} for r in validated])
+    return version
+
+def seed_default_pay_rules():
+    """Publishes DEFAULT_PAY_RULES as version 1 when no rules exist yet."""
+    if active_rule_version():
+        return False
+    publish_pay_rules(DEFAULT_PAY_RULES)
+    db.session.commit()
+    return True
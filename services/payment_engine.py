@@ -0,0 +1,170 @@
+"""
+Columnar payment-sheet engine.
+
+Applies the holiday payment rules of report_service.build_payment_rows to whole
+NumPy arrays at once instead of looping per employee. Only gathering the inputs
+and building the output dicts touch Python objects row by row; every rule is a
+vectorized operation. The output matches the scalar path row for row.
+"""
+import numpy as np
+import pandas as pd
+from services.pay_profile import get_pay_profile
+from services.pay_rules import get_active_rule_set, BASIS_OT, BASIS_FIXED
+
+# 'HH:MM' for every minute of the day, indexed by minute-of-day
+_HHMM = np.array([f"{h:02d}:{m:02d}" for h in range(24) for m in range(60)], dtype=object)
+
+def _to_datetime64(values):
+    """List of datetime/None to a datetime64[us] array (None becomes NaT)."""
+    return pd.to_datetime(pd.Series(values, dtype=object)).to_numpy(dtype='datetime64[us]')
+
+def _hhmm(values, mask):
+    """Formats datetime64 values as HH:MM, 'Missing' where mask is False."""
+    minutes = values.astype('datetime64[m]')
+    minute_of_day = np.where(mask, (minutes - minutes.astype('datetime64[D]')).astype(np.int64), 0)
+    return np.where(mask, _HHMM[minute_of_day], 'Missing')
+
+def _round(values, ndigits):
+    """
+    Vectorized round() that returns exactly what Python's round() would.
+    np.round scales by 10**ndigits first, which can differ from Python's
+    correctly-rounded result when the scaled value sits on a .5 boundary;
+    those few values are re-rounded in Python.
+    """
+    rounded = np.round(values, ndigits)
+    if ndigits == 0:
+        # Both are exact round-half-even on the binary value
+        return rounded
+    scaled = values * 10 ** ndigits
+    ties = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    for i in ties:
+        rounded[i] = round(float(values[i]), ndigits)
+    return rounded
+
+def _title(values):
+    """str.title() per element, '' for empty values (same as the scalar path)."""
+    series = pd.Series(values, dtype=object)
+    return series.where(series.notna() & (series != ''), '').str.title().fillna('').tolist()
+
+def build_payment_rows_columnar(employees, attendance_data, rules=None):
+    """
+    Vectorized equivalent of report_service.build_payment_rows.
+
+    :param employees: employee dicts as returned by get_employees()
+    :param attendance_data: {emp_code: {'in_time': datetime, 'out_time': datetime}}
+    :param rules: compiled PayRuleSet (default: the active version)
+    :return: payment sheet rows, identical to the scalar path
+    """
+    if rules is None:
+        rules = get_active_rule_set()
+
+    # 1. Gather inputs for eligible employees (non-security, at least one punch)
+    selected = []
+    profiles = []
+    terms = []
+    in_list = []
+    out_list = []
+    for emp in employees:
+        pay = get_pay_profile(emp)
+        if pay.is_security:
+            continue
+        stats = attendance_data.get(str(emp['Emp_Id']))
+        if not stats:
+            continue
+        selected.append(emp)
+        profiles.append(pay)
+        terms.append(rules.terms(pay.rule_key))
+        in_list.append(stats.get('in_time'))
+        out_list.append(stats.get('out_time'))
+
+    if not selected:
+        return []
+
+    # Salary derivatives and rule flags come precomputed from the pay profiles
+    gross = np.array([p.gross for p in profiles], dtype=np.float64)
+    basic_salary = np.array([p.basic for p in profiles], dtype=np.float64)
+    daily_basic = np.array([p.daily_basic for p in profiles], dtype=np.float64)
+    ot_rate_unit = np.array([p.ot_rate for p in profiles], dtype=np.float64)
+
+    # Rule terms: one dispatch-table lookup per employee, then columns
+    is_ot = np.array([t.basis == BASIS_OT for t in terms], dtype=bool)
+    is_fixed = np.array([t.basis == BASIS_FIXED for t in terms], dtype=bool)
+    fixed_amount = np.array([t.amount for t in terms], dtype=np.float64)
+    start_minutes = np.array([t.start_hour * 60 + t.start_minute for t in terms], dtype=np.int64)
+    lunch_after = np.array([t.lunch_after_hours for t in terms], dtype=np.float64)
+    lunch_deduction = np.array([t.lunch_deduction_hours for t in terms], dtype=np.float64)
+
+    in_dt = _to_datetime64(in_list)
+    out_dt = _to_datetime64(out_list)
+    has_in = ~np.isnat(in_dt)
+    has_out = ~np.isnat(out_dt)
+    both = has_in & has_out
+
+    # 2. Start Time Rule: e.g. Cleaner @ 7:30 AM, Others @ 8:00 AM
+    start_offset = start_minutes.astype('timedelta64[m]')
+    start_limit = in_dt.astype('datetime64[D]') + start_offset
+    eff_in = np.maximum(in_dt, start_limit.astype('datetime64[us]'))
+
+    # 3. 30-Minute Rounding Down for Out-Time (half hours align with the epoch)
+    out_minutes = np.where(has_out, out_dt.astype('datetime64[m]').astype(np.int64), 0)
+    eff_out = (out_minutes - out_minutes % 30).astype('datetime64[m]').astype('datetime64[us]')
+    eff_out = np.where(has_out, eff_out, np.datetime64('NaT', 'us'))
+
+    # 4. Duration: integer microseconds / 1e6 / 3600 matches timedelta.total_seconds() / 3600
+    diff_us = np.where(both, (eff_out - eff_in).astype(np.int64), 0)
+    raw_hours = diff_us / 1e6 / 3600.0
+    deduction = np.where(raw_hours >= lunch_after, lunch_deduction, 0.0)
+    work_hours = np.where(both, np.maximum(0.0, raw_hours - deduction), 0.0)
+
+    # 5. OT basis (workers) vs daily basic (staff)
+    ot_hours = np.where(is_ot, work_hours, 0.0)
+    ot_rate = ot_rate_unit.copy()
+    amount = np.where(is_ot, ot_hours * ot_rate_unit, daily_basic)
+
+    # 6. Missing punches: workers need both, staff need at least one
+    missing = ~both
+    amount = np.where(missing & is_ot, 0.0, amount)
+    amount = np.where(missing & ~is_ot & ~has_in & ~has_out, 0.0, amount)
+    ot_hours = np.where(missing, 0.0, ot_hours)
+    work_hours = np.where(missing, 0.0, work_hours)
+
+    # 7. Fixed amounts (e.g. loader, fixed-rate designations)
+    amount = np.where(is_fixed, fixed_amount, amount)
+    ot_hours = np.where(is_fixed, 0.0, ot_hours)
+    ot_rate = np.where(is_fixed, 0.0, ot_rate)
+
+    # 8. Materialize rows
+    disp_in = _hhmm(eff_in, has_in)
+    disp_out = _hhmm(eff_out, has_out)
+    names = _title([e['Emp_Name'] for e in selected])
+    designations = _title([e['Designation'] for e in selected])
+    sub_sections = _title([e['Sub_Section'] for e in selected])
+    sections = _title([e['Section'] for e in selected])
+
+    rows = []
+    columns = zip(
+        selected, names, designations, sub_sections, sections, gross.tolist(), _round(basic_salary, 0).tolist(),
+        disp_in.tolist(), disp_out.tolist(), _round(work_hours, 2).tolist(), _round(ot_hours, 2).tolist(),
+        _round(ot_rate, 2).tolist(), _round(amount, 0).tolist()
+    )
+    for serial, (emp, name, desig, sub_name, sec_name, g, basic, d_in, d_out, hours, ot, rate, amt) in enumerate(columns, 1):
+        rows.append({
+            'sl': serial,
+            'id': str(emp['Emp_Id']),
+            'name': name,
+            'designation': desig,
+            'sub_section': sub_name,
+            'section': sec_name,
+            'category': emp.get('Category', ''),
+            'gross': g,
+            'basic': basic,
+            'in_time': d_in,
+            'out_time': d_out,
+            'hour': hours,
+            'ot': ot,
+            'ot_rate': rate,
+            'amount': amt,
+            'remarks': '',
+            'signature': ''
+        })
+    return rows
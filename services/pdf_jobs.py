@@ -0,0 +1,195 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+def _render_pdf(html_content, base_url, output_path):
+    """
+    Runs in a worker process: renders HTML to a PDF file with WeasyPrint.
+    Writes to a temporary name first so a half-written file is never served.
+    """
+    # Suppress GLib-GIO warnings on Windows (same as serve.py)
+    os.environ.setdefault('GIO_USE_VFS', 'local')
+    os.environ.setdefault('G_MESSAGES_DEBUG', 'none')
+    from weasyprint import HTML
+
+    part_path = f"{output_path}.part"
+    HTML(string=html_content, base_url=base_url).write_pdf(part_path)
+    os.replace(part_path, output_path)
+    return os.path.getsize(output_path)
+
+class QueueFullError(Exception):
+    """Raised when the render queue already holds max_pending jobs."""
+
+class PdfJobQueue:
+    """
+    Background PDF rendering on a process pool.
+
+    CPU-heavy WeasyPrint rendering runs in separate processes (one per core by
+    default), so it neither blocks the request threads nor competes with them
+    for the GIL. At most max_pending jobs may be queued or running at once.
+    Job metadata and finished PDFs live in job_dir; files older than
+    retention_seconds are removed as new jobs arrive.
+    """
+    def __init__(self, job_dir, max_workers=None, max_pending=None, retention_seconds=3600):
+        self.job_dir = job_dir
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.max_workers * 4
+        self.retention_seconds = retention_seconds
+        self._executor = None
+        self._jobs = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+        os.makedirs(job_dir, exist_ok=True)
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def _meta_path(self, job_id):
+        return os.path.join(self.job_dir, f"{job_id}.json")
+
+    def _pdf_path(self, job_id):
+        return os.path.join(self.job_dir, f"{job_id}.pdf")
+
+    def _save(self, job):
+        tmp_path = f"{self._meta_path(job['id'])}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(job, f)
+        os.replace(tmp_path, self._meta_path(job['id']))
+
+    def _purge_expired(self):
+        cutoff = time.time() - self.retention_seconds
+        for name in os.listdir(self.job_dir):
+            path = os.path.join(self.job_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    self._jobs.pop(name.split('.')[0], None)
+            except OSError:
+                pass
+
+    def submit(self, html_content, base_url, download_name):
+        """Queues a render and returns its job id immediately."""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise QueueFullError(f"PDF queue is full ({self.max_pending} jobs pending)")
+            self._purge_expired()
+
+            job_id = uuid.uuid4().hex
+            job = {
+                'id': job_id,
+                'status': 'queued',
+                'download_name': download_name,
+                'created_at': datetime.now().isoformat(timespec='seconds'),
+                'finished_at': None,
+                'size': None,
+                'error': None
+            }
+            self._jobs[job_id] = job
+            self._save(job)
+
+            try:
+                future = self._get_executor().submit(_render_pdf, html_content, base_url, self._pdf_path(job_id))
+            except BrokenProcessPool:
+                # A crashed worker breaks the pool; start a fresh one
+                self._executor = None
+                future = self._get_executor().submit(_render_pdf, html_content, base_url, self._pdf_path(job_id))
+
+            self._pending += 1
+            job['status'] = 'running'
+            self._save(job)
+
+        future.add_done_callback(lambda f: self._finish(job_id, f))
+        return job_id, future
+
+    def add_finished(self, pdf_path, download_name):
+        """Registers an already rendered file (e.g. from the artifact cache) as a done job."""
+        job_id = uuid.uuid4().hex
+        shutil.copyfile(pdf_path, self._pdf_path(job_id))
+        now = datetime.now().isoformat(timespec='seconds')
+        job = {
+            'id': job_id,
+            'status': 'done',
+            'download_name': download_name,
+            'created_at': now,
+            'finished_at': now,
+            'size': os.path.getsize(pdf_path),
+            'error': None
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+            self._save(job)
+        return job_id
+
+    def _finish(self, job_id, future):
+        with self._lock:
+            self._pending -= 1
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job['finished_at'] = datetime.now().isoformat(timespec='seconds')
+            try:
+                job['size'] = future.result()
+                job['status'] = 'done'
+            except Exception as e:
+                job['status'] = 'failed'
+                job['error'] = str(e)
+                logger.error(f"PDF job {job_id} failed: {e}")
+                if isinstance(e, BrokenProcessPool):
+                    self._executor = None
+            self._save(job)
+
+    def status(self, job_id):
+        """Returns job metadata, from memory or from the job store on disk."""
+        if not re.fullmatch(r'[0-9a-f]{32}', job_id or ''):
+            return None
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return dict(job)
+        path = self._meta_path(job_id)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def pdf_path(self, job_id):
+        """Path of the finished PDF, or None if the job is not done."""
+        job = self.status(job_id)
+        if not job or job['status'] != 'done':
+            return None
+        path = self._pdf_path(job_id)
+        return path if os.path.exists(path) else None
+
+    def render(self, html_content, base_url, download_name, timeout=None):
+        """Renders on the pool and waits; the calling thread only blocks on I/O."""
+        job_id, future = self.submit(html_content, base_url, download_name)
+        future.result(timeout=timeout)
+        return self._pdf_path(job_id)
+
+_queue = None
+_queue_lock = threading.Lock()
+
+def get_pdf_queue(config):
+    """Process-wide queue, created on first use from the app config."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = PdfJobQueue(
+                job_dir=config['PDF_JOB_DIR'],
+                max_workers=config.get('PDF_WORKERS'),
+                max_pending=config.get('PDF_MAX_PENDING'),
+                retention_seconds=config.get('PDF_JOB_RETENTION_SECONDS', 3600)
+            )
+        return _queue
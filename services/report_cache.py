@@ -0,0 +1,132 @@
+"""
+Shared in-memory cache of each day's attendance state for the daily reports
+(present status, night bill).
+
+One entry holds the attendance of every employee for a date. Reports slice it
+by their section/sub-section/category/status filters, so changing a filter
+does not re-query the punches. Entries are tagged with the attendance version
+(max synced sync_id, newest daily summary write and a counter of manual punch
+changes) and are reloaded when it moves; TTL and LRU eviction bound staleness
+and memory.
+"""
+from models.attendance import IClockTransaction
+from models.daily_attendance import DailyAttendance
+from services.daily_attendance_service import get_daily_attendance_for_date
+from services.attendance_service import _to_date
+from extensions import db
+from flask import current_app, has_app_context
+from collections import OrderedDict
+from sqlalchemy import func, select
+import threading
+import time
+
+DEFAULT_TTL_SECONDS = 300
+DEFAULT_MAX_DAYS = 31
+
+class DayAttendanceCache:
+    """
+    TTL + LRU cache of {emp_code: {'in_time', 'out_time'}} per date.
+
+    Cached dicts are shared between requests and must be treated as read-only.
+    """
+    def __init__(self, ttl_seconds, max_days):
+        self.ttl_seconds = ttl_seconds
+        self.max_days = max_days
+        self._entries = OrderedDict() # date -> (version, expires_at, attendance)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0 # Misses caused by a version change or expiry
+        self.evictions = 0
+
+    def get(self, key, version):
+        """Cached value for key if it was stored under version and has not expired, else None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            if entry is not None:
+                del self._entries[key]
+                self.stale += 1
+            self.misses += 1
+            return None
+
+    def put(self, key, version, value):
+        with self._lock:
+            self._entries[key] = (version, time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_days:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_days': self.max_days,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale': self.stale,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_report_cache():
+    """Process-wide cache, sized from the app config on first use (defaults outside an app context)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            config = current_app.config if has_app_context() else {}
+            _cache = DayAttendanceCache(int(config.get('REPORT_CACHE_TTL_SECONDS', DEFAULT_TTL_SECONDS)),
+                                        int(config.get('REPORT_CACHE_MAX_DAYS', DEFAULT_MAX_DAYS)))
+        return _cache
+
+_manual_changes = 0
+_manual_lock = threading.Lock()
+
+def note_manual_punch_change():
+    """Invalidates cached days after manual punches are committed (they carry no sync_id)."""
+    global _manual_changes
+    with _manual_lock:
+        _manual_changes += 1
+
+def attendance_version():
+    """
+    (max synced sync_id, max daily summary updated_at, manual change counter);
+    two indexed MAX lookups in one query.
+
+    Summary rebuilds and backfills (sync_data.py, another process) rewrite
+    older days without moving the sync_id high-water mark; every summary row
+    they write gets the database's NOW(), which moves the second component.
+    """
+    high_water, summary_written = db.session.execute(select(
+        select(func.max(IClockTransaction.sync_id)).scalar_subquery(),
+        select(func.max(DailyAttendance.updated_at)).scalar_subquery()
+    )).one()
+    return high_water or 0, summary_written, _manual_changes
+
+def get_day_attendance(report_date):
+    """
+    Attendance of every employee on report_date ({emp_code: {'in_time', 'out_time'}}),
+    served from the shared cache while the attendance version is unchanged.
+    """
+    report_date = _to_date(report_date)
+    cache = get_report_cache()
+    # Version is read before loading, so a sync landing meanwhile triggers a reload next time
+    version = attendance_version()
+    attendance = cache.get(report_date, version)
+    if attendance is None:
+        attendance = get_daily_attendance_for_date(report_date)
+        cache.put(report_date, version, attendance)
+    return attendance
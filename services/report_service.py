@@ -1,10 +1,28 @@
 from datetime import datetime
 from collections import defaultdict
 from services.employee_service import get_employees
-from services.attendance_service import get_attendance_for_date, get_attendance_for_range
+from services.daily_attendance_service import get_daily_attendance_for_date, get_daily_attendance_totals, get_late_out_attendance
+from services.payment_engine import build_payment_rows_columnar
+from services.artifact_cache import invalidate_holiday_artifacts
+from services.attendance_service import day_bounds
+from services.employee_directory import get_employee_directory
+from services.attendance_lookup import employee_filters
+from services.pay_profile import get_pay_profile
+from services.pay_rules import get_active_rule_set, BASIS_OT, BASIS_FIXED
+from services.report_cache import get_day_attendance
+from models.attendance import IClockTransaction
+from models.daily_attendance import DailyAttendance
 from models.designation import Designation
 from models.holiday import Holiday, HolidayDutyRecord
 from extensions import db
+from sqlalchemy import func, insert, select, update
+import time
+
+# Above this many employees the payment sheet is computed by the columnar engine
+COLUMNAR_MIN_EMPLOYEES = 2000
+
+# Night bill minutes are counted from 22:00; no earlier Out-Time can qualify
+NIGHT_BILL_FROM_HOUR = 22
 
 def compute_payment_sheet(for_date: str, section: str | None, sub_section: str | None, category: str | None):
     """Compute payment sheet rows for a given date and optional filters."""
@@ -14,19 +32,35 @@ def compute_payment_sheet(for_date: str, section: str | None, sub_section: str |
         return []
 
     # 2. Fetch Attendance
-    emp_ids = [str(e['Emp_Id']) for e in employees]
-    attendance_data = get_attendance_for_date(for_date, emp_ids)
+    attendance_data = get_daily_attendance_for_date(for_date, filters=employee_filters(section, sub_section, category))
+
+    # 3. Apply payment rules
+    return _payment_rows(employees, attendance_data)
+
+def _payment_rows(employees, attendance_data, rules=None):
+    """Picks the scalar or columnar engine by size; both produce identical rows."""
+    if len(employees) >= COLUMNAR_MIN_EMPLOYEES:
+        return build_payment_rows_columnar(employees, attendance_data, rules)
+    return build_payment_rows(employees, attendance_data, rules)
 
+def build_payment_rows(employees, attendance_data, rules=None):
+    """
+    Scalar payment rules, one employee at a time. Reference implementation for the columnar engine.
+
+    :param rules: compiled PayRuleSet (default: the active version)
+    """
+    if rules is None:
+        rules = get_active_rule_set()
     rows = []
     serial = 1
     
     for emp in employees:
         emp_id = str(emp['Emp_Id'])
+        pay = get_pay_profile(emp)
+        terms = rules.terms(pay.rule_key)
         
         # Skip Security personnel as they don't get holiday payment
-        sec = (emp.get('Section') or '').strip().lower()
-        sub_sec = (emp.get('Sub_Section') or '').strip().lower()
-        if sec == 'security' or sub_sec == 'security':
+        if pay.is_security:
             continue
 
         stats = attendance_data.get(emp_id)
@@ -38,11 +72,9 @@ def compute_payment_sheet(for_date: str, section: str | None, sub_section: str |
         in_dt = stats.get('in_time')
         out_dt = stats.get('out_time')
 
-        # Start Time Rule: Cleaner @ 7:30 AM, Others @ 8:00 AM
+        # Start Time Rule: e.g. Cleaner @ 7:30 AM, Others @ 8:00 AM
         if in_dt:
-            is_cleaner = (emp.get('Sub_Section') or '').strip().lower() == 'cleaner'
-            start_h, start_m = (7, 30) if is_cleaner else (8, 0)
-            start_limit = in_dt.replace(hour=start_h, minute=start_m, second=0, microsecond=0)
+            start_limit = in_dt.replace(hour=terms.start_hour, minute=terms.start_minute, second=0, microsecond=0)
             eff_in = max(in_dt, start_limit)
             disp_in = eff_in.strftime('%H:%M')
         else:
@@ -61,23 +93,19 @@ def compute_payment_sheet(for_date: str, section: str | None, sub_section: str |
         if eff_in and eff_out:
             duration = eff_out - eff_in
             raw_hours = duration.total_seconds() / 3600.0
-            # Deduct 1 hour for lunch ONLY if working 6 hours or more
-            deduction = 1.0 if raw_hours >= 6.0 else 0.0
+            # Lunch deduction only from a minimum duration (default: 1 hour from 6 hours)
+            deduction = terms.lunch_deduction_hours if raw_hours >= terms.lunch_after_hours else 0.0
             work_hours = max(0, raw_hours - deduction)
         else:
             work_hours = 0
         
-        # Salary calculations
-        gross_salary = float(emp.get('Gross_Salary') or 0)
-        # Basic = (Gross - allowances)/1.5
-        basic_salary = (gross_salary - 2450) / 1.5
-        daily_basic = basic_salary / 30.0
-        ot_rate_unit = (basic_salary / 208.0) * 2.0
+        # Salary calculations (precomputed in the pay profile)
+        gross_salary = pay.gross
+        basic_salary = pay.basic
+        daily_basic = pay.daily_basic
+        ot_rate_unit = pay.ot_rate
 
-        emp_cat = (emp.get('Category') or '').strip().lower()
-        
-        # Robust check to match 'worker', 'workers', 'factory worker' etc.
-        if 'worker' in emp_cat:
+        if terms.basis == BASIS_OT:
             # Workers: Entire duration as OT
             ot_hours = work_hours
             ot_rate = ot_rate_unit
@@ -92,7 +120,7 @@ def compute_payment_sheet(for_date: str, section: str | None, sub_section: str |
         # User Rule Update: For Staff, 1 punch is enough for amount. 
         # For Workers, 2 punches are required as OT depends on duration.
         if 'Missing' in disp_in or 'Missing' in disp_out:
-            if 'worker' in emp_cat:
+            if terms.basis == BASIS_OT:
                 amount = 0
                 ot_hours = 0
                 work_hours = 0
@@ -106,14 +134,9 @@ def compute_payment_sheet(for_date: str, section: str | None, sub_section: str |
                 ot_hours = 0
                 work_hours = 0
 
-        # Special overrides for Specific Sub-Sections or Designations
-        designation_lower = (emp.get('Designation') or '').strip().lower()
-        if sub_sec == 'loader':
-            amount = 500
-            ot_hours = 0
-            ot_rate = 0
-        elif designation_lower in ['checker', 'peon', 'canteen boy']:
-            amount = 350
+        # Fixed amounts for specific Sub-Sections or Designations (e.g. loader 500, checker/peon/canteen boy 350)
+        if terms.basis == BASIS_FIXED:
+            amount = terms.amount
             ot_hours = 0
             ot_rate = 0
 
@@ -158,8 +181,8 @@ def compute_present_status(for_date: str, section: str | None, sub_section: str
         print("DEBUG: No employees found for filters")
         return []
 
-    emp_ids = [str(e['Emp_Id']).strip() for e in employees]
-    attendance_data = get_attendance_for_date(for_date_obj, emp_ids)
+    # Whole-day state from the shared cache; filters and status only slice it
+    attendance_data = get_day_attendance(for_date_obj)
 
     rows = []
     serial = 1
@@ -168,9 +191,7 @@ def compute_present_status(for_date: str, section: str | None, sub_section: str
         emp_id = str(emp['Emp_Id']).strip()
         
         # Skip Security personnel as they are restricted from these reports
-        sec = (emp.get('Section') or '').strip().lower()
-        sub_sec = (emp.get('Sub_Section') or '').strip().lower()
-        if sec == 'security' or sub_sec == 'security':
+        if get_pay_profile(emp).is_security:
             continue
 
         stats = attendance_data.get(emp_id)
@@ -217,6 +238,104 @@ def compute_present_status(for_date: str, section: str | None, sub_section: str
 
     return rows
 
+def _night_bill_row(emp, stats):
+    """
+    Night bill for one employee on one night, or None when the night does not qualify.
+
+    :param stats: {'in_time', 'out_time'} of that day
+    :return: (row with 'sl' left for the caller, minutes past 22:00)
+    """
+    emp_id = str(emp['Emp_Id'])
+    pay = get_pay_profile(emp)
+
+    # Skip Security personnel
+    if pay.is_security:
+        return None
+
+    out_dt = stats.get('out_time')
+    if not out_dt:
+        return None
+        
+    # New Rule: Staff (Non-workers) must work until 11:00 PM (23:00) or later
+    # Workers follow the existing rule: At least 30 minutes past 10:00 PM (10:30 PM)
+    is_worker = pay.is_worker
+    
+    ref_time_10pm = out_dt.replace(hour=22, minute=0, second=0, microsecond=0)
+    ref_time_11pm = out_dt.replace(hour=23, minute=0, second=0, microsecond=0)
+    
+    if not is_worker:
+        # Staff Rule
+        if out_dt < ref_time_11pm:
+            return None
+    else:
+        # Worker Rule (Current 10:30 PM check)
+        if out_dt < ref_time_10pm.replace(minute=30):
+            return None
+            
+    # Total minutes past calculation base (10 PM) for payment computation
+    diff = out_dt - ref_time_10pm
+    total_minutes = int(diff.total_seconds() / 60)
+    
+    if total_minutes <= 0:
+        return None
+
+    disp_in = stats.get('in_time').strftime('%H:%M') if stats.get('in_time') else "Missing"
+    disp_out = out_dt.strftime('%H:%M')
+    
+    # Duration string for display (H:MM)
+    hours_part = total_minutes // 60
+    mins_part = total_minutes % 60
+    disp_duration = f"{hours_part}:{mins_part:02d}"
+    decimal_hours = total_minutes / 60.0
+
+    # Calculation
+    gross_salary = pay.gross
+    basic_salary = pay.basic
+    
+    amount = 0
+    rate_type = ""
+    hourly_rate = 0
+    
+    if is_worker:
+        # Workers: Based on OT rate (proportional)
+        hourly_rate = pay.ot_rate
+        amount = decimal_hours * hourly_rate
+        rate_type = "OT Rate"
+    else:
+        # Staff: Fixed amount based on Designation (NOT proportional)
+        # Fetch from the relationship object passed by employee_service
+        desig_obj = emp.get('designation_obj')
+        if desig_obj:
+            amount = desig_obj.night_bill
+        else:
+            # Fallback if relationship not loaded (should not happen with updated service)
+            amount = 0
+        
+        hourly_rate = amount # For display in 'Rate' column
+        rate_type = "Fixed Rate"
+
+    row = {
+        'sl': None,
+        'id': emp_id,
+        'name': emp['Emp_Name'].title() if emp['Emp_Name'] else '',
+        'designation': emp['Designation'].title() if emp['Designation'] else '',
+        'sub_section': emp['Sub_Section'].title() if emp['Sub_Section'] else '',
+        'section': emp['Section'].title() if emp['Section'] else '',
+        'category': emp.get('Category', ''),
+        'gross': round(gross_salary, 0),
+        'basic': round(basic_salary, 0),
+        'hour': disp_duration,
+        'decimal_hour': round(decimal_hours, 2),
+        'rate': round(hourly_rate, 2),
+        'in_time': disp_in,
+        'out_time': disp_out,
+        'rate_type': rate_type,
+        'amount': round(amount, 0),
+        'remarks': '',
+        'signature': ''
+    }
+    return row, total_minutes
+
 def compute_night_bill(for_date: str, section: str | None, sub_section: str | None, category: str | None):
     """Compute night bill rows for a given date and optional filters."""
     # 1. Fetch Employees
@@ -224,117 +343,115 @@ def compute_night_bill(for_date: str, section: str | None, sub_section: str | No
     if not employees:
         return []
 
-    # 2. Fetch Attendance
-    emp_ids = [str(e['Emp_Id']) for e in employees]
-    attendance_data = get_attendance_for_date(for_date, emp_ids)
+    # 2. Fetch Attendance (shared whole-day cache, sliced by the employees above)
+    attendance_data = get_day_attendance(for_date)
 
     rows = []
     serial = 1
     
     for emp in employees:
-        emp_id = str(emp['Emp_Id'])
-        
-        # Skip Security personnel
-        sec = (emp.get('Section') or '').strip().lower()
-        sub_sec = (emp.get('Sub_Section') or '').strip().lower()
-        if sec == 'security' or sub_sec == 'security':
-            continue
-
-        stats = attendance_data.get(emp_id)
+        stats = attendance_data.get(str(emp['Emp_Id']))
         if not stats:
             continue
 
-        out_dt = stats.get('out_time')
-        if not out_dt:
+        night = _night_bill_row(emp, stats)
+        if night is None:
             continue
-            
-        emp_cat = (emp.get('Category') or '').strip().lower()
-        
-        # New Rule: Staff (Non-workers) must work until 11:00 PM (23:00) or later
-        # Workers follow the existing rule: At least 30 minutes past 10:00 PM (10:30 PM)
-        is_worker = 'worker' in emp_cat
-        
-        ref_time_10pm = out_dt.replace(hour=22, minute=0, second=0, microsecond=0)
-        ref_time_11pm = out_dt.replace(hour=23, minute=0, second=0, microsecond=0)
-        
-        if not is_worker:
-            # Staff Rule
-            if out_dt < ref_time_11pm:
-                continue
-        else:
-            # Worker Rule (Current 10:30 PM check)
-            if out_dt < ref_time_10pm.replace(minute=30):
-                continue
-                
-        # Total minutes past calculation base (10 PM) for payment computation
-        diff = out_dt - ref_time_10pm
-        total_minutes = int(diff.total_seconds() / 60)
-        
-        if total_minutes <= 0:
+
+        row, _ = night
+        if row['amount'] > 0:
+            row['sl'] = serial
+            rows.append(row)
+        serial += 1
+
+    return rows
+
+def compute_night_bill_range(start_date: str, end_date: str, section: str | None, sub_section: str | None, category: str | None):
+    """
+    Night bill for every night of a date range, e.g. a payroll month.
+
+    One range query reads only the days with an Out-Time at or after
+    NIGHT_BILL_FROM_HOUR, and the single-day rules (staff out at 23:00 or
+    later, workers at 22:30 or later) are applied to each of them. Monthly
+    totals add up the per-night amounts, so they equal the sum of the
+    single-day sheets.
+
+    :return: (per-employee totals in employee order, per-night detail rows in date order)
+    """
+    employees = get_employees(section=section, sub_section=sub_section, category=category)
+    if not employees:
+        return [], []
+
+    # Only days ending at or after 22:00 can qualify under either rule
+    nights = get_late_out_attendance(start_date, end_date, NIGHT_BILL_FROM_HOUR,
+                                     filters=employee_filters(section, sub_section, category))
+
+    order = {str(emp['Emp_Id']): i for i, emp in enumerate(employees)}
+    by_id = {str(emp['Emp_Id']): emp for emp in employees}
+    nights = [n for n in nights if n.emp_code in order]
+    nights.sort(key=lambda n: (n.work_date, order[n.emp_code]))
+
+    details = []
+    totals = {}
+    date_strs = {}
+    for n in nights:
+        emp_id = n.emp_code
+        night = _night_bill_row(by_id[emp_id], {'in_time': n.in_time, 'out_time': n.out_time})
+        if night is None or night[0]['amount'] <= 0:
             continue
 
-        disp_in = stats.get('in_time').strftime('%H:%M') if stats.get('in_time') else "Missing"
-        disp_out = out_dt.strftime('%H:%M')
-        
-        # Duration string for display (H:MM)
-        hours_part = total_minutes // 60
-        mins_part = total_minutes % 60
-        disp_duration = f"{hours_part}:{mins_part:02d}"
-        decimal_hours = total_minutes / 60.0
-
-        # Calculation
-        designation = (emp.get('Designation') or '').strip().lower()
-        
-        gross_salary = float(emp.get('Gross_Salary') or 0)
-        basic_salary = (gross_salary - 2450) / 1.5
-        
-        amount = 0
-        rate_type = ""
-        hourly_rate = 0
-        
-        if 'worker' in emp_cat:
-            # Workers: Based on OT rate (proportional)
-            ot_rate_unit = (basic_salary / 208.0) * 2.0
-            hourly_rate = ot_rate_unit
-            amount = decimal_hours * hourly_rate
-            rate_type = "OT Rate"
-        else:
-            # Staff: Fixed amount based on Designation (NOT proportional)
-            # Fetch from the relationship object passed by employee_service
-            desig_obj = emp.get('designation_obj')
-            if desig_obj:
-                amount = desig_obj.night_bill
-            else:
-                # Fallback if relationship not loaded (should not happen with updated service)
-                amount = 0
-            
-            hourly_rate = amount # For display in 'Rate' column
-            rate_type = "Fixed Rate"
-
-        if amount > 0:
-            rows.append({
-                'sl': serial,
-                'id': emp_id,
-                'name': emp['Emp_Name'].title() if emp['Emp_Name'] else '',
-                'designation': emp['Designation'].title() if emp['Designation'] else '',
-                'sub_section': emp['Sub_Section'].title() if emp['Sub_Section'] else '',
-                'section': emp['Section'].title() if emp['Section'] else '',
-                'category': emp.get('Category', ''),
-                'gross': round(gross_salary, 0),
-                'basic': round(basic_salary, 0),
-                'hour': disp_duration,
-                'decimal_hour': round(decimal_hours, 2),
-                'rate': round(hourly_rate, 2),
-                'in_time': disp_in,
-                'out_time': disp_out,
-                'rate_type': rate_type,
-                'amount': round(amount, 0),
-                'remarks': '',
-                'signature': ''
+        date_str = date_strs.get(n.work_date)
+        if date_str is None:
+            date_str = date_strs[n.work_date] = n.work_date.strftime('%Y-%m-%d')
+
+        row, minutes = night
+        row['sl'] = len(details) + 1
+        row['date'] = date_str
+        details.append(row)
+
+        total = totals.get(emp_id)
+        if total is None:
+            total = totals[emp_id] = {
+                'row': row, 'nights': 0, 'minutes': 0, 'amount': 0,
+                'first_date': date_str
+            }
+        total['nights'] += 1
+        total['minutes'] += minutes
+        total['amount'] += row['amount']
+        total['last_date'] = date_str
+
+    rows = []
+    serial = 1
+    for emp in employees:
+        total = totals.get(str(emp['Emp_Id']))
+        if not total:
+            continue
+        first = total['row']
+        minutes = total['minutes']
+        rows.append({
+            'sl': serial,
+            'id': first['id'],
+            'name': first['name'],
+            'designation': first['designation'],
+            'sub_section': first['sub_section'],
+            'section': first['section'],
+            'category': first['category'],
+            'gross': first['gross'],
+            'basic': first['basic'],
+            'nights': total['nights'],
+            'hour': f"{minutes // 60}:{minutes % 60:02d}",
+            'decimal_hour': round(minutes / 60.0, 2),
+            'rate': first['rate'],
+            'rate_type': first['rate_type'],
+            'amount': total['amount'],
+            'first_date': total['first_date'],
+            'last_date': total['last_date'],
+            'remarks': f"{total['nights']} nights",
+            'signature': ''
         })
         serial += 1
 
-    return rows
+    return rows, details
 
 def compute_security_payment(start_date: str, end_date: str = None):
     """Compute holiday payment for security personnel (double basic for each day they worked in the range)."""
@@ -346,52 +463,24 @@ def compute_security_payment(start_date: str, end_date: str = None):
     if not employees:
         return []
 
-    # 2. Fetch Attendance for the range
-    emp_ids = [str(e['Emp_Id']) for e in employees]
-    attendance_range_data = get_attendance_for_range(start_date, end_date, emp_ids)
-
-    # 3. Aggregate results per employee
-    # { emp_id: { 'days_worked': N, 'total_amount': X, 'last_seen_in': '', 'last_seen_out': '' } }
-    aggregated = {}
-    
-    for date_str, daily_data in attendance_range_data.items():
-        for emp_id, stats in daily_data.items():
-            if emp_id not in aggregated:
-                aggregated[emp_id] = {
-                    'days_worked': 0,
-                    'last_seen_in': 'Missing',
-                    'last_seen_out': 'Missing'
-                }
-            
-            aggregated[emp_id]['days_worked'] += 1
-            
-            # For multi-date, "in_time" and "out_time" columns in the sheet might be 
-            # confusing. Let's show the most recent one or just a count.
-            # But the user might want to see the specific dates. 
-            # However, the sheet is grouped by employee.
-            # I will show the 'days_worked' and total amount.
-            
-            in_dt = stats.get('in_time')
-            out_dt = stats.get('out_time')
-            if in_dt:
-                aggregated[emp_id]['last_seen_in'] = in_dt.strftime('%H:%M')
-            if out_dt:
-                aggregated[emp_id]['last_seen_out'] = out_dt.strftime('%H:%M')
+    # 2. Days worked and latest In/Out per employee, aggregated over the whole range
+    totals = get_daily_attendance_totals(start_date, end_date, filters=employee_filters(sub_section='Security'))
 
     rows = []
     serial = 1
     
     for emp in employees:
         emp_id = str(emp['Emp_Id'])
-        agg_stats = aggregated.get(emp_id)
+        agg_stats = totals.get(emp_id)
         
         if not agg_stats:
             continue
 
         # Salary calculations
-        gross_salary = float(emp.get('Gross_Salary') or 0)
-        basic_salary = (gross_salary - 2450) / 1.5
-        daily_basic = basic_salary / 30.0
+        pay = get_pay_profile(emp)
+        gross_salary = pay.gross
+        basic_salary = pay.basic
+        daily_basic = pay.daily_basic
         
         # Rule: Double Daily Basic * Number of days worked
         amount = daily_basic * 2.0 * agg_stats['days_worked']
@@ -405,8 +494,8 @@ def compute_security_payment(start_date: str, end_date: str = None):
             'section': emp['Section'].title() if emp['Section'] else '',
             'gross': gross_salary,
             'basic': round(basic_salary, 0),
-            'in_time': agg_stats['last_seen_in'],
-            'out_time': agg_stats['last_seen_out'],
+            'in_time': agg_stats['last_in'].strftime('%H:%M') if agg_stats['last_in'] else 'Missing',
+            'out_time': agg_stats['last_out'].strftime('%H:%M') if agg_stats['last_out'] else 'Missing',
             'days_worked': agg_stats['days_worked'],
             'amount': round(amount, 0),
             'remarks': f"Worked {agg_stats['days_worked']} days",
@@ -424,9 +513,12 @@ def compute_security_payment_for_holiday(for_date: str):
         return []
 
     # 2. Fetch Attendance for the single date
-    emp_ids = [str(e['Emp_Id']) for e in employees]
-    attendance_data = get_attendance_for_date(for_date, emp_ids)
+    attendance_data = get_daily_attendance_for_date(for_date, filters=employee_filters(sub_section='Security'))
 
+    return build_security_holiday_rows(employees, attendance_data)
+
+def build_security_holiday_rows(employees, attendance_data):
+    """Security holiday rule: double daily basic for everyone with at least one punch."""
     rows = []
     serial = 1
     
@@ -438,9 +530,10 @@ def compute_security_payment_for_holiday(for_date: str):
             continue
 
         # Salary calculations
-        gross_salary = float(emp.get('Gross_Salary') or 0)
-        basic_salary = (gross_salary - 2450) / 1.5
-        daily_basic = basic_salary / 30.0
+        pay = get_pay_profile(emp)
+        gross_salary = pay.gross
+        basic_salary = pay.basic
+        daily_basic = pay.daily_basic
         
         # Rule: Double Daily Basic for the work day
         amount = daily_basic * 2.0
@@ -474,8 +567,84 @@ def compute_security_payment_for_holiday(for_date: str):
 
     return rows
 
-def process_holiday_duty(holiday_id: int):
-    """Fetch attendance from iClock and save to HolidayDutyRecord snapshot."""
+def compute_holiday_duty(for_date: str, employees=None, attendance_data=None, rules=None):
+    """
+    Single-pass computation of a holiday snapshot.
+
+    Loads the employee set and the day's attendance once, then routes each
+    employee to the rule set that applies: security sub-section staff get the
+    security holiday rule, everyone else outside the security section goes
+    through the payment sheet rules (loader and fixed-rate designation
+    overrides included). Returns the same rows, in the same order, as
+    compute_payment_sheet(for_date) + compute_security_payment_for_holiday(for_date).
+
+    Batch callers may pass the employee list and the day's attendance
+    ({emp_code: {'in_time', 'out_time'}}) they already loaded; rules is the
+    compiled PayRuleSet to apply (default: the active version).
+    """
+    # 1. One employee set and one attendance read for the whole day
+    if employees is None:
+        employees = get_employees()
+    if attendance_data is None:
+        attendance_data = get_daily_attendance_for_date(for_date)
+
+    # 2. Route employees to their rule set
+    regular = []
+    security = []
+    for emp in employees:
+        sec = (emp.get('Section') or '').strip().lower()
+        sub_sec = (emp.get('Sub_Section') or '').strip().lower()
+        if sub_sec == 'security':
+            security.append(emp)
+        elif sec != 'security':
+            regular.append(emp)
+
+    # 3. Regular rows first, then security (numbered separately, as before)
+    return _payment_rows(regular, attendance_data, rules) + build_security_holiday_rows(security, attendance_data)
+
+def _snapshot_mappings(holiday_id, generation, results, rule_version):
+    """Insert parameters for one snapshot generation."""
+    now = datetime.now()
+    return [{
+        'holiday_id': holiday_id,
+        'generation': generation,
+        'rule_version': rule_version,
+        'emp_id': r['id'],
+        'emp_name': r['name'],
+        'designation': r['designation'],
+        'section': r['section'],
+        'sub_section': r['sub_section'],
+        'category': r['category'],
+        'gross_salary': r['gross'],
+        'basic_salary': r['basic'],
+        'in_time': r['in_time'],
+        'out_time': r['out_time'],
+        'work_hours': r.get('hour', 0),
+        'ot_hours': r.get('ot', 0),
+        'ot_rate': r.get('ot_rate', 0),
+        'amount': r['amount'],
+        'remarks': r.get('remarks', ''),
+        'is_manual': False,
+        'created_at': now,
+        'updated_at': now
+    } for r in results]
+
+def process_holiday_duty(holiday_id: int, employees=None, attendance_data=None, read_at=None):
+    """
+    Fetch attendance from iClock and save it as a new HolidayDutyRecord snapshot.
+
+    The rows are written with one executemany under a new generation number and
+    published by switching holiday.active_generation in the same commit, so
+    readers see either the complete old snapshot or the complete new one.
+    Older generations are deleted in that same transaction, under the holiday row lock.
+
+    employees/attendance_data are optional preloaded inputs (see compute_holiday_duty).
+    read_at is the database time taken before a preloaded attendance_data was read;
+    it becomes the holiday's re-process watermark (default: now, before reading here).
+
+    :return: dict with count, seconds, write_seconds and rows_per_sec (write throughput)
+    """
+    started = time.perf_counter()
     holiday = Holiday.query.get(holiday_id)
     if not holiday:
         raise ValueError("Holiday not found")
@@ -483,50 +652,159 @@ def process_holiday_duty(holiday_id: int):
     if holiday.status == 'finalized':
         raise ValueError("Cannot re-process a finalized holiday")
 
-    # 1. Compute results using existing logic (Regular Employees)
-    # compute_payment_sheet expects a string date YYYY-MM-DD
-    date_str = holiday.holiday_date.strftime('%Y-%m-%d')
-    results = compute_payment_sheet(date_str, section=None, sub_section=None, category=None)
+    # Watermark for reprocess_holiday_changes, taken before attendance is read
+    if read_at is None:
+        read_at = _db_now()
 
-    # 2. Compute Security Personnel results
-    security_results = compute_security_payment_for_holiday(date_str)
-    
-    # 3. Combine both for storage
-    all_results = results + security_results
-
-    # 4. Clear existing records for this holiday (if any)
-    HolidayDutyRecord.query.filter_by(holiday_id=holiday.id).delete()
-
-    # 5. Create new records from combined results
-    for r in all_results:
-        record = HolidayDutyRecord(
-            holiday_id=holiday.id,
-            emp_id=r['id'],
-            emp_name=r['name'],
-            designation=r['designation'],
-            section=r['section'],
-            sub_section=r['sub_section'],
-            category=r['category'],
-            gross_salary=r['gross'],
-            basic_salary=r['basic'],
-            in_time=r['in_time'],
-            out_time=r['out_time'],
-            work_hours=r.get('hour', 0),
-            ot_hours=r.get('ot', 0),
-            ot_rate=r.get('ot_rate', 0),
-            amount=r['amount'],
-            remarks=r.get('remarks', ''),
-            is_manual=False
-        )
-        db.session.add(record)
+    # 1-3. Compute regular and security rows in one pass over employees and attendance
+    date_str = holiday.holiday_date.strftime('%Y-%m-%d')
+    rules = get_active_rule_set()
+    all_results = compute_holiday_duty(date_str, employees, attendance_data, rules)
 
-    holiday.processed_at = datetime.now()
+    # 4. Lock the holiday row so concurrent runs get distinct generations
+    write_started = time.perf_counter()
+    holiday = Holiday.query.filter_by(id=holiday_id).with_for_update().populate_existing().one()
+    if holiday.status == 'finalized':
+        raise ValueError("Cannot re-process a finalized holiday")
+    generation = (holiday.active_generation or 0) + 1
+
+    # 5. Write the new generation in one executemany (invisible to readers until published)
+    if all_results:
+        db.session.execute(insert(HolidayDutyRecord), _snapshot_mappings(holiday.id, generation, all_results, rules.version))
+
+    # 6. Drop superseded generations while the row lock is held; readers keep
+    #    seeing them until the commit below, and a later run's newer generation is never touched
+    HolidayDutyRecord.query.filter(
+        HolidayDutyRecord.holiday_id == holiday_id,
+        HolidayDutyRecord.generation < generation
+    ).delete(synchronize_session=False)
+
+    # 7. Publish it atomically
+    holiday.active_generation = generation
+    holiday.processed_at = read_at
     db.session.commit()
-    return len(all_results)
-
-def get_holiday_records(holiday_id: int, section=None, sub_section=None, category=None, include_security=False):
-    """Fetch processed holiday records from snapshot table."""
-    query = HolidayDutyRecord.query.filter_by(holiday_id=holiday_id)
+    write_seconds = time.perf_counter() - write_started
+
+    invalidate_holiday_artifacts(holiday_id)
+    return {
+        'count': len(all_results),
+        'seconds': round(time.perf_counter() - started, 3),
+        'write_seconds': round(write_seconds, 3),
+        'rows_per_sec': round(len(all_results) / write_seconds, 1) if write_seconds > 0 else 0.0
+    }
+
+def _db_now():
+    """
+    The database server's clock. Watermarks are compared with the created_at/updated_at
+    of punches and daily summaries, which are all written with the server's NOW()
+    (model defaults and the summary upsert), so they must come from it, not the app host.
+    """
+    return db.session.execute(select(func.now())).scalar()
+
+def changed_employee_ids(holiday_date, since):
+    """
+    Employees whose attendance for holiday_date changed at or after `since`
+    (the boundary second is re-checked; DATETIME has second precision):
+    punches on that day created or edited since then, summary rows refreshed
+    since then (this also covers punches deleted or moved off the day), and
+    employees that no longer have a summary row for the day at all.
+    Only the last case needs the snapshot, so it is checked against the records.
+    """
+    day_start, day_end = day_bounds(holiday_date)
+    punch_changes = db.session.query(IClockTransaction.emp_code).filter(
+        IClockTransaction.punch_time >= day_start,
+        IClockTransaction.punch_time < day_end,
+        db.or_(IClockTransaction.created_at >= since, IClockTransaction.updated_at >= since)
+    ).distinct()
+    summary_changes = db.session.query(DailyAttendance.emp_code).filter(
+        DailyAttendance.work_date == holiday_date,
+        DailyAttendance.updated_at >= since
+    )
+    return {str(eid).strip() for (eid,) in punch_changes.union(summary_changes).all()}
+
+def reprocess_holiday_changes(holiday_id: int):
+    """
+    Incremental re-processing of a draft holiday.
+
+    Recomputes only the employees whose punches changed since holiday.processed_at
+    and upserts their rows in the active snapshot generation: changed rows are
+    updated, new rows inserted, and rows of employees who no longer qualify are
+    removed. Manually edited records (is_manual=True) are left untouched.
+    Falls back to a full process_holiday_duty if the holiday was never processed.
+
+    :return: dict with changed, updated, inserted, deleted, kept_manual and seconds
+    """
+    started = time.perf_counter()
+    holiday = Holiday.query.filter_by(id=holiday_id).with_for_update().first()
+    if not holiday:
+        raise ValueError("Holiday not found")
+    if holiday.status == 'finalized':
+        raise ValueError("Cannot re-process a finalized holiday")
+    if not holiday.processed_at:
+        result = process_holiday_duty(holiday_id)
+        return {'changed': result['count'], 'updated': 0, 'inserted': result['count'], 'deleted': 0,
+                'kept_manual': 0, 'seconds': result['seconds'], 'full': True}
+
+    # New watermark is taken before reading, so changes made meanwhile are picked up next time
+    checked_at = _db_now()
+
+    # 1. Which employees changed since the last run
+    changed = changed_employee_ids(holiday.holiday_date, holiday.processed_at)
+    active = HolidayDutyRecord.query.filter_by(holiday_id=holiday.id, generation=holiday.active_generation)
+    # Employees in the snapshot whose whole day of punches has disappeared
+    summary_ids = select(DailyAttendance.emp_code).where(DailyAttendance.work_date == holiday.holiday_date)
+    changed |= {r.emp_id for r in active.with_entities(HolidayDutyRecord.emp_id).filter(
+        HolidayDutyRecord.emp_id.notin_(summary_ids))}
+
+    result = {'changed': len(changed), 'updated': 0, 'inserted': 0, 'deleted': 0, 'kept_manual': 0, 'full': False}
+    if changed:
+        # 2. Recompute just those employees
+        directory = get_employee_directory()
+        employees = [emp for emp in (directory.get(eid) for eid in sorted(changed)) if emp]
+        attendance_data = get_daily_attendance_for_date(holiday.holiday_date, list(changed))
+        rules = get_active_rule_set()
+        new_rows = {r['id']: r for r in compute_holiday_duty(holiday.holiday_date, employees, attendance_data, rules)}
+
+        # 3. Upsert against the active snapshot, keeping manual edits
+        existing = active.filter(HolidayDutyRecord.emp_id.in_(changed)).all()
+        updates = []
+        delete_ids = []
+        for record in existing:
+            new_row = new_rows.pop(record.emp_id, None)
+            if record.is_manual:
+                result['kept_manual'] += 1
+            elif new_row is None:
+                delete_ids.append(record.id)
+            else:
+                mapping = _snapshot_mappings(holiday.id, holiday.active_generation, [new_row], rules.version)[0]
+                del mapping['created_at']
+                mapping['id'] = record.id
+                updates.append(mapping)
+
+        if updates:
+            db.session.execute(update(HolidayDutyRecord), updates)
+        if delete_ids:
+            HolidayDutyRecord.query.filter(HolidayDutyRecord.id.in_(delete_ids)).delete(synchronize_session=False)
+        if new_rows:
+            db.session.execute(insert(HolidayDutyRecord),
+                               _snapshot_mappings(holiday.id, holiday.active_generation, new_rows.values(), rules.version))
+        result.update(updated=len(updates), inserted=len(new_rows), deleted=len(delete_ids))
+
+    holiday.processed_at = checked_at
+    db.session.commit()
+    if changed:
+        invalidate_holiday_artifacts(holiday.id)
+
+    result['seconds'] = round(time.perf_counter() - started, 3)
+    return result
+
+def _holiday_records_query(holiday_id, section=None, sub_section=None, category=None, include_security=False):
+    # Only the published snapshot generation is visible
+    active_generation = select(Holiday.active_generation).where(Holiday.id == holiday_id).scalar_subquery()
+    query = HolidayDutyRecord.query.filter(
+        HolidayDutyRecord.holiday_id == holiday_id,
+        HolidayDutyRecord.generation == active_generation
+    )
     
     if section:
         query = query.filter(HolidayDutyRecord.section == section)
@@ -542,28 +820,47 @@ def get_holiday_records(holiday_id: int, section=None, sub_section=None, categor
             db.not_(HolidayDutyRecord.sub_section.ilike('security'))
         )
         
-    records = query.order_by(HolidayDutyRecord.emp_id).all()
+    return query.order_by(HolidayDutyRecord.emp_id)
+
+def _holiday_record_row(sl, r, status):
+    return {
+        'sl': sl,
+        'id': r.emp_id,
+        'name': r.emp_name,
+        'designation': r.designation,
+        'section': r.section,
+        'sub_section': r.sub_section,
+        'category': r.category,
+        'gross': float(r.gross_salary),
+        'basic': float(r.basic_salary),
+        'in_time': r.in_time,
+        'out_time': r.out_time,
+        'hour': r.work_hours,
+        'ot': r.ot_hours,
+        'ot_rate': float(r.ot_rate or 0),
+        'amount': float(r.amount),
+        'remarks': r.remarks or '',
+        'is_manual': r.is_manual,
+        'status': status
+    }
+
+def get_holiday_records(holiday_id: int, section=None, sub_section=None, category=None, include_security=False):
+    """Fetch processed holiday records from snapshot table."""
+    records = _holiday_records_query(holiday_id, section, sub_section, category, include_security).all()
     
     results = []
     for i, r in enumerate(records, 1):
-        results.append({
-            'sl': i,
-            'id': r.emp_id,
-            'name': r.emp_name,
-            'designation': r.designation,
-            'section': r.section,
-            'sub_section': r.sub_section,
-            'category': r.category,
-            'gross': float(r.gross_salary),
-            'basic': float(r.basic_salary),
-            'in_time': r.in_time,
-            'out_time': r.out_time,
-            'hour': r.work_hours,
-            'ot': r.ot_hours,
-            'ot_rate': float(r.ot_rate or 0),
-            'amount': float(r.amount),
-            'remarks': r.remarks or '',
-            'is_manual': r.is_manual,
-            'status': r.holiday.status
-        })
+        results.append(_holiday_record_row(i, r, r.holiday.status))
     return results
+
+def iter_holiday_records(holiday_id: int, section=None, sub_section=None, category=None, include_security=False,
+                         chunk_size=1000):
+    """
+    Generator over processed holiday records, fetched chunk_size rows at a time.
+    Same rows as get_holiday_records without materialising the whole snapshot.
+    """
+    holiday = Holiday.query.get(holiday_id)
+    status = holiday.status if holiday else None
+    query = _holiday_records_query(holiday_id, section, sub_section, category, include_security)
+    for i, r in enumerate(query.yield_per(chunk_size), 1):
+        yield _holiday_record_row(i, r, status)
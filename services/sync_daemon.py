@@ -0,0 +1,129 @@
+from models.attendance import IClockTransaction
+from services.attendance_sync import BioTimeTransaction, AdaptiveBatchSize, sync_attendance_streaming
+from extensions import db
+from sqlalchemy import func, select
+from datetime import datetime
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+class SyncDaemon:
+    """
+    Near-real-time incremental sync.
+
+    Each poll asks BioTime for max(id) only (a primary key lookup). When it is
+    ahead of the local high-water mark, only the delta is streamed across. The
+    poll interval resets to min_interval whenever new punches arrive and doubles
+    up to max_interval while idle.
+
+    The high-water mark is read from the local table once at start-up and then
+    tracked in memory, and the same app context/session is reused for every
+    run, so steady-state polling never re-opens sessions or calls expire_all.
+    Lag and throughput are written to a small JSON status file after each poll.
+    """
+    def __init__(self, status_file, min_interval=5, max_interval=300):
+        self.status_file = status_file
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.batch_size = AdaptiveBatchSize()
+        self.high_water = None
+        self.stats = {
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'last_poll_at': None,
+            'last_sync_at': None,
+            'high_water_id': None,
+            'remote_max_id': None,
+            'lag_records': 0,
+            'last_batch_records': 0,
+            'last_batch_seconds': 0.0,
+            'throughput_rows_per_sec': 0.0,
+            'total_synced': 0,
+            'polls': 0,
+            'next_poll_in': min_interval,
+            'last_error': None
+        }
+
+    def _remote_max_id(self):
+        with db.engines['bio_time'].connect() as conn:
+            return conn.execute(select(func.max(BioTimeTransaction.id))).scalar() or 0
+
+    def poll_once(self):
+        """Checks the remote high-water mark and pulls the delta if there is one. Returns records synced."""
+        if self.high_water is None:
+            self.high_water = db.session.query(func.max(IClockTransaction.sync_id)).scalar() or 0
+
+        remote_max = self._remote_max_id()
+        self.stats['polls'] += 1
+        self.stats['last_poll_at'] = datetime.now().isoformat(timespec='seconds')
+        self.stats['remote_max_id'] = remote_max
+
+        synced = 0
+        if remote_max > self.high_water:
+            started = time.perf_counter()
+
+            def advance(last_id, rows):
+                self.high_water = last_id
+
+            synced = sync_attendance_streaming(
+                start_id=self.high_water,
+                end_id=remote_max,
+                batch_size=self.batch_size,
+                on_batch=advance
+            )
+            elapsed = time.perf_counter() - started
+            self.stats['last_sync_at'] = datetime.now().isoformat(timespec='seconds')
+            self.stats['last_batch_records'] = synced
+            self.stats['last_batch_seconds'] = round(elapsed, 3)
+            self.stats['throughput_rows_per_sec'] = round(synced / elapsed, 1) if elapsed > 0 else 0.0
+            self.stats['total_synced'] += synced
+
+        self.stats['high_water_id'] = self.high_water
+        self.stats['lag_records'] = max(0, remote_max - self.high_water)
+        return synced
+
+    def _next_interval(self, synced):
+        if synced:
+            return self.min_interval
+        return min(self.max_interval, self.interval * 2)
+
+    def write_status(self):
+        """Atomically replaces the status file so readers never see a partial write."""
+        tmp_path = f"{self.status_file}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.stats, f, indent=2)
+        os.replace(tmp_path, self.status_file)
+
+    def run_forever(self):
+        logger.info(f"Sync daemon started (poll interval {self.min_interval}s..{self.max_interval}s)")
+        while True:
+            try:
+                synced = self.poll_once()
+                self.stats['last_error'] = None
+            except Exception as e:
+                # Keep polling; the next run resumes from the in-memory high-water mark
+                synced = 0
+                self.stats['last_error'] = str(e)
+                logger.error(f"Sync daemon poll failed: {str(e)}")
+
+            self.interval = self._next_interval(synced)
+            self.stats['next_poll_in'] = self.interval
+            try:
+                self.write_status()
+            except OSError as e:
+                logger.warning(f"Could not write sync status file: {e}")
+            time.sleep(self.interval)
+
+def read_sync_status(status_file):
+    """Returns the daemon's last published status, with the age of the last sync in seconds."""
+    if not os.path.exists(status_file):
+        return None
+    with open(status_file) as f:
+        status = json.load(f)
+    if status.get('last_sync_at'):
+        last_sync = datetime.fromisoformat(status['last_sync_at'])
+        status['seconds_since_last_sync'] = int((datetime.now() - last_sync).total_seconds())
+    return status
@@ -3,7 +3,7 @@ TITLE Holiday Duty Manager Server
 echo Starting Holiday Duty Manager...
 cd /d "%~dp0"
 echo Starting Attendance Sync...
-start "Attendance Sync" venv\Scripts\python sync_data.py --loop
+start "Attendance Sync" venv\Scripts\python sync_data.py --daemon
 
 echo Starting Web Server...
 echo Access the site at: http://127.0.0.1:5100
@@ -181,6 +181,9 @@ async function saveBill(printAfterSave = false) {
         items: items
     };
 
+    // Opened now, while still handling the click, so pop-up blockers allow it
+    const pdfWin = printAfterSave ? window.open('', '_blank') : null;
+
     try {
         const saveBtn = document.getElementById('save-btn');
         const origText = saveBtn.innerHTML;
@@ -196,13 +199,16 @@ async function saveBill(printAfterSave = false) {
         const result = await res.json();
         if (result.success) {
             if (printAfterSave) {
-                window.open(`/manual_bill/pdf/${result.id}`, '_blank');
+                // Wait for the PDF job before leaving the page, or the polling would stop
+                await openPdfJob(`/manual_bill/pdf/${result.id}`, null, pdfWin);
             }
             window.location.href = '/manual_bill';
         } else {
+            if (pdfWin) pdfWin.close();
             alert("Failed to save bill: " + (result.error || "Unknown error"));
         }
     } catch (err) {
+        if (pdfWin) pdfWin.close();
         console.error("Save error:", err);
         alert("An error occurred while saving.");
     } finally {
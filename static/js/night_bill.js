@@ -112,25 +112,37 @@ function downloadReport(type) {
     };
 
     if (type === 'pdf') {
-        const form = document.createElement('form');
-        form.method = 'POST';
-        form.action = `/night_bill/${type}`;
-        form.target = '_blank';
-
-        const input = document.createElement('input');
-        input.type = 'hidden';
-        input.name = 'data';
-        input.value = JSON.stringify(payload);
-
-        form.appendChild(input);
-        document.body.appendChild(form);
-        form.submit();
-        document.body.removeChild(form);
+        openPdfJob(`/night_bill/${type}`, payload);
+    } else {
+        fetch(`/night_bill/${type}`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(payload)
+        })
+            .then(async res => {
+                if (!res.ok) {
+                    // Error responses are JSON ({error}); never save them as the file
+                    const data = await res.json().catch(() => ({}));
+                    throw new Error(data.error || `Server returned ${res.status}`);
+                }
+                return res.blob();
+            })
+            .then(blob => {
+                const url = window.URL.createObjectURL(blob);
+                const a = document.createElement('a');
+                a.href = url;
+                a.download = `night_bill_${date}.xlsx`;
+                document.body.append(a);
+                a.click();
+                a.remove();
+            })
+            .catch(err => alert(`Error downloading ${type}: ${err.message}`));
     }
 }
 
 sectionEl.addEventListener('change', updateSubSections);
 searchBtn.addEventListener('click', generateReport);
 document.getElementById('btn-pdf').addEventListener('click', () => downloadReport('pdf'));
+document.getElementById('btn-excel').addEventListener('click', () => downloadReport('excel'));
 
 window.addEventListener('load', loadFilters);
@@ -0,0 +1,67 @@
+// PDF export through the server's render queue: enqueue the job, poll its
+// status, then open the finished file. No request is held open while the
+// PDF renders, so large reports do not tie up the web server threads.
+
+const PDF_POLL_INTERVAL_MS = 1000;
+
+async function pdfJobJson(res) {
+    const data = await res.json().catch(() => ({}));
+    if (!res.ok) throw new Error(data.error || `Server returned ${res.status}`);
+    return data;
+}
+
+// url: a PDF endpoint. With a payload it is POSTed as JSON, otherwise it is
+// requested with ?async=1. win: a tab opened earlier in the same click, if the
+// caller had to await something first (pop-up blockers only allow tabs opened
+// directly from a click).
+async function openPdfJob(url, payload, win) {
+    win = win || window.open('', '_blank');
+    if (win) {
+        win.document.title = 'Generating PDF...';
+        win.document.body.innerHTML = '<p style="font-family: sans-serif; padding: 2rem;">Generating PDF, please wait...</p>';
+    }
+
+    try {
+        // 1. Enqueue (cached PDFs come back as an already finished job)
+        let res;
+        if (payload) {
+            res = await fetch(url, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ ...payload, async: true })
+            });
+        } else {
+            const jobUrl = new URL(url, window.location.href);
+            jobUrl.searchParams.set('async', '1');
+            res = await fetch(jobUrl);
+        }
+        const job = await pdfJobJson(res);
+
+        // 2. Poll until the worker is done
+        while (true) {
+            const status = await pdfJobJson(await fetch(job.status_url));
+            if (status.status === 'done') break;
+            if (status.status === 'failed') throw new Error(status.error || 'PDF rendering failed');
+            await new Promise(resolve => setTimeout(resolve, PDF_POLL_INTERVAL_MS));
+        }
+
+        // 3. Show the file
+        if (win) {
+            win.location.href = job.download_url;
+        } else {
+            window.location.href = job.download_url;
+        }
+    } catch (err) {
+        if (win) win.close();
+        alert(`Error generating PDF: ${err.message}`);
+    }
+}
+
+// Links marked data-pdf-job go through the queue; without JavaScript they
+// still work as plain links (the server then renders while the request waits).
+document.addEventListener('click', e => {
+    const link = e.target.closest('a[data-pdf-job]');
+    if (!link) return;
+    e.preventDefault();
+    openPdfJob(link.href);
+});
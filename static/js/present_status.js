@@ -6,6 +6,7 @@ const catEl = document.getElementById('category-select');
 const statusEl = document.getElementById('status-select');
 const searchBtn = document.getElementById('btn-fetch');
 const pdfBtn = document.getElementById('btn-pdf');
+const excelBtn = document.getElementById('btn-excel');
 const tableBody = document.getElementById('report-body');
 const fetchSpinner = document.getElementById('fetch-spinner');
 
@@ -115,24 +116,49 @@ function downloadPDF() {
         status: statusEl.value
     };
 
-    // Open PDF in a new tab
-    const form = document.createElement('form');
-    form.method = 'POST';
-    form.action = `/reports/present_status/pdf`;
-    form.target = '_blank';
+    // Open PDF in a new tab once the render queue has produced it
+    openPdfJob(`/reports/present_status/pdf`, payload);
+}
 
-    const input = document.createElement('input');
-    input.type = 'hidden';
-    input.name = 'data';
-    input.value = JSON.stringify(payload);
+function downloadExcel() {
+    const date = dateEl.value;
+    if (!date) return alert("Please select a date");
+
+    const payload = {
+        date: date,
+        section: sectionEl.value,
+        sub_section: subSectionEl.value,
+        category: catEl.value,
+        status: statusEl.value
+    };
 
-    form.appendChild(input);
-    document.body.appendChild(form);
-    form.submit();
-    document.body.removeChild(form);
+    fetch('/reports/present_status/excel', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(payload)
+    })
+        .then(async res => {
+            if (!res.ok) {
+                // Error responses are JSON ({error}); never save them as the file
+                const data = await res.json().catch(() => ({}));
+                throw new Error(data.error || `Server returned ${res.status}`);
+            }
+            return res.blob();
+        })
+        .then(blob => {
+            const url = window.URL.createObjectURL(blob);
+            const a = document.createElement('a');
+            a.href = url;
+            a.download = `present_status_${date}.xlsx`;
+            document.body.append(a);
+            a.click();
+            a.remove();
+        })
+        .catch(err => alert(`Error downloading Excel: ${err.message}`));
 }
 
 loadFilters();
 sectionEl.addEventListener('change', updateSubSections);
 searchBtn.addEventListener('click', generateReport);
 pdfBtn.addEventListener('click', downloadPDF);
+excelBtn.addEventListener('click', downloadExcel);
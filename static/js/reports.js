@@ -146,27 +146,21 @@ function downloadReport(type) {
     };
 
     if (type === 'pdf') {
-        const form = document.createElement('form');
-        form.method = 'POST';
-        form.action = `/reports/payment_sheet/${type}`;
-        form.target = '_blank';
-
-        const input = document.createElement('input');
-        input.type = 'hidden';
-        input.name = 'data';
-        input.value = JSON.stringify(payload);
-
-        form.appendChild(input);
-        document.body.appendChild(form);
-        form.submit();
-        document.body.removeChild(form);
+        openPdfJob(`/reports/payment_sheet/${type}`, payload);
     } else {
         fetch(`/reports/payment_sheet/${type}`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify(payload)
         })
-            .then(res => res.blob())
+            .then(async res => {
+                if (!res.ok) {
+                    // Error responses are JSON ({error}); never save them as the file
+                    const data = await res.json().catch(() => ({}));
+                    throw new Error(data.error || `Server returned ${res.status}`);
+                }
+                return res.blob();
+            })
             .then(blob => {
                 const url = window.URL.createObjectURL(blob);
                 const a = document.createElement('a');
@@ -176,7 +170,7 @@ function downloadReport(type) {
                 a.click();
                 a.remove();
             })
-            .catch(err => alert(`Error downloading ${type}`));
+            .catch(err => alert(`Error downloading ${type}: ${err.message}`));
     }
 }
 
@@ -203,6 +197,11 @@ async function loadHolidays() {
                             <button onclick="processHoliday(${h.id})" class="btn-sm btn-process" title="Import data from iClock">
                                 <i class="fas fa-sync"></i> Process
                             </button>
+                            ${h.processed_at ? `
+                                <button onclick="reprocessHoliday(${h.id})" class="btn-sm btn-process" title="Re-compute only employees whose punches changed since the last run">
+                                    <i class="fas fa-redo"></i> Update
+                                </button>
+                            ` : ''}
                             <button onclick="finalizeHoliday(${h.id})" class="btn-sm btn-finalize" title="Lock data for payment">
                                 <i class="fas fa-lock"></i> Finalize
                             </button>
@@ -263,6 +262,17 @@ async function processHoliday(id) {
     }
 }
 
+async function reprocessHoliday(id) {
+    try {
+        const res = await fetch(`/api/holidays/${id}/reprocess`, { method: 'POST' });
+        const data = await res.json();
+        alert(data.message || data.error);
+        loadHolidays();
+    } catch (err) {
+        alert("Update failed");
+    }
+}
+
 async function finalizeHoliday(id) {
     if (!confirm("Are you sure? Finalizing will lock the data and prevent any further changes or re-processing.")) return;
 
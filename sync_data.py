@@ -9,7 +9,10 @@ import time
 import signal
 from app import app
 from extensions import db
-from services.attendance_sync import sync_attendance
+from services.attendance_sync import sync_attendance, sync_attendance_streaming, run_backfill, get_unfinished_backfill
+from services.daily_attendance_service import rebuild_all_daily_attendance
+from services.sync_daemon import SyncDaemon
+from migrate_db import run_migrations
 
 def is_running(pid):
     """Check if a process with the given PID is still running."""
@@ -43,16 +46,60 @@ def init_db():
         print(f"Warning: Could not check/create database 'mfl' automatically: {e}")
 
     with app.app_context():
-        # This will only create tables for models that use the default bind (mfl)
-        # and don't exist yet.
-        db.create_all() 
+        # Creates missing tables on the default bind (mfl) and applies
+        # index/column migrations to tables that already exist.
+        run_migrations()
     print("Database initialization complete.")
 
-def run_sync():
+def rebuild_summary():
+    """Rebuild the daily attendance summary from all local punches."""
+    print("Rebuilding daily attendance summary...")
+    with app.app_context():
+        count = rebuild_all_daily_attendance()
+        print(f"Summary rebuilt. {count} employee-days written.")
+
+def get_arg(name, default):
+    """Returns the integer value following a command-line flag, e.g. --workers 8."""
+    if name in sys.argv:
+        idx = sys.argv.index(name)
+        if idx + 1 < len(sys.argv):
+            return int(sys.argv[idx + 1])
+    return default
+
+def run_backfill_sync(workers=4, ranges=None):
+    """Parallel range-partitioned backfill; resumes from checkpoints if interrupted."""
+    print(f"Starting parallel backfill with {workers} workers...")
+    with app.app_context():
+        count = run_backfill(workers=workers, num_ranges=ranges)
+        print(f"Backfill complete. {count} records added.")
+
+def run_daemon():
+    """Poll BioTime on a short adaptive interval and pull only new punches."""
+    with app.app_context():
+        if get_unfinished_backfill():
+            print("Unfinished backfill found. Resuming it before starting the daemon...")
+            run_backfill()
+        daemon = SyncDaemon(
+            status_file=app.config['SYNC_STATUS_FILE'],
+            min_interval=app.config['SYNC_MIN_INTERVAL'],
+            max_interval=app.config['SYNC_MAX_INTERVAL']
+        )
+        print(f"Daemon mode enabled. Polling every {daemon.min_interval}-{daemon.max_interval} seconds. Press Ctrl+C to stop.")
+        try:
+            daemon.run_forever()
+        except KeyboardInterrupt:
+            print("\nSync stopped.")
+
+def run_sync(stream=False):
     """Run the synchronization loop or once."""
     print("Starting synchronization...")
     with app.app_context():
-        count = sync_attendance()
+        # An interrupted backfill leaves gaps below max(sync_id); fill them first
+        if get_unfinished_backfill():
+            print("Unfinished backfill found. Resuming it before the incremental sync...")
+            run_backfill()
+        # Streaming mode overlaps remote reads with local writes for large catch-ups
+        count = sync_attendance_streaming() if stream else sync_attendance()
         print(f"Sync complete. {count} records added.")
 
 if __name__ == "__main__":
@@ -82,9 +129,22 @@ if __name__ == "__main__":
     try:
         if len(sys.argv) > 1 and sys.argv[1] == "--init":
             init_db()
+
+        if "--rebuild-summary" in sys.argv:
+            rebuild_summary()
         
+        stream = "--stream" in sys.argv
+
+        if "--backfill" in sys.argv:
+            run_backfill_sync(workers=get_arg("--workers", 4), ranges=get_arg("--ranges", None))
+
+        if "--daemon" in sys.argv:
+            # The daemon's first poll performs the start-up sync
+            run_daemon()
+            sys.exit(0)
+
         # Run sync on start
-        run_sync()
+        run_sync(stream)
 
         # If --loop argument is passed, keep syncing every 60 minutes
         if "--loop" in sys.argv:
@@ -92,12 +152,11 @@ if __name__ == "__main__":
             try:
                 while True:
                     time.sleep(3600)
-                    run_sync()
+                    run_sync(stream)
             except KeyboardInterrupt:
                 print("\nSync stopped.")
     finally:
         # Release the lock
-        os.close(fd)
         try:
             os.remove(lock_file)
         except OSError:
@@ -0,0 +1,35 @@
+import tempfile
+from datetime import date, datetime
+from sqlalchemy.dialects import mysql
+from benchmarks.common import make_app
+from extensions import db
+from models.daily_attendance import DailyAttendance
+import models.designation, models.section, models.sub_section  # noqa: F401 (tables for create_all)
+from services.attendance_lookup import (_drop_temp_table_statement, fetch_for_employees,
+                                        STRATEGY_CHUNKED, STRATEGY_TEMP_TABLE)
+
+def test_mysql_drop_is_temporary():
+    # A plain DROP TABLE would implicitly commit the caller's transaction on MySQL
+    sql = str(_drop_temp_table_statement('mysql').compile(dialect=mysql.dialect()))
+    assert 'DROP TEMPORARY TABLE' in sql
+
+def test_temp_table_lookup_keeps_the_transaction_open():
+    app = make_app('sqlite:///' + tempfile.mktemp())
+    with app.app_context():
+        db.create_all(bind_key=None)
+        db.session.add_all(DailyAttendance(emp_code=str(i), work_date=date(2024, 1, 1),
+                                           in_time=datetime(2024, 1, 1, 8), punch_count=1) for i in range(1, 21))
+        db.session.commit()
+
+        # Uncommitted change that must survive the lookup and still be rolled back afterwards
+        db.session.add(DailyAttendance(emp_code='99', work_date=date(2024, 1, 1), punch_count=1))
+        db.session.flush()
+
+        query = db.session.query(DailyAttendance.emp_code)
+        emp_ids = [str(i) for i in range(1, 11)] + ['99']
+        temp_rows = fetch_for_employees(query, DailyAttendance.emp_code, emp_ids, strategy=STRATEGY_TEMP_TABLE)
+        chunked_rows = fetch_for_employees(query, DailyAttendance.emp_code, emp_ids, strategy=STRATEGY_CHUNKED)
+        assert sorted(r.emp_code for r in temp_rows) == sorted(r.emp_code for r in chunked_rows) == sorted(emp_ids)
+
+        db.session.rollback()
+        assert db.session.get(DailyAttendance, ('99', date(2024, 1, 1))) is None
@@ -1,6 +1,8 @@
+import os
 import argparse
 from app import app
 from extensions import db
+from migrate_db import run_migrations
 from models.user import User
 from dotenv import load_dotenv
 
@@ -10,7 +12,7 @@ def init_db():
     """Initialize database and create default admin user."""
     with app.app_context():
         print("Initializing database...")
-        db.create_all()
+        run_migrations()
         
         username = os.getenv('ADMIN_USERNAME', 'admin')
         password = os.getenv('ADMIN_PASSWORD', 'admin123')